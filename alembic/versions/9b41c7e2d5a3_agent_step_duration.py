@@ -0,0 +1,28 @@
+"""add agent_step_logs.duration_ms
+
+Revision ID: 9b41c7e2d5a3
+Revises: defcbcde8655
+Create Date: 2026-10-16 10:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b41c7e2d5a3'
+down_revision: Union[str, Sequence[str], None] = 'defcbcde8655'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('agent_step_logs', sa.Column('duration_ms', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('agent_step_logs', 'duration_ms')
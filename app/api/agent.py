@@ -1,18 +1,29 @@
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+import json
+import os
 
-from app.schemas.agent import AgentRunRequest, AgentRunResponse, AgentStep
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from app.schemas.agent import AgentBatchRequest, AgentBatchResult, AgentRunRequest, AgentRunResponse, AgentStep
 from app.services.agent_orchestrator import agent_orchestrator
 import uuid
 
+MAX_BATCH_JOBS = 500
+MAX_BATCH_CONCURRENCY = 64
+# Steps buffered per streaming client; a slower reader pauses the run.
+STREAM_QUEUE_SIZE = int(os.getenv("AGENT_STREAM_QUEUE_SIZE", "16"))
+
 router = APIRouter(prefix="/agent", tags=["agent"])
 
 
 @router.post("/run", response_model=AgentRunResponse)
-def run(payload: AgentRunRequest):
+async def run(payload: AgentRunRequest):
     user_id = uuid.UUID(payload.user_id)
     goal = payload.goal or f"Autofill application for job: {payload.job_description}"
     job_context = payload.job_context or {"job_description": payload.job_description}
-    steps, answers, meta = agent_orchestrator.run(
+    steps, answers, meta = await agent_orchestrator.arun(
         user_id=user_id,
         goal=goal,
         job_context=job_context,
@@ -22,22 +33,92 @@ def run(payload: AgentRunRequest):
     )
     return AgentRunResponse(
         user_id=str(user_id),
+        run_id=meta.get("run_id"),
+        status=meta.get("status"),
         job_description=payload.job_description,
         steps=steps,
         proposed_answers=answers,
         missing_fields=meta.get("missing_fields", []),
         next_questions=meta.get("next_questions", []),
+        near_duplicate_of=meta.get("near_duplicate_of"),
     )
 
 
+@router.post("/run/stream")
+async def run_stream(payload: AgentRunRequest, request: Request):
+    """
+    Streaming /agent/run: one "step" event per plan/acted/failed step as it
+    happens, then a "result" event with the full AgentRunResponse. Server-sent
+    events when the client accepts text/event-stream, NDJSON otherwise.
+    """
+    user_id = uuid.UUID(payload.user_id)
+    goal = payload.goal or f"Autofill application for job: {payload.job_description}"
+    job_context = payload.job_context or {"job_description": payload.job_description}
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    queue: "asyncio.Queue" = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+
+    async def on_step(step: AgentStep) -> None:
+        await queue.put(("step", step))
+
+    async def produce() -> None:
+        try:
+            steps, answers, meta = await agent_orchestrator.arun(
+                user_id=user_id,
+                goal=goal,
+                job_context=job_context,
+                user_profile=None,
+                constraints=payload.constraints,
+                return_meta=True,
+                on_step=on_step,
+            )
+            response = AgentRunResponse(
+                user_id=str(user_id),
+                run_id=meta.get("run_id"),
+                status=meta.get("status"),
+                job_description=payload.job_description,
+                steps=steps,
+                proposed_answers=answers,
+                missing_fields=meta.get("missing_fields", []),
+                next_questions=meta.get("next_questions", []),
+                near_duplicate_of=meta.get("near_duplicate_of"),
+            )
+            await queue.put(("result", response))
+        except Exception as exc:  # noqa: BLE001 - reported to the client as an event
+            await queue.put(("error", {"error": f"{type(exc).__name__}: {exc}"}))
+        await queue.put(None)
+
+    def encode(event: str, data) -> str:
+        body = json.dumps(jsonable_encoder(data))
+        if sse:
+            return f"event: {event}\ndata: {body}\n\n"
+        return json.dumps({"event": event, "data": jsonable_encoder(data)}) + "\n"
+
+    async def stream():
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield encode(*item)
+        finally:
+            # Client went away: stop the run (its step log is flushed as failed).
+            if not producer.done():
+                producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(stream(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
 @router.post("/continue", response_model=AgentRunResponse)
-def continue_run(payload: AgentRunRequest):
+async def continue_run(payload: AgentRunRequest):
     if payload.user_inputs is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="user_inputs is required")
     user_id = uuid.UUID(payload.user_id)
     goal = payload.goal or f"Autofill application for job: {payload.job_description}"
     job_context = payload.job_context or {"job_description": payload.job_description}
-    steps, answers, meta = agent_orchestrator.run(
+    steps, answers, meta = await agent_orchestrator.arun(
         user_id=payload.user_id,
         goal=goal,
         job_context=job_context,
@@ -45,12 +126,76 @@ def continue_run(payload: AgentRunRequest):
         constraints=payload.constraints,
         user_inputs=payload.user_inputs,
         return_meta=True,
+        run_id=payload.run_id,
     )
     return AgentRunResponse(
         user_id=str(user_id),
+        run_id=meta.get("run_id"),
+        status=meta.get("status"),
         job_description=payload.job_description,
         steps=steps,
         proposed_answers=answers,
         missing_fields=meta.get("missing_fields", []),
         next_questions=meta.get("next_questions", []),
+        near_duplicate_of=meta.get("near_duplicate_of"),
     )
+
+
+@router.post("/run_batch")
+async def run_batch(payload: AgentBatchRequest):
+    """Run one profile against many jobs; streams one JSON result per line as jobs finish."""
+    if not payload.jobs:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="jobs must not be empty")
+    if len(payload.jobs) > MAX_BATCH_JOBS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"at most {MAX_BATCH_JOBS} jobs per batch"
+        )
+    user_id = uuid.UUID(payload.user_id)
+    concurrency = payload.concurrency
+    if concurrency is not None:
+        concurrency = max(1, min(concurrency, MAX_BATCH_CONCURRENCY))
+    jobs = payload.jobs
+    job_contexts = []
+    for job in jobs:
+        context = dict(job.job_context or {})
+        context.setdefault("job_description", job.job_description)
+        job_contexts.append(context)
+
+    async def stream():
+        results = agent_orchestrator.arun_batch(
+            user_id=user_id,
+            goal=payload.goal or "Autofill application for batch job",
+            job_contexts=job_contexts,
+            constraints=payload.constraints,
+            concurrency=concurrency,
+        )
+        async for index, outcome in results:
+            job = jobs[index]
+            if isinstance(outcome, Exception):
+                item = AgentBatchResult(
+                    user_id=str(user_id),
+                    job_description=job.job_description,
+                    steps=[],
+                    proposed_answers={},
+                    index=index,
+                    job_id=job.job_id,
+                    error=f"{type(outcome).__name__}: {outcome}",
+                )
+            else:
+                steps, answers, meta = outcome
+                item = AgentBatchResult(
+                    user_id=str(user_id),
+                    run_id=meta.get("run_id"),
+                    status=meta.get("status"),
+                    job_description=job.job_description,
+                    steps=steps,
+                    proposed_answers=answers,
+                    missing_fields=meta.get("missing_fields", []),
+                    next_questions=meta.get("next_questions", []),
+                    near_duplicate_of=meta.get("near_duplicate_of"),
+                    index=index,
+                    job_id=job.job_id,
+                )
+            yield json.dumps(jsonable_encoder(item)) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
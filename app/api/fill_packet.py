@@ -12,6 +12,7 @@ from app.services.fill_packet import (
     build_one_liner,
     _safe_profile,
 )
+from app.services.jd_analysis import analyze_jd
 
 router = APIRouter(prefix="/agent", tags=["agent"])
 
@@ -78,7 +79,7 @@ CANONICAL_FIELDS = [
 ]
 
 COMMON_KEYWORDS = [
-    "python", "fastapi", "rest", "api", "sql", "postgres", "mysql",
+    "python", "fastapi", "rest api", "api", "sql", "postgresql", "mysql",
     "docker", "aws", "gcp", "azure", "kubernetes",
     "react", "javascript", "typescript",
     "automation", "web scraping", "playwright", "selenium",
@@ -126,19 +127,9 @@ def _safe_profile(profile: Optional[Profile]) -> Profile:
 
 
 def extract_keywords(jd: str) -> List[str]:
-    text = (jd or "").lower()
-    found = []
-    for kw in COMMON_KEYWORDS:
-        if kw in text:
-            found.append(kw)
-    # keep unique, stable order
-    seen = set()
-    out = []
-    for k in found:
-        if k not in seen:
-            out.append(k)
-            seen.add(k)
-    return out
+    # Whole-word, alias-aware matches, in COMMON_KEYWORDS order.
+    skills = set(analyze_jd(jd or "").skills)
+    return [kw for kw in COMMON_KEYWORDS if kw in skills]
 
 
 def build_cover_letter(job_title: Optional[str], company: Optional[str], profile: Profile, keywords: List[str]) -> str:
@@ -1,10 +1,14 @@
+import os
+
 from fastapi import APIRouter, HTTPException, status
 
-from app.schemas.job import JobAnalysisRequest, JobAnalysisResponse
-from app.services.job import job_analysis_service
+from app.schemas.job import JobAnalysisRequest, JobAnalysisResponse, JobRankRequest, JobRankResponse
+from app.services.job import job_analysis_service, job_rank_service
 
 router = APIRouter(prefix="/job", tags=["job"])
 
+MAX_RANK_JOBS = int(os.getenv("JOB_RANK_MAX_JOBS", "10000"))  # jobs + job_ids per /job/rank request
+
 
 @router.post("/analyse", response_model=JobAnalysisResponse)
 def analyse(payload: JobAnalysisRequest):
@@ -18,3 +22,26 @@ def analyse(payload: JobAnalysisRequest):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return JobAnalysisResponse(**result)
 
+
+
+@router.post("/rank", response_model=JobRankResponse)
+def rank(payload: JobRankRequest):
+    if payload.skills is None and not payload.user_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide user_id or skills")
+    if len(payload.jobs) + len(payload.job_ids) > MAX_RANK_JOBS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"at most {MAX_RANK_JOBS} jobs per request"
+        )
+    try:
+        result = job_rank_service.rank_request(
+            user_id=payload.user_id,
+            skills=payload.skills,
+            jobs=[job.dict() for job in payload.jobs],
+            job_ids=payload.job_ids,
+            top_k=payload.top_k,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return JobRankResponse(**result)
@@ -1,18 +1,96 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
 
 from app.api import agent, application, auth, github, job, profile
 from app.api.fill_packet import router as fill_packet_router
+from app.services.checkpoints import checkpoint_store
+from app.services.jd_analysis import jd_analysis_cache
+from app.services.job_dedup import job_dedup
+from app.services.metrics import metrics
+from app.services.portals.browser_fetch import fetch_coalescer
+from app.services.portals.browser_pool import browser_pool
+from app.services.portals.capabilities import capability_cache
+from app.services.portals.discovery_planner import discovery_planner
+from app.services.portals.discovery_workers import discovery_workers
+from app.services.portals.prefetch import browser_prefetcher
+from app.services.portals.snapshot_store import snapshot_store
+from app.services.step_log import step_log_writer
+from app.services.tool_cache import tool_cache
 from fastapi.middleware.cors import CORSMiddleware
 
 load_dotenv()
 
-app = FastAPI(title="Job Filler Agent API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm browsers for discovery fetches; without Chromium the pool stays off
+    # and fetches fall back to launching a browser per call.
+    if os.getenv("BROWSER_POOL_ENABLED", "1") != "0":
+        await browser_pool.start()
+    yield
+    await browser_pool.stop()
+    discovery_workers.shutdown()
+    # Write out any queued write-behind step logs.
+    step_log_writer.close()
+
+
+app = FastAPI(title="Job Filler Agent API", version="0.1.0", lifespan=lifespan)
+
+metrics.register_source("browser_pool", browser_pool.stats)
+metrics.register_source("prefetch", browser_prefetcher.stats)
+metrics.register_source("tool_cache", tool_cache.stats)
+metrics.register_source("checkpoints", checkpoint_store.stats)
+metrics.register_source("step_log_writer", step_log_writer.stats)
+metrics.register_source("discovery_workers", discovery_workers.stats)
+metrics.register_source("discovery_planner", discovery_planner.stats)
+metrics.register_source("capabilities", capability_cache.stats)
+metrics.register_source("fetch_coalescer", fetch_coalescer.stats)
+metrics.register_source("snapshot_store", snapshot_store.stats)
+metrics.register_source("job_dedup", job_dedup.stats)
+metrics.register_source("jd_analysis", jd_analysis_cache.stats)
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+
+@app.get("/health/browser_pool")
+def browser_pool_health():
+    return browser_pool.stats()
+
+
+@app.get("/health/prefetch")
+def prefetch_health():
+    return {
+        **browser_prefetcher.stats(),
+        "coalescer": fetch_coalescer.stats(),
+        "snapshot_store": snapshot_store.stats(),
+    }
+
+
+@app.get("/health/tool_cache")
+def tool_cache_health():
+    return tool_cache.stats()
+
+
+@app.get("/health/job_dedup")
+def job_dedup_health():
+    return job_dedup.stats()
+
+
+@app.get("/health/discovery")
+def discovery_health():
+    return {**discovery_planner.stats(), "capabilities": capability_cache.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Routers
 app.include_router(auth.router)
 app.include_router(profile.router)
@@ -159,6 +159,7 @@ class AgentStepLog(Base):
     tool = Column(String(64), nullable=True)
     status = Column(String(32), nullable=False)
     details = Column(JSON, nullable=True)
+    duration_ms = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     run = relationship("AgentRun", back_populates="steps")
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import hashlib
+import os
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
@@ -45,6 +46,17 @@ class ResumeRecord:
     parsed_json: Optional[Dict[str, str]] = None
 
 
+@dataclass
+class JobPosting:
+    id: str
+    description: str
+    user_id: Optional[str] = None
+    title: Optional[str] = None
+    company: Optional[str] = None
+    url: Optional[str] = None
+    added_at: datetime = field(default_factory=datetime.utcnow)
+
+
 @dataclass
 class ApplicationLogEntry:
     id: str
@@ -79,6 +91,8 @@ class InMemoryStore:
         self.users_by_email: Dict[str, str] = {}
         self.profiles: Dict[str, Profile] = {}
         self.resumes: Dict[str, ResumeRecord] = {}
+        self.jobs: Dict[str, JobPosting] = {}  # insertion order = age; oldest evicted past max_jobs
+        self.max_jobs = int(os.getenv("JOB_STORE_MAX_JOBS", "50000"))
         self.tokens: Dict[str, Tuple[str, datetime]] = {}
         self.refresh_tokens: Dict[str, Tuple[str, datetime]] = {}
         self.github_connections: Dict[str, GitHubConnection] = {}
@@ -138,6 +152,13 @@ class InMemoryStore:
         self.resumes[resume.id] = resume
         return resume
 
+    def add_job(self, job: JobPosting) -> JobPosting:
+        self.jobs.pop(job.id, None)
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.max_jobs:
+            del self.jobs[next(iter(self.jobs))]
+        return job
+
     def add_github_connection(self, connection: GitHubConnection) -> GitHubConnection:
         self.github_connections[connection.user_id] = connection
         return connection
@@ -8,6 +8,9 @@ class AgentRunRequest(BaseModel):
     goal: Optional[str] = None
     job_context: Optional[Dict[str, Any]] = None
     constraints: Optional[Dict[str, Any]] = None
+    user_inputs: Optional[Dict[str, Any]] = None
+    # /agent/continue: resume this run from its checkpoint instead of starting over.
+    run_id: Optional[str] = None
 
 
 class AgentStep(BaseModel):
@@ -27,8 +30,32 @@ class MissingFieldQuestion(BaseModel):
 
 class AgentRunResponse(BaseModel):
     user_id: str
+    run_id: Optional[str] = None
+    status: Optional[str] = None  # completed | blocked | skipped | failed | timeout
     job_description: str
     steps: List[AgentStep]
     proposed_answers: Dict[str, str]
     missing_fields: List[str] = []
     next_questions: List[MissingFieldQuestion] = []
+    # Earlier run on a near-duplicate JD whose results were reused: run_id, similarity, reused
+    near_duplicate_of: Optional[Dict[str, Any]] = None
+
+
+class AgentBatchJob(BaseModel):
+    job_description: str
+    job_context: Optional[Dict[str, Any]] = None
+    job_id: Optional[str] = None  # echoed back so clients can match streamed results
+
+
+class AgentBatchRequest(BaseModel):
+    user_id: str
+    jobs: List[AgentBatchJob]
+    goal: Optional[str] = None
+    constraints: Optional[Dict[str, Any]] = None
+    concurrency: Optional[int] = None
+
+
+class AgentBatchResult(AgentRunResponse):
+    index: int
+    job_id: Optional[str] = None
+    error: Optional[str] = None
@@ -1,6 +1,6 @@
 from typing import Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class JobAnalysisRequest(BaseModel):
@@ -16,3 +16,41 @@ class JobAnalysisResponse(BaseModel):
     score_against_profile: float
     suggested_resume_id: Optional[str] = None
     recommendations: Dict[str, str]
+
+
+class JobToRank(BaseModel):
+    id: Optional[str] = None  # stored under this id (a new one if omitted) for later job_ids
+    title: Optional[str] = None
+    company: Optional[str] = None
+    url: Optional[str] = None
+    description: str
+
+
+class JobRankRequest(BaseModel):
+    user_id: Optional[str] = None
+    skills: Optional[List[str]] = None  # overrides the stored profile's skills
+    jobs: List[JobToRank] = Field(default_factory=list)
+    job_ids: List[str] = Field(default_factory=list)  # jobs sent to /job/rank earlier
+    top_k: int = Field(20, ge=1, le=1000)
+
+
+class RankedJob(BaseModel):
+    id: str
+    title: Optional[str] = None
+    company: Optional[str] = None
+    url: Optional[str] = None
+    fit_score: float
+    must_have_hit: int
+    must_have_total: int
+    nice_have_hit: int
+    nice_have_total: int
+    must_have_matched: List[str]
+    must_have_missing: List[str]
+    nice_to_have_matched: List[str]
+
+
+class JobRankResponse(BaseModel):
+    ranked: List[RankedJob]
+    total: int
+    unknown_job_ids: List[str] = Field(default_factory=list)
+    timings_ms: Dict[str, float] = Field(default_factory=dict)
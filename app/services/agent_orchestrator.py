@@ -1,13 +1,52 @@
-from dataclasses import dataclass, field
+import asyncio
+import inspect
+import os
+import time
+import uuid
+import weakref
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from app.models.store import Profile, store
 from app.schemas.agent import AgentStep
 from app.schemas.discovery import DiscoveredField
+from app.services.checkpoints import checkpoint_store
+from app.services.fit import fit_score
+from app.services.jd_analysis import analyze_jd
+from app.services.job_dedup import job_dedup
+from app.services.metrics import metrics
+from app.services.portals.browser_pool import browser_pool
+from app.services.portals.canonical_fields import canonical_field_classifier
+from app.services.portals.capabilities import capability_cache
+from app.services.portals.discovery_workers import discovery_workers
+from app.services.portals.discovery_planner import BROWSER, CACHED_SCHEMA, PORTAL_API, STATIC, discovery_planner
+from app.services.portals.greenhouse import fetch_board_questions
+from app.services.portals.parsed_page import parse_page
+from app.services.portals.prefetch import Prefetch, browser_prefetcher
 from app.services.portals.registry import pick_adapter
+from app.services.skills import MUST_HAVE_SKILLS, NICE_TO_HAVE_SKILLS, skill_interner
+from app.services.step_log import StepLogBuffer, write_behind_default
+from app.services.tool_cache import tool_cache
+
+
+class ResumeSnapshot(NamedTuple):
+    """Detached copy of a Resume row, safe to share across a batch of runs."""
+
+    id: Any
+    resume_type: Optional[str]
+    parsed_json: Any
+
+
+@dataclass
+class RunPreload:
+    """Per-user data loaded once and shared by every run of a batch."""
+
+    profile: Optional[Profile]
+    facts: Dict[str, Any] = field(default_factory=dict)
+    resumes: Optional[List[ResumeSnapshot]] = None  # None: no DB, resume selection is skipped
 
 
 @dataclass
@@ -34,11 +73,149 @@ class AgentState:
     discovered_fields: List[Dict[str, Any]] = field(default_factory=list)
     fill_actions: List[Dict[str, Any]] = field(default_factory=list)
     canonical_field_map: Dict[str, str] = field(default_factory=dict)
-    step: int = 0
+    prefetch: Optional[Prefetch] = None
+    preload: Optional[RunPreload] = None
+    run_logged: bool = False  # the AgentRun row has been written (or queued)
+    # time.monotonic() deadlines: the whole run, and each async tool call in flight.
+    deadline: Optional[float] = None
+    tool_deadlines: Dict[str, float] = field(default_factory=dict)
+    step: int = 0  # tool calls finished (the max_steps budget)
+    step_num: int = 0  # last step number handed out, in launch order
     completed: bool = False
     status: str = "planning"
 
 
+@dataclass(frozen=True)
+class ToolSpec:
+    """
+    Dataflow of one tool: the state slots it reads and the slots it fills, plus
+    the request inputs (context keys, "user_inputs", "constraints") it depends
+    on, which decide what a resumed run has to redo.
+    """
+
+    name: str
+    requires: Tuple[str, ...] = ()
+    provides: Tuple[str, ...] = ()
+    inputs: Tuple[str, ...] = ()
+    # Deterministic tools: `memo` returns the state slice the result depends on;
+    # bump `version` whenever the tool's output for the same slice changes.
+    memo: Optional[Callable[[AgentState], Any]] = None
+    version: int = 1
+    # Wall-clock cap per call of an async tool (constraints["tool_budgets_ms"] overrides).
+    budget_ms: Optional[int] = None
+    # Sync tool that queries `db`: runs in a worker thread when a session is passed.
+    uses_db: bool = False
+
+
+# Constraints that shape how a run executes, not what it produces.
+RUN_ONLY_CONSTRAINTS = ("db_available", "max_steps", "deadline_ms", "tool_budgets_ms")
+
+# Canonical skill names (see app/services/skills.py) fetch_profile seeds a new
+# profile with when the job description mentions them.
+PROFILE_SEED_SKILLS = ("python", "fastapi", "sql", "docker", "rest api", "postgresql")
+
+
+def _job_description_slice(state: AgentState) -> Any:
+    return state.context.get("job_description") or ""
+
+
+def _fit_slice(state: AgentState) -> Any:
+    return {
+        "skills": sorted(getattr(state.profile, "skills", []) or []),
+        "must_have": state.job_analysis.get("must_have_skills", []),
+        "nice_to_have": state.job_analysis.get("nice_to_have_skills", []),
+    }
+
+
+def _discovered_fields_slice(state: AgentState) -> Any:
+    return state.context.get("discovered_fields", [])
+
+
+# Canonical order is the old strict sequence: ties between ready tools, the step
+# budget and the order of the returned step log all follow it.
+TOOL_SPECS: Tuple[ToolSpec, ...] = (
+    ToolSpec("fetch_profile", provides=("profile",), inputs=("job_description",)),
+    ToolSpec(
+        "analyze_job",
+        provides=("job_analysis",),
+        inputs=("job_description",),
+        memo=_job_description_slice,
+        version=3,
+    ),
+    ToolSpec("score_fit", requires=("profile", "job_analysis"), provides=("fit_score",), memo=_fit_slice, version=2),
+    ToolSpec("select_resume", requires=("job_analysis",), provides=("resume",), inputs=("constraints",), uses_db=True),
+    ToolSpec(
+        "decide_apply_strategy", requires=("fit_score",), provides=("apply_decision",), inputs=("constraints",)
+    ),
+    ToolSpec("map_fields", requires=("apply",), provides=("fields",), inputs=("job_description",)),
+    ToolSpec("draft_answers", requires=("fields", "profile"), provides=("answers",), inputs=("constraints",)),
+    ToolSpec("detect_portal", provides=("portal",), inputs=("page_url", "page_html")),
+    ToolSpec(
+        "discover_fields",
+        requires=("portal",),
+        provides=("discovered_fields",),
+        inputs=("page_url", "page_html"),
+        budget_ms=30_000,
+    ),
+    ToolSpec(
+        "map_to_canonical",
+        requires=("discovered_fields",),
+        provides=("canonical_field_map",),
+        memo=_discovered_fields_slice,
+    ),
+    ToolSpec(
+        "build_fill_actions",
+        requires=("discovered_fields", "answers"),
+        provides=("fill_actions",),
+        inputs=("page_url", "page_html", "user_inputs"),
+    ),
+    # Can block the run, so it waits for everything the user should see first.
+    ToolSpec(
+        "identify_missing_fields",
+        requires=("answers", "fill_actions"),
+        provides=("missing_fields",),
+        inputs=("user_inputs",),
+    ),
+    ToolSpec(
+        "build_application_package", requires=("missing_fields", "resume"), provides=("application_package",)
+    ),
+)
+
+# Part of discover_fields' budget kept back from the slower paths (API, browser) for returning.
+DISCOVER_RETURN_RESERVE_S = 0.25
+
+# AgentState fields kept in checkpoints; observations/actions are run-local audit data.
+CHECKPOINT_FIELDS: Tuple[str, ...] = (
+    "user_id",
+    "goal",
+    "context",
+    "proposed_answers",
+    "last_error",
+    "retries",
+    "job_analysis",
+    "fit_score",
+    "apply_decision",
+    "selected_resume_id",
+    "missing_fields",
+    "user_answers",
+    "step",
+    "step_num",
+    "status",
+    "run_logged",
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _seconds_left(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else deadline - time.monotonic()
+
+
 class AgentOrchestrator:
     """Think-Act-Observe-Decide loop driving application filling."""
 
@@ -59,53 +236,80 @@ class AgentOrchestrator:
             "map_to_canonical": self._tool_map_to_canonical,
             "build_fill_actions": self._tool_build_fill_actions,
         }
+        self.tool_specs: Dict[str, ToolSpec] = {spec.name: spec for spec in TOOL_SPECS}
+        self._order = {name: index for index, name in enumerate(self.tool_specs)}
+        # Sync tools that unblock an async one run first, so slow I/O starts early.
+        async_inputs = {
+            slot
+            for spec in TOOL_SPECS
+            if inspect.iscoroutinefunction(self.tools[spec.name])
+            for slot in spec.requires
+        }
+        self._feeds_async = {spec.name for spec in TOOL_SPECS if set(spec.provides) & async_inputs}
+        # One asyncio.Lock per Session: batch runs share a session, which must not
+        # be used from two worker threads at once.
+        self._db_locks: "weakref.WeakKeyDictionary[Session, asyncio.Lock]" = weakref.WeakKeyDictionary()
 
     def decide_next_tool(self, state: AgentState) -> Optional[str]:
-        if state.profile is None or not getattr(state.profile, "skills", []):
-            return "fetch_profile"
-
-        if not state.job_analysis:
-            return "analyze_job"
-
-        if state.fit_score is None:
-            return "score_fit"
-
-        # Resume selection: only if DB available, otherwise skip once
-        if state.selected_resume_id is None and not state.context.get("resume_selection_skipped"):
-            if state.constraints.get("db_available", False):
-                return "select_resume"
-            state.context["resume_selection_skipped"] = True
-
-        if state.apply_decision is None:
-            return "decide_apply_strategy"
-        if state.apply_decision == "skip":
-            return None
-
-        if "fields" not in state.context:
-            return "map_fields"
-
-        if not state.proposed_answers:
-            return "draft_answers"
-
-        if "portal" not in state.context:
-            return "detect_portal"
-
-        if "discovered_fields" not in state.context:
-            return "discover_fields"
-
-        if "canonical_field_map" not in state.context:
-            return "map_to_canonical"
-
-        if "fill_actions" not in state.context:
-            return "build_fill_actions"
-
-        if not state.context.get("missing_fields_checked"):
-            return "identify_missing_fields"
-
-        if not state.context.get("application_package"):
-            return "build_application_package"
-
-        return None
+        """First ready tool in canonical order (the old strict sequence)."""
+        ready = self.ready_tools(state)
+        return ready[0] if ready else None
+
+    def ready_tools(
+        self, state: AgentState, running: Iterable[str] = (), max_steps: Optional[int] = None
+    ) -> List[str]:
+        """
+        Tools whose inputs are filled and whose outputs are not, in canonical order.
+
+        With `max_steps`, budget is reserved for pending tools in canonical order,
+        so a tool only becomes ready if the strict sequence would have reached it.
+        """
+        running = set(running)
+        ready: List[str] = []
+        rank = 0
+        for spec in self.tool_specs.values():
+            if spec.name in running or self._tool_done(spec, state):
+                continue
+            if max_steps is not None and state.step + len(running) + rank >= max_steps:
+                break
+            rank += 1
+            if all(self._slot_filled(state, slot) for slot in spec.requires):
+                ready.append(spec.name)
+        return ready
+
+    def _reachable(self, tool: str, state: AgentState, max_steps: int) -> bool:
+        """Whether `tool` fits in the step budget once every pending tool before it has run."""
+        rank = 0
+        for spec in self.tool_specs.values():
+            if spec.name == tool:
+                return not self._tool_done(spec, state) and state.step + rank < max_steps
+            if not self._tool_done(spec, state):
+                rank += 1
+        return False
+
+    def _tool_done(self, spec: ToolSpec, state: AgentState) -> bool:
+        return all(self._slot_filled(state, slot) for slot in spec.provides)
+
+    def _slot_filled(self, state: AgentState, slot: str) -> bool:
+        if slot == "profile":
+            return state.profile is not None and bool(getattr(state.profile, "skills", []))
+        if slot == "job_analysis":
+            return bool(state.job_analysis)
+        if slot == "fit_score":
+            return state.fit_score is not None
+        if slot == "resume":
+            return state.selected_resume_id is not None or bool(state.context.get("resume_selection_skipped"))
+        if slot == "apply_decision":
+            return state.apply_decision is not None
+        if slot == "apply":
+            return state.apply_decision == "apply"
+        if slot == "answers":
+            return bool(state.proposed_answers)
+        if slot == "missing_fields":
+            return bool(state.context.get("missing_fields_checked"))
+        if slot == "application_package":
+            return bool(state.context.get("application_package"))
+        return slot in state.context
 
     def run(
         self,
@@ -117,18 +321,175 @@ class AgentOrchestrator:
         db: Optional[Session] = None,
         return_meta: bool = False,
         user_inputs: Optional[Dict[str, Any]] = None,
+        run_id: Optional[str] = None,
     ):
+        """Blocking wrapper around `arun` for sync callers (must not be called from a running loop)."""
+        return asyncio.run(
+            self.arun(
+                user_id=user_id,
+                goal=goal,
+                job_context=job_context,
+                user_profile=user_profile,
+                constraints=constraints,
+                db=db,
+                return_meta=return_meta,
+                user_inputs=user_inputs,
+                run_id=run_id,
+            )
+        )
+
+    async def arun(
+        self,
+        user_id: str,
+        goal: str,
+        job_context: Dict[str, Any],
+        user_profile: Optional[Profile],
+        constraints: Optional[Dict[str, Any]] = None,
+        db: Optional[Session] = None,
+        return_meta: bool = False,
+        user_inputs: Optional[Dict[str, Any]] = None,
+        run_id: Optional[str] = None,
+        preload: Optional[RunPreload] = None,
+        on_step: Optional[Callable[[AgentStep], Awaitable[None]]] = None,
+    ):
+        """
+        Run the agent loop; tools may be plain functions or coroutines.
+
+        With `run_id`, the run resumes from its last checkpoint and only redoes the
+        tools whose inputs changed; `max_steps` then budgets the resumed part.
+        `preload` (see `preload`/`arun_batch`) replaces the per-run profile,
+        fact and resume queries. `on_step` is awaited with every step as it
+        happens (execution order), so a slow consumer throttles the run.
+
+        `constraints["deadline_ms"]` (default AGENT_DEADLINE_MS, 0 = none) bounds
+        the run: async tools are cancelled at the deadline and the run finishes
+        with status "timeout" and whatever it produced so far.
+        """
         constraints = constraints or {}
         max_steps = constraints.get("max_steps", 6)
-        state = AgentState(
-            user_id=user_id,
-            goal=goal,
-            constraints=constraints,
-            profile=user_profile or store.profiles.get(user_id),
-            context=job_context or {},
-        )
+        deadline_ms = constraints.get("deadline_ms") or _env_int("AGENT_DEADLINE_MS", 0)
+        deadline = time.monotonic() + deadline_ms / 1000 if deadline_ms else None
+        state = self._resume(run_id, user_id, goal, job_context, constraints, user_inputs) if run_id else None
+        if state is not None:
+            max_steps += state.step
+        else:
+            if user_profile is None and preload is not None:
+                user_profile = preload.profile
+            state = AgentState(
+                user_id=user_id,
+                goal=goal,
+                constraints=constraints,
+                profile=user_profile or store.profiles.get(user_id),
+                context=job_context or {},
+            )
+            state.context["run_id"] = str(uuid.uuid4())
+            if constraints.get("reuse_near_duplicates", True):
+                self._reuse_near_duplicate(state)
+        state.preload = preload
+        state.deadline = deadline
+        state.constraints["db_available"] = db is not None
+        if db is None:
+            state.context.setdefault("resume_selection_skipped", True)
+
+        # Start the browser snapshot now rather than when discover_fields is reached.
+        page_url = state.context.get("page_url", "")
+        if self._reachable("discover_fields", state, max_steps) and browser_prefetcher.wanted(
+            page_url, state.context.get("page_html", "") or ""
+        ):
+            state.prefetch = browser_prefetcher.start(page_url)
+        try:
+            return await self._execute(state, db, max_steps, return_meta, user_inputs, on_step)
+        finally:
+            await browser_prefetcher.discard(state.prefetch)
+
+    def preload(self, user_id: str, user_profile: Optional[Profile] = None, db: Optional[Session] = None) -> RunPreload:
+        """Load the profile, user facts and resumes once for a batch of runs."""
+        preload = RunPreload(profile=user_profile or store.profiles.get(user_id))
         if db is not None:
-            facts = self._load_user_facts(db, user_id)
+            from app.models.db_models import Resume  # local import to avoid cycle
+
+            preload.facts = self._load_user_facts(db, user_id)
+            preload.resumes = [
+                ResumeSnapshot(id=r.id, resume_type=r.resume_type, parsed_json=r.parsed_json)
+                for r in db.query(Resume).filter(Resume.user_id == user_id).all()
+            ]
+        return preload
+
+    async def arun_batch(
+        self,
+        user_id: str,
+        goal: str,
+        job_contexts: List[Dict[str, Any]],
+        user_profile: Optional[Profile] = None,
+        constraints: Optional[Dict[str, Any]] = None,
+        db: Optional[Session] = None,
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Run one profile against many jobs; yields (index, (steps, answers, meta))
+        or (index, exception) in completion order.
+
+        At most `concurrency` runs are in flight (default: one per browser-pool
+        page slot), step logs go through the write-behind writer, and the
+        profile, facts and resumes are loaded once.
+        """
+        if concurrency is None:
+            pool_slots = browser_pool.size * browser_pool.max_contexts_per_browser
+            concurrency = _env_int("AGENT_BATCH_CONCURRENCY", max(4, pool_slots))
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        if db is not None:
+            preload = await self._in_db_thread(db, self.preload, user_id, user_profile, db)
+        else:
+            preload = self.preload(user_id, user_profile)
+
+        async def run_one(index: int, job_context: Dict[str, Any]) -> Tuple[int, Any]:
+            async with semaphore:
+                job_constraints = dict(constraints or {})
+                job_constraints.setdefault("step_log_write_behind", True)
+                try:
+                    return index, await self.arun(
+                        user_id=user_id,
+                        goal=goal,
+                        job_context=dict(job_context),
+                        user_profile=None,
+                        constraints=job_constraints,
+                        db=db,
+                        return_meta=True,
+                        preload=preload,
+                    )
+                except Exception as exc:  # noqa: BLE001 - one bad job must not sink the batch
+                    return index, exc
+
+        tasks = [asyncio.ensure_future(run_one(i, ctx)) for i, ctx in enumerate(job_contexts)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _execute(
+        self,
+        state: AgentState,
+        db: Optional[Session],
+        max_steps: int,
+        return_meta: bool,
+        user_inputs: Optional[Dict[str, Any]],
+        on_step: Optional[Callable[[AgentStep], Awaitable[None]]] = None,
+    ):
+        user_id, goal, constraints = state.user_id, state.goal, state.constraints
+
+        async def emit(new_steps: List[AgentStep]) -> None:
+            if on_step is not None:
+                for step in new_steps:
+                    await on_step(step)
+
+        if db is not None or state.preload is not None:
+            if state.preload is not None:
+                facts = state.preload.facts
+            else:
+                facts = await self._in_db_thread(db, self._load_user_facts, db, user_id)
             if facts:
                 state.context.setdefault("user_facts", {})
                 state.context["user_facts"].update(facts)
@@ -139,169 +500,129 @@ class AgentOrchestrator:
             state.context.update(user_inputs)
             state.context["missing_fields_checked"] = False
             if db is not None:
-                self._persist_user_facts(db, user_id, user_inputs)
+                await self._in_db_thread(db, self._persist_user_facts, db, user_id, user_inputs)
 
         if constraints and isinstance(constraints.get("user_inputs"), dict):
             state.context.setdefault("user_inputs", {})
             state.context["user_inputs"].update(constraints["user_inputs"])
 
-        state.constraints["db_available"] = db is not None
-        run_db_obj = None
+        # Step rows stay in memory and are written in one transaction at run end.
+        log: Optional[StepLogBuffer] = None
         if db is not None:
-            from app.models.db_models import AgentRun  # local import to avoid cycle
-            run_db_obj = AgentRun(
-                user_id=user_id,
-                goal=goal,
-                status="planning",
-                fit_score=None,
-                selected_resume_id=None,
+            write_behind = bool(constraints.get("step_log_write_behind", write_behind_default()))
+            log = StepLogBuffer(
+                db,
+                user_id,
+                goal,
+                write_behind=write_behind,
+                run_id=state.context["run_id"],
+                run_written=state.run_logged,
             )
-            db.add(run_db_obj)
-            db.commit()
-            db.refresh(run_db_obj)
-            state.context["run_id"] = str(run_db_obj.id)
-
-        steps: List[AgentStep] = []
-
-        while state.step < max_steps and not state.completed:
-            current_step = state.step + 1
-            tool = self.decide_next_tool(state)
-
-            if tool is None:
-                state.completed = True
-                state.status = "completed"
-                break
-
-            plan_details = {
-                "chosen_tool": tool,
-                "reason": self._reason_for_tool(tool, state),
-                "success_criteria": self._success_for_tool(tool),
-                "step": state.step,
-                "next_step": state.step + 1,
-                "current_step": state.step,
-                "tool": tool,
-            }
-            plan_step = AgentStep(name="plan", status="thinking", details=plan_details, tool=tool)
-            steps.append(plan_step)
-            self._log_step(db, run_db_obj, current_step, plan_step)
-
-            current_step = state.step + 1
-            try:
-                result = self.tools[tool](state, db=db)
-            except Exception as exc:  # noqa: BLE001
-                state.step = current_step
-                retries = state.retries.get(tool, 0) + 1
-                state.retries[tool] = retries
-                state.last_error = str(exc)
-                failed_step = AgentStep(
-                    name=tool,
-                    status="failed",
-                    details={"error": state.last_error, "retry": retries},
-                    tool=tool,
-                )
-                steps.append(failed_step)
-                self._log_step(db, run_db_obj, current_step, failed_step)
-                if retries > 1:
-                    state.status = "blocked"
-                    state.completed = True
-                continue
-
-            state.step = current_step
 
-            # Observe
-            state.observations.append(
-                {"step": current_step, "tool": tool, "result": result, "timestamp": datetime.utcnow().isoformat()}
-            )
-            state.actions.append(
-                {"step": current_step, "tool": tool, "inputs": self._inputs_for_tool(tool, state)}
-            )
-
-            # Update state
-            if "profile" in result:
-                state.profile = result["profile"]
-            if "context" in result:
-                state.context.update(result["context"])
-            if "answers" in result:
-                state.proposed_answers.update(result["answers"])
-            if "portal" in result:
-                state.portal = result["portal"]
-                state.context["portal"] = result["portal"]
-            if "discovered_fields" in result:
-                state.discovered_fields = result["discovered_fields"]
-                state.context["discovered_fields"] = result["discovered_fields"]
-            if "canonical_field_map" in result:
-                state.canonical_field_map = result["canonical_field_map"]
-                state.context["canonical_field_map"] = result["canonical_field_map"]
-            if "fill_actions" in result:
-                state.fill_actions = result["fill_actions"]
-                state.context["fill_actions"] = result["fill_actions"]
-            if "missing_fields" in result:
-                state.missing_fields = result["missing_fields"]
-                state.context["missing_fields_checked"] = True
-            if "application_package" in result:
-                state.context["application_package"] = result["application_package"]
-            if "selected_resume_id" in result and result.get("selected_resume_id"):
-                state.selected_resume_id = result["selected_resume_id"]
-
-            # Validation after map_fields
-            if tool == "map_fields":
-                job_desc = state.context.get("job_description", "")
-                if not job_desc or len(job_desc.strip()) < 20:
-                    state.last_error = "Job description missing or too short; need user input."
-                    state.status = "blocked"
-                    state.completed = True
-                    user_prompt = self._tool_request_user_input(state)
-                    steps.append(
-                        AgentStep(
-                            name="request_user_input",
-                            status="acted",
-                            details={
-                                "result": user_prompt.get("note", ""),
-                                "question": "Please paste the job description or key requirements.",
-                            },
-                            tool="request_user_input",
-                        )
-                    )
+        # (canonical index, launch sequence, steps of that tool call)
+        records: List[Tuple[int, int, List[AgentStep]]] = []
+        # task -> (tool, steps of that call, perf_counter at launch)
+        inflight: Dict[asyncio.Future, Tuple[str, List[AgentStep], float]] = {}
+        try:
+            while not state.completed:
+                if state.deadline is not None and time.monotonic() >= state.deadline:
+                    self._time_out(state)
                     break
-
-            if tool == "identify_missing_fields":
-                missing = state.context.get("missing_fields", [])
-                identify_step = AgentStep(
-                    name="identify_missing_fields",
-                    status="acted",
-                    details={"missing_fields": missing, "missing_count": len(missing)},
-                    tool="identify_missing_fields",
-                )
-                steps.append(identify_step)
-                self._log_step(db, run_db_obj, current_step, identify_step)
-                if missing:
-                    state.last_error = "Missing required fields; need user input."
-                    state.status = "blocked"
-                    state.completed = True
-                    next_questions = state.context.get("next_questions", [])
-                    user_step = AgentStep(
-                        name="request_user_input",
-                        status="acted",
-                        details={"result": "User input required to proceed.", "questions": next_questions},
-                        tool="request_user_input",
+                running = [tool for tool, _, _, _ in inflight.values()]
+                ready = self.ready_tools(state, running, max_steps)
+                inline: List[str] = []
+                launched = False
+                for tool in ready:
+                    if not inspect.iscoroutinefunction(self.tools[tool]):
+                        inline.append(tool)
+                        continue
+                    step_num, record = self._plan_step(tool, state, log)
+                    records.append((self._order[tool], len(records), record))
+                    inflight[asyncio.ensure_future(self._call_with_budget(tool, state, db))] = (
+                        tool,
+                        step_num,
+                        record,
+                        time.perf_counter(),
                     )
-                    steps.append(user_step)
-                    self._log_step(db, run_db_obj, current_step, user_step)
+                    launched = True
+                    await emit(record)
+                if launched:
+                    # Let new tasks reach their first I/O wait before inline tools hold the loop.
+                    await asyncio.sleep(0)
+
+                if inline:
+                    tool = min(inline, key=lambda name: (name not in self._feeds_async, self._order[name]))
+                    step_num, record = self._plan_step(tool, state, log)
+                    records.append((self._order[tool], len(records), record))
+                    await emit(record)
+                    started, cache = time.perf_counter(), "none"
+                    try:
+                        if db is not None and self.tool_specs[tool].uses_db:
+                            call = self._in_db_thread(db, self._call_memoized, tool, state, db)
+                            (result, cache), error = await call, None
+                        else:
+                            (result, cache), error = self._call_memoized(tool, state, db), None
+                    except Exception as exc:  # noqa: BLE001
+                        result, error = None, exc
+                    elapsed = time.perf_counter() - started
+                    self._observe(tool, step_num, result, error, record, state, log, duration_ms=elapsed * 1000)
+                    metrics.observe_tool(tool, elapsed, state.portal, cache, "failed" if error else "ok")
+                    self._save_checkpoint(state)
+                    await emit(record[1:])
+                    continue
+
+                if not inflight:
                     break
-            else:
-                note = "done"
-                if isinstance(result, dict):
-                    note = result.get("note") or result.get("result") or "done"
-
-                acted_step = AgentStep(
-                    name=tool,
-                    status="acted",
-                    details={"result": note},
-                    tool=tool,
+                done, _ = await asyncio.wait(list(inflight), return_when=asyncio.FIRST_COMPLETED)
+                # Same-tick completions merge in canonical order.
+                for task in sorted(done, key=lambda t: self._order[inflight[t][0]]):
+                    tool, step_num, record, started = inflight.pop(task)
+                    elapsed = time.perf_counter() - started
+                    error = task.exception()
+                    self._observe(
+                        tool,
+                        step_num,
+                        None if error else task.result(),
+                        error,
+                        record,
+                        state,
+                        log,
+                        duration_ms=elapsed * 1000,
+                    )
+                    metrics.observe_tool(tool, elapsed, state.portal, "none", "failed" if error else "ok")
+                    self._save_checkpoint(state)
+                    await emit(record[1:])
+                    if state.completed:
+                        break
+                if not state.completed and state.deadline is not None and time.monotonic() >= state.deadline:
+                    self._time_out(state)
+        except BaseException:
+            if log is not None:
+                # Keep the audit trail of a crashed or cancelled run.
+                log.update_run("failed", state.fit_score, state.selected_resume_id)
+                await self._in_db_thread(db, log.flush_quietly)
+            raise
+        finally:
+            for task in inflight:
+                task.cancel()
+            if inflight:
+                await asyncio.gather(*inflight, return_exceptions=True)
+            cancelled_steps = []
+            for tool, record, started in inflight.values():
+                elapsed = time.perf_counter() - started
+                record.append(
+                    AgentStep(
+                        name=tool,
+                        status="cancelled",
+                        details={"result": "Run finished first.", "duration_ms": round(elapsed * 1000, 2)},
+                        tool=tool,
+                    )
                 )
-                steps.append(acted_step)
-                self._log_step(db, run_db_obj, current_step, acted_step)
+                cancelled_steps.append(record[-1])
+                metrics.observe_tool(tool, elapsed, state.portal, "none", "cancelled")
+        await emit(cancelled_steps)
 
+        steps: List[AgentStep] = [step for _, _, record in sorted(records, key=lambda r: r[:2]) for step in record]
 
         if not state.completed:
             state.status = "completed"
@@ -309,27 +630,418 @@ class AgentOrchestrator:
 
         finish_step = AgentStep(
             name="finish",
-            status=state.status if state.status in {"completed", "blocked", "failed"} else "completed",
+            status=state.status if state.status in {"completed", "blocked", "failed", "timeout"} else "completed",
             details={"summary": "Agent loop finished", "last_error": state.last_error},
         )
+        if state.status == "timeout":
+            finish_step.details.update(
+                {
+                    "answers_drafted": len(state.proposed_answers),
+                    "fields_discovered": len(state.context.get("discovered_fields") or []),
+                }
+            )
         steps.append(finish_step)
-        self._log_step(db, run_db_obj, state.step + 1, finish_step)
+        self._log_step(log, self._next_step_num(state), finish_step)
+        await emit([finish_step])
 
-        if db is not None and run_db_obj is not None:
-            run_db_obj.status = state.status
-            run_db_obj.fit_score = state.fit_score
-            run_db_obj.selected_resume_id = state.selected_resume_id
-            db.add(run_db_obj)
-            db.commit()
+        if log is not None:
+            log.update_run(state.status, state.fit_score, state.selected_resume_id)
+            await self._in_db_thread(db, log.flush)
+            state.run_logged = log.run_written
+        self._save_checkpoint(state)
+        metrics.observe_run(state.status)
+        self._remember_job(state)
 
         meta = {
             "missing_fields": state.context.get("missing_fields", []),
             "next_questions": state.context.get("next_questions", []),
+            "run_id": state.context["run_id"],
+            "status": state.status,
+            "near_duplicate_of": state.context.get("near_duplicate_of"),
         }
         if return_meta:
             return steps, state.proposed_answers, meta
         return steps, state.proposed_answers
 
+    def _checkpoint_payload(self, state: AgentState) -> Dict[str, Any]:
+        # portal/discovered_fields/fill_actions/canonical_field_map mirror context keys.
+        payload = {name: getattr(state, name) for name in CHECKPOINT_FIELDS}
+        payload["user_id"] = str(state.user_id)
+        payload["profile"] = asdict(state.profile) if state.profile is not None else None
+        payload["constraints"] = {k: v for k, v in state.constraints.items() if k != "db_available"}
+        return payload
+
+    def _save_checkpoint(self, state: AgentState) -> None:
+        checkpoint_store.save(state.context["run_id"], self._checkpoint_payload(state))
+
+    def _resume(
+        self,
+        run_id: str,
+        user_id: str,
+        goal: str,
+        job_context: Optional[Dict[str, Any]],
+        constraints: Dict[str, Any],
+        user_inputs: Optional[Dict[str, Any]],
+    ) -> Optional[AgentState]:
+        """Restore a checkpointed run and invalidate what the new request changes."""
+        payload = checkpoint_store.load(run_id)
+        if payload is None or payload.get("user_id") != str(user_id):
+            return None
+
+        profile = payload.pop("profile", None)
+        if profile is not None:
+            updated_at = profile.pop("updated_at", None)
+            profile = Profile(**profile)
+            if updated_at:
+                profile.updated_at = datetime.fromisoformat(updated_at)
+        context = payload["context"]
+        state = AgentState(
+            user_id=user_id,
+            goal=goal,
+            constraints=constraints,
+            profile=profile or store.profiles.get(user_id),
+            context=context,
+        )
+        for name in CHECKPOINT_FIELDS:
+            if name not in ("user_id", "goal", "context") and name in payload:
+                setattr(state, name, payload[name])
+        state.portal = context.get("portal")
+        state.discovered_fields = context.get("discovered_fields", [])
+        state.canonical_field_map = context.get("canonical_field_map", {})
+        state.fill_actions = context.get("fill_actions", [])
+
+        changed = set()
+        for key, value in (job_context or {}).items():
+            if context.get(key) != value:
+                context[key] = value
+                changed.add(key)
+        if user_inputs:
+            changed.add("user_inputs")
+        if self._output_constraints(payload["constraints"]) != self._output_constraints(constraints):
+            changed.add("constraints")
+        self.invalidate(state, changed)
+
+        state.completed = False
+        state.status = "planning"
+        state.last_error = None
+        state.retries = {}
+        return state
+
+    def _output_constraints(self, constraints: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in constraints.items() if k not in RUN_ONLY_CONSTRAINTS}
+
+    def _reuse_near_duplicate(self, state: AgentState) -> None:
+        """
+        Seed a new run from an earlier run on a near-duplicate JD (a repost under
+        another portal or URL): its job_analysis always, its fit score when the
+        profile skills match, and its drafted answers when the constraints do too.
+        """
+        skills = sorted(getattr(state.profile, "skills", []) or [])
+        constraints = self._output_constraints(state.constraints)
+
+        def reusable(prior: Dict[str, Any]) -> Tuple[bool, bool]:
+            same_profile = prior["user_id"] == str(state.user_id) and bool(skills) and prior["skills"] == skills
+            return same_profile, same_profile and prior["constraints"] == constraints
+
+        # Prefer the earlier run that covers the most tools, then the most similar JD.
+        matches = job_dedup.query(state.context.get("job_description") or "")
+        if not matches:
+            return
+        match = max(matches, key=lambda m: (reusable(m.payload), m.similarity))
+        prior = match.payload
+        same_profile, same_constraints = reusable(prior)
+        state.job_analysis = dict(prior["job_analysis"])
+        reused = ["job_analysis"]
+        if same_profile and prior["fit_score"] is not None:
+            state.fit_score = prior["fit_score"]
+            reused.append("fit_score")
+        if same_constraints and prior["answers"]:
+            state.proposed_answers = dict(prior["answers"])
+            reused.append("answers")
+        state.context["near_duplicate_of"] = {
+            "run_id": prior["run_id"],
+            "similarity": round(match.similarity, 3),
+            "reused": reused,
+        }
+
+    def _remember_job(self, state: AgentState) -> None:
+        if not state.job_analysis or state.status in {"failed", "timeout"}:
+            return
+        reused = (state.context.get("near_duplicate_of") or {}).get("reused") or []
+        if {"job_analysis", "fit_score", "answers"} <= set(reused):
+            return  # nothing new: the earlier run's entry already covers it
+        job_dedup.add(
+            state.context.get("job_description") or "",
+            payload={
+                "run_id": state.context["run_id"],
+                "user_id": str(state.user_id),
+                "skills": sorted(getattr(state.profile, "skills", []) or []),
+                "job_analysis": state.job_analysis,
+                "fit_score": state.fit_score,
+                "answers": dict(state.proposed_answers),
+                "constraints": self._output_constraints(state.constraints),
+            },
+        )
+
+    def invalidate(self, state: AgentState, changed: Iterable[str]) -> List[str]:
+        """Clear the outputs of tools reading any of `changed`, and of everything downstream."""
+        changed = set(changed)
+        stale_slots: set = set()
+        stale: List[str] = []
+        for spec in self.tool_specs.values():  # canonical order is a topological order
+            # "apply" is a gate on the apply_decision slot.
+            requires = {"apply_decision" if slot == "apply" else slot for slot in spec.requires}
+            if changed & set(spec.inputs) or requires & stale_slots:
+                stale.append(spec.name)
+                stale_slots.update(spec.provides)
+        for slot in stale_slots:
+            self._clear_slot(state, slot)
+        return stale
+
+    def _clear_slot(self, state: AgentState, slot: str) -> None:
+        if slot == "profile":
+            state.profile = None
+        elif slot == "job_analysis":
+            state.job_analysis = {}
+        elif slot == "fit_score":
+            state.fit_score = None
+        elif slot == "resume":
+            state.selected_resume_id = None
+            state.context.pop("resume_selection_skipped", None)
+        elif slot == "apply_decision":
+            state.apply_decision = None
+        elif slot == "answers":
+            state.proposed_answers = {}
+        elif slot == "missing_fields":
+            state.missing_fields = []
+            for key in ("missing_fields_checked", "missing_fields", "next_questions"):
+                state.context.pop(key, None)
+        else:
+            state.context.pop(slot, None)
+            if slot == "portal":
+                state.portal = None
+            elif slot == "discovered_fields":
+                state.discovered_fields = []
+            elif slot == "canonical_field_map":
+                state.canonical_field_map = {}
+            elif slot == "fill_actions":
+                state.fill_actions = []
+
+    def _time_out(self, state: AgentState) -> None:
+        state.status = "timeout"
+        state.completed = True
+        state.last_error = "Run deadline exceeded; returning partial results."
+
+    async def _in_db_thread(self, db: Session, fn: Callable[..., Any], *args: Any) -> Any:
+        """Sync SQLAlchemy work off the event loop, one call at a time per session."""
+        lock = self._db_locks.get(db)
+        if lock is None:
+            lock = self._db_locks[db] = asyncio.Lock()
+        async with lock:
+            return await asyncio.to_thread(fn, *args)
+
+    async def _call_with_budget(self, tool: str, state: AgentState, db: Optional[Session]) -> Dict[str, Any]:
+        """Await an async tool, cancelled at the earlier of its budget and the run deadline."""
+        budgets = state.constraints.get("tool_budgets_ms") or {}
+        budget_ms = budgets.get(tool, self.tool_specs[tool].budget_ms)
+        deadlines = [d for d in (state.deadline,) if d is not None]
+        if budget_ms:
+            deadlines.append(time.monotonic() + budget_ms / 1000)
+        if not deadlines:
+            return await self.tools[tool](state, db=db)
+        deadline = state.tool_deadlines[tool] = min(deadlines)
+        try:
+            return await asyncio.wait_for(self.tools[tool](state, db=db), timeout=max(0.0, _seconds_left(deadline)))
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"{tool} cancelled after exceeding its time budget") from None
+        finally:
+            state.tool_deadlines.pop(tool, None)
+
+    def _call_memoized(self, tool: str, state: AgentState, db: Optional[Session]) -> Tuple[Dict[str, Any], str]:
+        """Returns the tool result and its cache outcome ("hit", "miss" or "none" if not memoized)."""
+        spec = self.tool_specs[tool]
+        if spec.memo is None or not tool_cache.enabled:
+            return self.tools[tool](state, db=db), "none"
+        key = tool_cache.key(tool, spec.version, spec.memo(state))
+        hit, result = tool_cache.get(tool, key)
+        if not hit:
+            result = self.tools[tool](state, db=db)
+            tool_cache.put(tool, key, result)
+        return result, "hit" if hit else "miss"
+
+    async def _discover_with(self, adapter: Any, url: str, page: Any) -> List[DiscoveredField]:
+        """
+        adapter.discover_fields memoized on (adapter, version, url, page content hash);
+        large pages are parsed in a worker process.
+        """
+        if not page:
+            return adapter.discover_fields(url, page)
+        version = getattr(adapter, "version", None)
+        if not tool_cache.enabled or version is None:
+            # An adapter without a version could serve stale fields after a code change: never cache it.
+            return await discovery_workers.discover(adapter, url, page)
+        name = f"discover_fields.{getattr(adapter, 'name', 'generic')}"
+        key = tool_cache.key(name, version, [url, page.content_hash])
+        hit, fields = tool_cache.get(name, key)
+        if not hit:
+            fields = await discovery_workers.discover(adapter, url, page)
+            tool_cache.put(name, key, fields)
+        return fields
+
+    @staticmethod
+    def _next_step_num(state: AgentState) -> int:
+        # Older checkpoints only carry `step`; never hand out a number already logged.
+        state.step_num = max(state.step_num, state.step) + 1
+        return state.step_num
+
+    def _plan_step(
+        self, tool: str, state: AgentState, log: Optional[StepLogBuffer]
+    ) -> Tuple[int, List[AgentStep]]:
+        """Number the call in launch order; the plan and the tool's result steps share that number."""
+        step_num = self._next_step_num(state)
+        plan_details = {
+            "chosen_tool": tool,
+            "reason": self._reason_for_tool(tool, state),
+            "success_criteria": self._success_for_tool(tool),
+            "step": step_num,
+            "next_step": step_num + 1,
+            "current_step": step_num,
+            "tool": tool,
+        }
+        plan_step = AgentStep(name="plan", status="thinking", details=plan_details, tool=tool)
+        self._log_step(log, step_num, plan_step)
+        return step_num, [plan_step]
+
+    def _observe(
+        self,
+        tool: str,
+        step_num: int,
+        result: Optional[Dict[str, Any]],
+        error: Optional[BaseException],
+        record: List[AgentStep],
+        state: AgentState,
+        log: Optional[StepLogBuffer],
+        duration_ms: Optional[float] = None,
+    ) -> None:
+        """Merge one finished tool call into the state and append its steps to `record`."""
+        timing = {"duration_ms": round(duration_ms, 2)} if duration_ms is not None else {}
+        current_step = step_num
+        state.step += 1  # tool calls finished, for max_steps
+        if error is not None:
+            retries = state.retries.get(tool, 0) + 1
+            state.retries[tool] = retries
+            state.last_error = str(error)
+            failed_step = AgentStep(
+                name=tool,
+                status="failed",
+                details={"error": state.last_error, "retry": retries, **timing},
+                tool=tool,
+            )
+            record.append(failed_step)
+            self._log_step(log, current_step, failed_step)
+            if retries > 1:
+                state.status = "blocked"
+                state.completed = True
+            return
+
+        # Observe
+        state.observations.append(
+            {"step": current_step, "tool": tool, "result": result, "timestamp": datetime.utcnow().isoformat()}
+        )
+        state.actions.append(
+            {"step": current_step, "tool": tool, "inputs": self._inputs_for_tool(tool, state)}
+        )
+
+        # Update state
+        if "profile" in result:
+            state.profile = result["profile"]
+        if "context" in result:
+            state.context.update(result["context"])
+        if "job_analysis" in result:
+            state.job_analysis = result["job_analysis"]
+        if "fit_score" in result:
+            state.fit_score = result["fit_score"]
+        if "decision" in result:
+            state.apply_decision = result["decision"]
+            if result["decision"] == "skip":
+                state.status = "skipped"
+                state.completed = True
+        if "answers" in result:
+            state.proposed_answers.update(result["answers"])
+        if "portal" in result:
+            state.portal = result["portal"]
+            state.context["portal"] = result["portal"]
+        if "discovered_fields" in result:
+            state.discovered_fields = result["discovered_fields"]
+            state.context["discovered_fields"] = result["discovered_fields"]
+        if "canonical_field_map" in result:
+            state.canonical_field_map = result["canonical_field_map"]
+            state.context["canonical_field_map"] = result["canonical_field_map"]
+        if "fill_actions" in result:
+            state.fill_actions = result["fill_actions"]
+            state.context["fill_actions"] = result["fill_actions"]
+        if "missing_fields" in result:
+            state.missing_fields = result["missing_fields"]
+            state.context["missing_fields_checked"] = True
+        if "application_package" in result:
+            state.context["application_package"] = result["application_package"]
+        if "selected_resume_id" in result and result.get("selected_resume_id"):
+            state.selected_resume_id = result["selected_resume_id"]
+
+        # Validation after map_fields
+        if tool == "map_fields":
+            job_desc = state.context.get("job_description", "")
+            if not job_desc or len(job_desc.strip()) < 20:
+                state.last_error = "Job description missing or too short; need user input."
+                state.status = "blocked"
+                state.completed = True
+                user_prompt = self._tool_request_user_input(state)
+                record.append(
+                    AgentStep(
+                        name="request_user_input",
+                        status="acted",
+                        details={
+                            "result": user_prompt.get("note", ""),
+                            "question": "Please paste the job description or key requirements.",
+                            **timing,
+                        },
+                        tool="request_user_input",
+                    )
+                )
+                return
+
+        if tool == "identify_missing_fields":
+            missing = state.context.get("missing_fields", [])
+            identify_step = AgentStep(
+                name="identify_missing_fields",
+                status="acted",
+                details={"missing_fields": missing, "missing_count": len(missing), **timing},
+                tool="identify_missing_fields",
+            )
+            record.append(identify_step)
+            self._log_step(log, current_step, identify_step)
+            if missing:
+                state.last_error = "Missing required fields; need user input."
+                state.status = "blocked"
+                state.completed = True
+                next_questions = state.context.get("next_questions", [])
+                user_step = AgentStep(
+                    name="request_user_input",
+                    status="acted",
+                    details={"result": "User input required to proceed.", "questions": next_questions},
+                    tool="request_user_input",
+                )
+                record.append(user_step)
+                self._log_step(log, current_step, user_step)
+            return
+
+        note = "done"
+        if isinstance(result, dict):
+            note = result.get("note") or result.get("result") or "done"
+        acted_step = AgentStep(name=tool, status="acted", details={"result": note, **timing}, tool=tool)
+        record.append(acted_step)
+        self._log_step(log, current_step, acted_step)
+
     def _reason_for_tool(self, tool: str, state: AgentState) -> str:
         if tool == "fetch_profile":
             return "Profile missing or lacks skills."
@@ -429,41 +1141,7 @@ class AgentOrchestrator:
     def _canonical_key_for_field(self, field: Dict[str, Any]) -> Optional[str]:
         if hasattr(field, "dict"):
             field = field.dict()
-
-        def normalize(text: Optional[str]) -> str:
-            return (text or "").strip().lower()
-
-        haystack = " ".join(
-            [
-                normalize(field.get("label")),
-                normalize(field.get("raw_name")),
-                normalize(field.get("placeholder")),
-                normalize(field.get("type")),
-            ]
-        )
-        if "cover letter" in haystack:
-            return "cover_letter"
-        if "skill" in haystack:
-            return "key_skills"
-        if "experience" in haystack or "years" in haystack:
-            return "years_experience"
-        if "work authorization" in haystack or "authorized" in haystack:
-            return "work_authorization"
-        if "visa" in haystack or "sponsorship" in haystack:
-            return "visa_sponsorship"
-        if "relocation" in haystack or "relocate" in haystack:
-            return "relocation"
-        if "notice" in haystack:
-            return "notice_period"
-        if "salary" in haystack or "compensation" in haystack:
-            return "expected_salary"
-        if "location" in haystack or "city" in haystack:
-            return "location"
-        if "linkedin" in haystack:
-            return "linkedin"
-        if "github" in haystack:
-            return "github"
-        return None
+        return canonical_field_classifier.key_for(field)
 
     def _tool_fetch_profile(self, state: AgentState, db: Optional[Session] = None) -> Dict[str, Any]:
         profile = state.profile
@@ -476,9 +1154,9 @@ class AgentOrchestrator:
         job_desc = state.context.get("job_description", "")
         seed_skills = []
 
-        jd_lower = job_desc.lower()
-        for kw in ["python", "fastapi", "sql", "docker", "rest", "postgresql"]:
-            if kw in jd_lower:
+        found = set(analyze_jd(job_desc).skills)
+        for kw in PROFILE_SEED_SKILLS:
+            if kw in found:
                 seed_skills.append(kw.upper() if kw == "sql" else kw)
 
         profile = profile or Profile(user_id=state.user_id, skills=seed_skills)
@@ -487,16 +1165,14 @@ class AgentOrchestrator:
 
 
     def _tool_map_fields(self, state: AgentState, db: Optional[Session] = None) -> Dict[str, Any]:
-        context = dict(state.context)
-        job_desc = context.get("job_description", "")
+        job_desc = state.context.get("job_description", "")
         fields = {
             "cover_letter": "cover_letter",
             "key_skills": "key_skills",
             "years_experience": "years_experience",
         }
-        context["fields"] = fields
         note = f"Mapped fields for job description length {len(job_desc)}."
-        return {"context": context, "note": note}
+        return {"context": {"fields": fields}, "note": note}
 
     def _tool_draft_answers(self, state: AgentState, db: Optional[Session] = None) -> Dict[str, Any]:
         fields = state.context.get("fields", {})
@@ -516,35 +1192,22 @@ class AgentOrchestrator:
         return {"note": note}
 
     def _tool_analyze_job(self, state: AgentState, db: Optional[Session] = None) -> Dict[str, Any]:
-        jd = (state.context.get("job_description") or "").lower()
-        must_have = []
-        nice_to_have = []
-        keywords = []
+        jd = analyze_jd(state.context.get("job_description") or "")
         seniority = "mid"
 
-        heuristics_must = ["python", "fastapi", "sql", "postgres", "machine learning", "ml", "data"]
-        heuristics_nice = ["aws", "gcp", "azure", "docker", "kubernetes", "llm", "langchain", "vector"]
-
-        for term in heuristics_must:
-            if term in jd:
-                must_have.append(term)
-        for term in heuristics_nice:
-            if term in jd:
-                nice_to_have.append(term)
+        # Whole-word, alias-aware: "ml" no longer matches "html", "k8s" counts as kubernetes.
+        found = set(jd.skills)
+        must_have = [term for term in MUST_HAVE_SKILLS if term in found]
+        nice_to_have = [term for term in NICE_TO_HAVE_SKILLS if term in found]
 
         keywords = list(set(must_have + nice_to_have))
 
-        import re
-
-        years_matches = re.findall(r"(\\d+)\\+?\\s*years", jd)
-        if years_matches:
-            max_years = max(int(y) for y in years_matches)
+        if jd.years:
+            max_years = max(jd.years)
             if max_years >= 8:
                 seniority = "senior"
             elif max_years <= 2:
                 seniority = "junior"
-            else:
-                seniority = "mid"
 
         job_analysis = {
             "must_have_skills": must_have,
@@ -552,39 +1215,18 @@ class AgentOrchestrator:
             "keywords": keywords,
             "seniority_guess": seniority,
         }
-        state.job_analysis = job_analysis
         return {"note": "Analyzed job description.", "job_analysis": job_analysis}
 
     def _tool_score_fit(self, state: AgentState, db: Optional[Session] = None) -> Dict[str, Any]:
-        profile_skills = [s.lower() for s in getattr(state.profile, "skills", []) or []]
-        must_have = [s.lower() for s in state.job_analysis.get("must_have_skills", [])]
-        nice_to_have = [s.lower() for s in state.job_analysis.get("nice_to_have_skills", [])]
-
-        must_hits = sum(1 for s in must_have if s in profile_skills)
-        nice_hits = sum(1 for s in nice_to_have if s in profile_skills)
-
-        must_total = max(len(must_have), 1)
-        nice_total = max(len(nice_to_have), 1)
-
-        score = (2 * (must_hits / must_total) + (nice_hits / nice_total)) / 3
-        score = max(0.0, min(1.0, score))
-        state.fit_score = score
-
-        reasons = {
-            "must_have_hit": must_hits,
-            "must_have_total": len(must_have),
-            "nice_have_hit": nice_hits,
-            "nice_have_total": len(nice_to_have),
-        }
+        must_bits = skill_interner.bits(state.job_analysis.get("must_have_skills", []))
+        nice_bits = skill_interner.bits(state.job_analysis.get("nice_to_have_skills", []))
+        profile_bits = skill_interner.bits(getattr(state.profile, "skills", []) or [])
+        score, reasons = fit_score(profile_bits, must_bits, nice_bits)
         return {"note": f"Computed fit score {score:.2f}.", "fit_score": score, "reasons": reasons}
 
     def _tool_decide_apply_strategy(self, state: AgentState, db: Optional[Session] = None) -> Dict[str, Any]:
         threshold = float(state.constraints.get("min_fit_score", 0.6))
         decision = "apply" if (state.fit_score or 0) >= threshold else "skip"
-        state.apply_decision = decision
-        if decision == "skip":
-            state.status = "skipped"
-            state.completed = True
         return {"note": f"Decision: {decision} (threshold {threshold}).", "decision": decision, "threshold": threshold}
 
 
@@ -635,13 +1277,14 @@ class AgentOrchestrator:
                     }
                 )
 
-        state.missing_fields = missing_fields
         if not missing_fields:
             return {
                 "context": {"missing_fields_checked": True, "missing_fields": []},
+                "missing_fields": [],
                 "note": "No missing fields.",
             }
         return {
+            "missing_fields": missing_fields,
             "context": {
                 "missing_fields_checked": True,
                 "missing_fields": missing_fields,
@@ -661,76 +1304,121 @@ class AgentOrchestrator:
             "discovered_fields": state.context.get("discovered_fields", []),
             "fill_actions": state.context.get("fill_actions", []),
         }
-        state.context["application_package"] = package
         return {"note": "Prepared application package.", "application_package": package}
 
     def _tool_detect_portal(self, state: AgentState, db: Optional[Session] = None) -> Dict[str, Any]:
         url = state.context.get("page_url", "")
-        html = state.context.get("page_html", "")
-        adapter = pick_adapter(url, html)
+        page = parse_page(state.context.get("page_html", ""))
+        adapter = pick_adapter(url, page)
         portal_name = getattr(adapter, "name", "generic")
         return {"note": f"Detected portal: {portal_name}", "portal": portal_name}
 
-    def _tool_discover_fields(self, state: AgentState, db: Optional[Session] = None) -> Dict[str, Any]:
-        import asyncio
-
-        from app.services.portals.browser_fetch import fetch_html_with_playwright, looks_like_js_shell
-
+    async def _tool_discover_fields(self, state: AgentState, db: Optional[Session] = None) -> Dict[str, Any]:
         url = state.context.get("page_url", "")
         html = state.context.get("page_html", "") or ""
+        # Parsed once here; detect_portal/build_fill_actions hit the same cached page.
+        page = parse_page(html)
+
+        adapter = pick_adapter(url, page)
+        portal = getattr(adapter, "name", "generic")
+
+        # 1) Static parse of the supplied page_html
+        started = time.perf_counter()
+        fields = [field.dict() for field in await self._discover_with(adapter, url, page)]
+        discovery_planner.record(url, STATIC, (time.perf_counter() - started) * 1000, len(fields))
+        used, static_count = STATIC, len(fields)
+
+        # 2) Short of the target: cheapest other path likely to reach it (schema, portal API, browser)
+        notes: List[str] = []
+        context_updates: Dict[str, Any] = {}
+        if len(fields) < discovery_planner.min_fields:
+            for path in discovery_planner.plan(url, discovery_planner.available(url, page, portal)):
+                # Leave time to return what we have if this path would overrun the budget.
+                left = _seconds_left(state.tool_deadlines.get("discover_fields"))
+                if left is not None:
+                    left -= DISCOVER_RETURN_RESERVE_S
+                    if left <= 0:
+                        notes.append(f"{path}: skipped, no time left")
+                        break
+                started = time.perf_counter()
+                try:
+                    found, found_portal, updates, note = await asyncio.wait_for(
+                        self._discover_via(path, state, url), timeout=left
+                    )
+                except asyncio.TimeoutError:
+                    found, found_portal, updates, note = [], portal, {}, "timed out"
+                except Exception as exc:  # noqa: BLE001 - fall through to the next path
+                    found, found_portal, updates, note = [], portal, {}, f"failed: {exc}"
+                discovery_planner.record(url, path, (time.perf_counter() - started) * 1000, len(found))
+                notes.append(f"{path}: {note}")
+                if path == BROWSER and updates:
+                    # Rendered: learn whether this host/path needs the browser at all.
+                    capability_cache.record(url, static_count, len(found))
+                # A rendered snapshot replaces a shell page even when it yields no more fields.
+                if (found or (path == BROWSER and updates)) and len(found) >= len(fields):
+                    fields, portal, used, context_updates = found, found_portal, path, updates
+                    if path != CACHED_SCHEMA and len(found) >= discovery_planner.min_fields:
+                        discovery_planner.remember_schema(url, found_portal, found)
+                if len(fields) >= discovery_planner.min_fields:
+                    break
 
-        adapter = pick_adapter(url, html)
-
-        # 1) Try normal discovery first
-        fields = adapter.discover_fields(url, html)
-
-        # 2) Decide whether to retry with Playwright (discovery-only)
-        should_retry = False
-        if getattr(adapter, "name", "") == "workday":
-            should_retry = True
-        if len(fields) < 3 and looks_like_js_shell(html):
-            should_retry = True
-
-        browser_note = None
-        if should_retry:
-            snap = asyncio.run(fetch_html_with_playwright(url))
-            browser_note = snap.notes
-            if snap.used_browser and snap.html:
-                # Re-pick adapter because final HTML may contain signals
-                adapter2 = pick_adapter(snap.final_url or url, snap.html)
-                fields2 = adapter2.discover_fields(snap.final_url or url, snap.html)
-
-                # Use browser results if better
-                if len(fields2) >= len(fields):
-                    fields = fields2
-                    state.context["page_html"] = snap.html
-                    state.context["page_url"] = snap.final_url or url
-                    adapter = adapter2
-                    state.context["portal"] = getattr(adapter2, "name", state.context.get("portal"))
-
-        serialized = [field.dict() for field in fields]
-
-        note = f"Discovered {len(serialized)} fields using {getattr(adapter, 'name', 'generic')}."
-        if browser_note:
-            note += f" Browser: {browser_note}"
-
-        return {"note": note, "discovered_fields": serialized}
-
+        note = f"Discovered {len(fields)} fields using {portal} ({used})."
+        if notes:
+            note += " " + "; ".join(notes)
+
+        result: Dict[str, Any] = {"note": note, "discovered_fields": fields}
+        if context_updates:
+            result["context"] = context_updates
+        return result
+
+    async def _discover_via(
+        self, path: str, state: AgentState, url: str
+    ) -> Tuple[List[Dict[str, Any]], str, Dict[str, Any], str]:
+        """(fields, portal, context updates, note) from one non-static discovery path."""
+        if path == CACHED_SCHEMA:
+            cached = discovery_planner.cached_schema(url)
+            if cached is None:
+                return [], "generic", {}, "expired"
+            portal, fields = cached
+            return [dict(field) for field in fields], portal, {"portal": portal}, "hit"
+
+        if path == PORTAL_API:
+            found = await asyncio.to_thread(fetch_board_questions, url)
+            fields = [field.dict() for field in found or []]
+            return fields, "greenhouse", {"portal": "greenhouse"}, f"{len(fields)} questions"
+
+        snap = await browser_prefetcher.take(state.prefetch, url)
+        if not (snap.used_browser and snap.html):
+            return [], "generic", {}, snap.notes
+        # Re-pick adapter because final HTML may contain signals
+        final_url = snap.final_url or url
+        snap_page = parse_page(snap.html)
+        adapter = pick_adapter(final_url, snap_page)
+        portal = getattr(adapter, "name", state.context.get("portal"))
+        fields = [field.dict() for field in await self._discover_with(adapter, final_url, snap_page)]
+        return fields, portal, {"page_html": snap.html, "page_url": final_url, "portal": portal}, snap.notes
 
     def _tool_map_to_canonical(self, state: AgentState, db: Optional[Session] = None) -> Dict[str, Any]:
-        discovered = state.context.get("discovered_fields", [])
+        discovered = [
+            field.dict() if isinstance(field, DiscoveredField) else field
+            for field in state.context.get("discovered_fields", [])
+        ]
         canonical_map: Dict[str, str] = {}
-        for field in discovered:
-            field_dict = field.dict() if isinstance(field, DiscoveredField) else field
-            key = self._canonical_key_for_field(field_dict)
-            if key:
-                canonical_map[str(field_dict.get("field_id"))] = key
-        return {"note": "Mapped fields to canonical keys.", "canonical_field_map": canonical_map}
+        evidence: Dict[str, Dict[str, str]] = {}
+        for field_dict, match in zip(discovered, canonical_field_classifier.classify_many(discovered)):
+            if match:
+                field_id = str(field_dict.get("field_id"))
+                canonical_map[field_id] = match.key
+                evidence[field_id] = {"pattern": match.pattern, "attribute": match.attribute}
+        return {
+            "note": "Mapped fields to canonical keys.",
+            "canonical_field_map": canonical_map,
+            "evidence": evidence,
+        }
 
     def _tool_build_fill_actions(self, state: AgentState, db: Optional[Session] = None) -> Dict[str, Any]:
         url = state.context.get("page_url", "")
-        html = state.context.get("page_html", "")
-        adapter = pick_adapter(url, html)
+        adapter = pick_adapter(url, parse_page(state.context.get("page_html", "")))
         fields = []
         for field in state.context.get("discovered_fields", []):
             if isinstance(field, DiscoveredField):
@@ -745,7 +1433,8 @@ class AgentOrchestrator:
         return {"note": f"Built {len(serialized)} fill actions.", "fill_actions": serialized}
 
     def _tool_select_resume(self, state: AgentState, db: Optional[Session] = None) -> Dict[str, Any]:
-        if db is None:
+        preloaded = state.preload.resumes if state.preload is not None else None
+        if db is None and preloaded is None:
             return {
                 "context": {"resume_selection_skipped": True},
                 "note": "DB not provided; skipping resume selection.",
@@ -753,27 +1442,31 @@ class AgentOrchestrator:
 
         from app.models.db_models import Resume  # local import to avoid cycle
 
-        resumes = (
-            db.query(Resume)
-            .filter(Resume.user_id == state.user_id)
-            .all()
-        )
+        if preloaded is not None:
+            resumes = preloaded
+        else:
+            resumes = (
+                db.query(Resume)
+                .filter(Resume.user_id == state.user_id)
+                .all()
+            )
         if not resumes:
-            return {"note": "No resumes found; skipping selection."}
+            return {
+                "context": {"resume_selection_skipped": True},
+                "note": "No resumes found; skipping selection.",
+            }
 
-        must_have = [s.lower() for s in state.job_analysis.get("must_have_skills", [])]
-        nice_to_have = [s.lower() for s in state.job_analysis.get("nice_to_have_skills", [])]
+        must_bits = skill_interner.bits(state.job_analysis.get("must_have_skills", []))
+        nice_bits = skill_interner.bits(state.job_analysis.get("nice_to_have_skills", []))
         target_type = (state.constraints or {}).get("target_resume_type")
 
         def score_resume(resume: Resume) -> float:
             parsed = resume.parsed_json or {}
-            skills = [s.lower() for s in parsed.get("skills", [])] if isinstance(parsed, dict) else []
+            skills = parsed.get("skills", []) if isinstance(parsed, dict) else []
             text_blobs = " ".join(parsed.get("projects", []) if isinstance(parsed, dict) else [])
-            if isinstance(text_blobs, list):
-                text_blobs = " ".join(text_blobs)
-            text_lower = text_blobs.lower() if text_blobs else ""
-            must_hits = sum(1 for s in must_have if s in skills or s in text_lower)
-            nice_hits = sum(1 for s in nice_to_have if s in skills or s in text_lower)
+            resume_bits = skill_interner.bits(skills) | skill_interner.text_bits(text_blobs)
+            must_hits = (resume_bits & must_bits).bit_count()
+            nice_hits = (resume_bits & nice_bits).bit_count()
             base = 2 * must_hits + nice_hits
             if target_type and resume.resume_type and resume.resume_type.lower() == str(target_type).lower():
                 base += 1.5
@@ -788,30 +1481,17 @@ class AgentOrchestrator:
                 best_score = s
 
         if best:
-            state.selected_resume_id = str(best.id)
             return {
                 "note": f"Selected resume {best.id}",
                 "selected_resume_id": str(best.id),
                 "score": best_score,
                 "resume_type": best.resume_type,
             }
-        return {"note": "Unable to select a resume."}
+        return {"context": {"resume_selection_skipped": True}, "note": "Unable to select a resume."}
 
-    def _log_step(self, db: Optional[Session], run_db_obj: Any, step_num: int, step: AgentStep) -> None:
-        if db is None or run_db_obj is None:
-            return
-        from app.models.db_models import AgentStepLog  # local import to avoid cycle
-
-        db_entry = AgentStepLog(
-            run_id=run_db_obj.id,
-            step_num=step_num,
-            name=step.name,
-            tool=step.tool,
-            status=step.status,
-            details=step.details,
-        )
-        db.add(db_entry)
-        db.commit()
+    def _log_step(self, log: Optional[StepLogBuffer], step_num: int, step: AgentStep) -> None:
+        if log is not None:
+            log.add(step_num, step)
 
     def _load_user_facts(self, db: Session, user_id: str) -> Dict[str, Any]:
         from app.models.db_models import UserFact  # local import to avoid cycle
@@ -842,6 +1522,7 @@ class AgentOrchestrator:
             else:
                 db.add(
                     UserFact(
+                        id=uuid.uuid4(),
                         user_id=user_id,
                         key=key,
                         value=value,
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+# Context strings at least this long (page_html, job_description) are compressed
+# on their own and reused across a run's checkpoints while unchanged.
+LARGE_VALUE_CHARS = 4096
+_BLOB_MARKER = "__checkpoint_blob__"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class Checkpoint:
+    saved_at: float
+    body: bytes  # zlib(JSON) of the payload, large context strings swapped for markers
+    blobs: Dict[str, Tuple[str, bytes]] = field(default_factory=dict)  # key -> (digest, zlib(value))
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(blob) for _, blob in self.blobs.values())
+
+
+class CheckpointStore:
+    """
+    Compact in-memory checkpoints of agent runs, keyed by run_id.
+
+    Payloads are JSON-able dicts (see AgentOrchestrator._checkpoint_payload),
+    stored zlib-compressed; least recently saved runs are evicted past
+    `max_runs`, and entries expire after `ttl_seconds`.
+    """
+
+    def __init__(self, max_runs: Optional[int] = None, ttl_seconds: Optional[int] = None) -> None:
+        self.max_runs = max_runs or _env_int("AGENT_CHECKPOINT_MAX_RUNS", 512)
+        self.ttl_seconds = ttl_seconds or _env_int("AGENT_CHECKPOINT_TTL_S", 3600)
+        self._entries: "OrderedDict[str, Checkpoint]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.saves = 0
+        self.blob_reuses = 0
+        self.hits = 0
+        self.misses = 0
+
+    def save(self, run_id: str, payload: Dict[str, Any]) -> int:
+        """Store `payload` as the latest checkpoint of `run_id`; returns its compressed size."""
+        with self._lock:
+            previous = self._entries.get(run_id)
+        context = dict(payload.get("context") or {})
+        blobs: Dict[str, Tuple[str, bytes]] = {}
+        for key, value in context.items():
+            if not isinstance(value, str) or len(value) < LARGE_VALUE_CHARS:
+                continue
+            digest = hashlib.blake2b(value.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+            old = previous.blobs.get(key) if previous else None
+            if old is not None and old[0] == digest:
+                blobs[key] = old
+                self.blob_reuses += 1
+            else:
+                blobs[key] = (digest, zlib.compress(value.encode("utf-8", "surrogatepass"), 6))
+            context[key] = {_BLOB_MARKER: key}
+        body = json.dumps({**payload, "context": context}, separators=(",", ":"), default=str)
+        checkpoint = Checkpoint(saved_at=time.monotonic(), body=zlib.compress(body.encode("utf-8"), 6), blobs=blobs)
+        with self._lock:
+            self._entries[run_id] = checkpoint
+            self._entries.move_to_end(run_id)
+            while len(self._entries) > self.max_runs:
+                self._entries.popitem(last=False)
+            self.saves += 1
+        return checkpoint.size
+
+    def load(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            checkpoint = self._entries.get(run_id)
+            if checkpoint is not None and time.monotonic() - checkpoint.saved_at > self.ttl_seconds:
+                del self._entries[run_id]
+                checkpoint = None
+            if checkpoint is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        payload = json.loads(zlib.decompress(checkpoint.body).decode("utf-8"))
+        context = payload.get("context") or {}
+        for key, (_, blob) in checkpoint.blobs.items():
+            context[key] = zlib.decompress(blob).decode("utf-8", "surrogatepass")
+        return payload
+
+    def discard(self, run_id: str) -> None:
+        with self._lock:
+            self._entries.pop(run_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sizes = [checkpoint.size for checkpoint in self._entries.values()]
+        return {
+            "runs": len(sizes),
+            "bytes": sum(sizes),
+            "max_runs": self.max_runs,
+            "ttl_seconds": self.ttl_seconds,
+            "saves": self.saves,
+            "blob_reuses": self.blob_reuses,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+checkpoint_store = CheckpointStore()
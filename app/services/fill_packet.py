@@ -1,18 +1,17 @@
 from __future__ import annotations
 
-import re
 from typing import Any, Dict, List, Optional
 
+from app.services.jd_analysis import analyze_jd
+
 
 def extract_keywords(job_description: str, max_keywords: int = 12) -> List[str]:
     """
     Tiny keyword extractor: deterministic + fast.
     You can replace later with LLM or better NLP.
     """
-    text = (job_description or "").lower()
-
-    # keep words only
-    words = re.findall(r"[a-zA-Z][a-zA-Z0-9\+\#\.\-]{1,}", text)
+    # keep words only (shared tokenization, see app.services.jd_analysis)
+    words = [w for w in analyze_jd(job_description or "").tokens if w[0].isalpha()]
 
     stop = {
         "and", "or", "the", "a", "an", "to", "of", "in", "for", "with", "on", "as",
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import itertools
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+try:  # vectorized scoring when numpy is installed; a plain loop otherwise
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the install
+    np = None
+
+try:  # CSR matrix products when scipy is installed; bincount otherwise
+    from scipy import sparse
+except ImportError:  # pragma: no cover - depends on the install
+    sparse = None
+
+
+def fit_score(profile_bits: int, must_bits: int, nice_bits: int) -> Tuple[float, Dict[str, int]]:
+    """
+    score_fit's formula on skill bitsets (see SkillInterner): must-have hits
+    weigh twice as much as nice-to-have hits, each as a fraction of its total.
+    """
+    must_hits = (profile_bits & must_bits).bit_count()
+    nice_hits = (profile_bits & nice_bits).bit_count()
+    must_total = must_bits.bit_count()
+    nice_total = nice_bits.bit_count()
+    score = (2 * (must_hits / max(must_total, 1)) + (nice_hits / max(nice_total, 1))) / 3
+    reasons = {
+        "must_have_hit": must_hits,
+        "must_have_total": must_total,
+        "nice_have_hit": nice_hits,
+        "nice_have_total": nice_total,
+    }
+    return max(0.0, min(1.0, score)), reasons
+
+
+def _pack(rows: List[int], words: int) -> Any:
+    data = b"".join(bits.to_bytes(words * 8, "little") for bits in rows)
+    return np.frombuffer(data, dtype="<u8").reshape(len(rows), words)
+
+
+def _popcount_rows(matrix: Any) -> Any:
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(matrix).sum(axis=1, dtype=np.int64)
+    return np.unpackbits(matrix.view(np.uint8), axis=1).sum(axis=1, dtype=np.int64)
+
+
+@dataclass
+class FitBatch:
+    scores: Any  # float array (list without numpy), one per job in insertion order
+    must_hits: Any
+    nice_hits: Any
+
+
+class FitIndex:
+    """
+    Must-have / nice-to-have skill bitsets of many analyzed jobs, packed into
+    uint64 word matrices so one profile is scored against every job with a
+    few vectorized AND + popcount passes.
+
+    Rows are appended with `add`; the matrices are rebuilt lazily on the next
+    `score` after a change.
+    """
+
+    def __init__(self) -> None:
+        self._must: List[int] = []
+        self._nice: List[int] = []
+        self._lock = threading.Lock()
+        self._packed: Any = None
+
+    def __len__(self) -> int:
+        return len(self._must)
+
+    @classmethod
+    def from_rows(cls, must_rows: Sequence[Sequence[int]], nice_rows: Sequence[Sequence[int]]) -> "FitIndex":
+        index = cls()
+        for must, nice in zip(must_rows, nice_rows):
+            index.add(sum(1 << skill_id for skill_id in must), sum(1 << skill_id for skill_id in nice))
+        return index
+
+    def add(self, must_bits: int, nice_bits: int) -> int:
+        with self._lock:
+            self._must.append(must_bits)
+            self._nice.append(nice_bits)
+            self._packed = None
+            return len(self._must) - 1
+
+    def _matrices(self) -> Tuple[Any, Any, Any, Any, int]:
+        with self._lock:
+            if self._packed is None:
+                widest = max((bits.bit_length() for bits in self._must + self._nice), default=0)
+                words = max(1, (widest + 63) // 64)
+                must = _pack(self._must, words)
+                nice = _pack(self._nice, words)
+                self._packed = (must, nice, _popcount_rows(must), _popcount_rows(nice), words)
+            return self._packed
+
+    def score(self, profile_bits: int) -> FitBatch:
+        if not self._must:
+            return FitBatch(scores=[], must_hits=[], nice_hits=[])
+        if np is None:
+            results = [fit_score(profile_bits, must, nice) for must, nice in zip(self._must, self._nice)]
+            return FitBatch(
+                scores=[score for score, _ in results],
+                must_hits=[reasons["must_have_hit"] for _, reasons in results],
+                nice_hits=[reasons["nice_have_hit"] for _, reasons in results],
+            )
+        must, nice, must_total, nice_total, words = self._matrices()
+        # Profile skills beyond the packed width cannot hit any job.
+        profile = _pack([profile_bits & ((1 << (64 * words)) - 1)], words)[0]
+        must_hits = _popcount_rows(must & profile)
+        nice_hits = _popcount_rows(nice & profile)
+        scores = (2 * must_hits / np.maximum(must_total, 1) + nice_hits / np.maximum(nice_total, 1)) / 3
+        return FitBatch(scores=np.clip(scores, 0.0, 1.0), must_hits=must_hits, nice_hits=nice_hits)
+
+
+def _sparse_hits(rows: Sequence[Sequence[int]], profile: Any) -> Tuple[Any, Any]:
+    """Per-row count of skill ids set in the 0/1 `profile` vector, and row lengths."""
+    lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+    cols = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=int(lengths.sum()))
+    if sparse is not None:
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        matrix = sparse.csr_matrix((np.ones(len(cols)), cols, indptr), shape=(len(rows), len(profile)))
+        return np.rint(matrix @ profile).astype(np.int64), lengths
+    row_ids = np.repeat(np.arange(len(rows)), lengths)
+    return np.rint(np.bincount(row_ids, weights=profile[cols], minlength=len(rows))).astype(np.int64), lengths
+
+
+def sparse_fit(
+    must_rows: Sequence[Sequence[int]],
+    nice_rows: Sequence[Sequence[int]],
+    profile_ids: Iterable[int],
+    width: int,
+) -> FitBatch:
+    """
+    fit_score for many jobs given as lists of distinct skill ids below `width`:
+    a sparse job x skill matrix per kind (must / nice) times the profile's
+    0/1 skill vector, then the formula on whole columns.
+    """
+    if not must_rows:
+        return FitBatch(scores=[], must_hits=[], nice_hits=[])
+    if np is None:
+        profile_bits = sum(1 << skill_id for skill_id in set(profile_ids))
+        return FitIndex.from_rows(must_rows, nice_rows).score(profile_bits)
+    profile = np.zeros(width, dtype=np.float64)
+    profile[[skill_id for skill_id in profile_ids if skill_id < width]] = 1.0
+    must_hits, must_total = _sparse_hits(must_rows, profile)
+    nice_hits, nice_total = _sparse_hits(nice_rows, profile)
+    scores = (2 * must_hits / np.maximum(must_total, 1) + nice_hits / np.maximum(nice_total, 1)) / 3
+    return FitBatch(scores=np.clip(scores, 0.0, 1.0), must_hits=must_hits, nice_hits=nice_hits)
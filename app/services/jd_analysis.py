@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import hashlib
+import html
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.skills import SkillMatch, skill_taxonomy
+
+_BLOCK_TAG = re.compile(r"<\s*(?:br|/p|/li|/h[1-6]|/div|/tr)\b[^>]*>", re.IGNORECASE)
+_TAG = re.compile(r"<\s*/?[a-zA-Z][^<>]*>")  # real tags only: "<5 years" or "salary > 100k" survive
+# Words keep inner "." / "-" and trailing "+" / "#": node.js, ci-cd, c++, c#; "python." -> python.
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9_+#]*(?:[.\-][a-z0-9_+#]+)*")
+_YEARS = re.compile(r"\b(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b")
+_HEADING = re.compile(
+    r"^(?:about (?:the role|the team|us|you)|responsibilities|requirements|qualifications|"
+    r"minimum qualifications|preferred qualifications|nice to have|bonus points|benefits|perks|"
+    r"what you(?:'ll| will) do|what we(?:'re| are) looking for|who you are|skills|tech stack)\b"
+)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def normalize_jd(text: str) -> str:
+    """Markup stripped (block tags become line breaks), entities decoded, lowercased, spacing collapsed."""
+    text = text or ""
+    if "<" in text:
+        text = _TAG.sub(" ", _BLOCK_TAG.sub("\n", text))
+    lines = (" ".join(line.split()) for line in html.unescape(text).lower().split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b((text or "").encode("utf-8", errors="ignore"), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class Section:
+    title: str  # heading as written (normalized); "" for text before the first heading
+    start: int  # offsets into AnalyzedJD.normalized
+    end: int
+
+
+@dataclass(frozen=True)
+class AnalyzedJD:
+    """
+    One job description, tokenized and scanned once for every consumer
+    (analyze_job, fetch_profile, keyword extraction, /job/analyse, /job/rank,
+    near-duplicate detection). Fields past `normalized` are computed on first
+    use; offsets refer to `normalized`.
+    """
+
+    content_hash: str
+    normalized: str
+    _ngrams: Dict[int, Tuple[str, ...]] = field(default_factory=dict, repr=False, compare=False)
+
+    @cached_property
+    def tokens(self) -> Tuple[str, ...]:
+        return tuple(_TOKEN.findall(self.normalized))
+
+    @cached_property
+    def token_counts(self) -> Counter:
+        return Counter(self.tokens)
+
+    def ngrams(self, n: int) -> Tuple[str, ...]:
+        """Space-joined runs of `n` consecutive tokens."""
+        grams = self._ngrams.get(n)
+        if grams is None:
+            tokens = self.tokens
+            grams = self._ngrams[n] = tuple(" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    @cached_property
+    def skill_matches(self) -> Tuple[SkillMatch, ...]:
+        return tuple(skill_taxonomy.scan(self.normalized))
+
+    @cached_property
+    def skills(self) -> Tuple[str, ...]:
+        """Canonical skills in order of first mention."""
+        return tuple(dict.fromkeys(match.skill for match in self.skill_matches))
+
+    @cached_property
+    def years(self) -> Tuple[int, ...]:
+        """Every "N years" / "N+ yrs" requirement, in order."""
+        return tuple(int(value) for value in _YEARS.findall(self.normalized))
+
+    @cached_property
+    def sections(self) -> Tuple[Section, ...]:
+        """Spans between heading lines (known headings, or short lines ending in ':')."""
+        starts: List[Tuple[str, int]] = [("", 0)]
+        offset = 0
+        for line in self.normalized.split("\n"):
+            stripped = line.strip(" -*•#")
+            if stripped and len(stripped) <= 60 and (stripped.endswith(":") or _HEADING.match(stripped)):
+                starts.append((stripped.rstrip(":").strip(), offset))
+            offset += len(line) + 1
+        sections = []
+        for index, (title, start) in enumerate(starts):
+            end = starts[index + 1][1] if index + 1 < len(starts) else len(self.normalized)
+            if end > start or title:
+                sections.append(Section(title=title, start=start, end=end))
+        return tuple(sections)
+
+
+class JDAnalysisCache:
+    """LRU of AnalyzedJD keyed by content hash, so each JD is analyzed once per process."""
+
+    def __init__(self, max_entries: Optional[int] = None) -> None:
+        self.max_entries = max_entries or _env_int("JD_ANALYSIS_CACHE_SIZE", 1024)
+        self._entries: "OrderedDict[str, AnalyzedJD]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> AnalyzedJD:
+        key = content_hash(text)
+        with self._lock:
+            jd = self._entries.get(key)
+            if jd is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return jd
+        jd = AnalyzedJD(content_hash=key, normalized=normalize_jd(text))
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = jd
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return jd
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+jd_analysis_cache = JDAnalysisCache()
+
+
+def analyze_jd(text: str) -> AnalyzedJD:
+    return jd_analysis_cache.get(text)
@@ -1,7 +1,12 @@
-from collections import Counter
-from typing import List, Optional
+import heapq
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from app.models.store import store
+from app.models.store import JobPosting, store
+from app.services.fit import np, sparse_fit
+from app.services.jd_analysis import analyze_jd
+from app.services.skills import MUST_HAVE_SKILLS, NICE_TO_HAVE_SKILLS, skill_interner
 
 
 class JobAnalysisService:
@@ -11,11 +16,13 @@ class JobAnalysisService:
 
         profile = store.profiles.get(user_id)
         profile_skills = profile.skills if profile else []
-        tokens = [token.strip(".,:;").lower() for token in description.split() if token]
-        common_keywords = [word for word, _ in Counter(tokens).most_common(8)]
-        required_set = set(skill.lower() for skill in required_skills or [])
-        overlap = required_set.intersection(set(skill.lower() for skill in profile_skills))
-        score = round((len(overlap) / max(len(required_set) or 1, 1)) * 100, 2)
+        common_keywords = [word for word, _ in analyze_jd(description).token_counts.most_common(8)]
+        # Free-form required skills are compared as a per-request set, never interned.
+        required_bits, required_other = skill_interner.split(required_skills or [])
+        profile_bits, profile_other = skill_interner.split(profile_skills)
+        hits = (required_bits & profile_bits).bit_count() + len(required_other & profile_other)
+        total = required_bits.bit_count() + len(required_other)
+        score = round((hits / max(total, 1)) * 100, 2)
 
         # Pick latest resume for the user as a suggestion.
         suggested_resume = None
@@ -36,5 +43,139 @@ class JobAnalysisService:
         }
 
 
+def _top_k(scores: Any, k: int) -> List[int]:
+    """Indices of the k best scores, best first; ties keep input order."""
+    if np is None:
+        return heapq.nsmallest(k, range(len(scores)), key=lambda i: (-scores[i], i))
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.lexsort((candidates, -scores[candidates]))].tolist()
+
+
+class JobRankService:
+    """
+    Ranks many job descriptions against one profile with score_fit's formula.
+
+    Each JD goes through the skill taxonomy once (identical descriptions
+    share the work); the must-have / nice-to-have hits of all jobs are then
+    computed together as sparse job x skill matrix products (see
+    app.services.fit.sparse_fit), and only the top-k get a breakdown.
+    """
+
+    def __init__(self) -> None:
+        self._must_ids = [skill_interner.id(skill) for skill in MUST_HAVE_SKILLS]
+        self._nice_ids = [skill_interner.id(skill) for skill in NICE_TO_HAVE_SKILLS]
+
+    def job_skills(self, description: str) -> Tuple[List[int], List[int]]:
+        """analyze_job's must-have / nice-to-have split, as skill ids."""
+        found = {skill_interner.id(skill) for skill in analyze_jd(description or "").skills}
+        return [i for i in self._must_ids if i in found], [i for i in self._nice_ids if i in found]
+
+    def rank(self, profile_skills: Sequence[str], jobs: Sequence[JobPosting], top_k: int) -> Dict[str, Any]:
+        started = time.perf_counter()
+        by_text: Dict[str, Tuple[List[int], List[int]]] = {}
+        must_rows: List[List[int]] = []
+        nice_rows: List[List[int]] = []
+        for job in jobs:
+            split = by_text.get(job.description)
+            if split is None:
+                split = by_text[job.description] = self.job_skills(job.description)
+            must_rows.append(split[0])
+            nice_rows.append(split[1])
+        extracted = time.perf_counter()
+
+        profile_ids = {i for i in (skill_interner.lookup(skill) for skill in profile_skills or []) if i is not None}
+        batch = sparse_fit(must_rows, nice_rows, profile_ids, len(skill_interner))
+        order = _top_k(batch.scores, top_k) if jobs else []
+        scored = time.perf_counter()
+
+        ranked = []
+        for index in order:
+            job = jobs[index]
+            must, nice = must_rows[index], nice_rows[index]
+            ranked.append(
+                {
+                    "id": job.id,
+                    "title": job.title,
+                    "company": job.company,
+                    "url": job.url,
+                    "fit_score": round(float(batch.scores[index]), 4),
+                    "must_have_hit": int(batch.must_hits[index]),
+                    "must_have_total": len(must),
+                    "nice_have_hit": int(batch.nice_hits[index]),
+                    "nice_have_total": len(nice),
+                    "must_have_matched": [skill_interner.name(i) for i in must if i in profile_ids],
+                    "must_have_missing": [skill_interner.name(i) for i in must if i not in profile_ids],
+                    "nice_to_have_matched": [skill_interner.name(i) for i in nice if i in profile_ids],
+                }
+            )
+        return {
+            "ranked": ranked,
+            "total": len(jobs),
+            "timings_ms": {
+                "extract": round((extracted - started) * 1000, 2),
+                "score": round((scored - extracted) * 1000, 2),
+                "total": round((time.perf_counter() - started) * 1000, 2),
+            },
+        }
+
+    def rank_request(
+        self,
+        user_id: Optional[str],
+        skills: Optional[List[str]],
+        jobs: Sequence[Dict[str, Any]],
+        job_ids: Sequence[str],
+        top_k: int,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        /job/rank: profile skills from `skills` or the user's stored profile.
+        For a known user `jobs` are stored under that user so later requests
+        can pass their ids; otherwise they are only ranked. None when the
+        profile is needed but the user is unknown; ValueError when a job id
+        already belongs to another user.
+        """
+        known_user = user_id in store.users
+        if skills is None:
+            if not known_user:
+                return None
+            profile = store.profiles.get(user_id)
+            skills = profile.skills if profile else []
+
+        if known_user:
+            taken = [
+                job["id"]
+                for job in jobs
+                if job.get("id") in store.jobs and store.jobs[job["id"]].user_id != user_id
+            ]
+            if taken:
+                raise ValueError(f"job ids belong to another user: {', '.join(taken[:10])}")
+
+        postings = []
+        for job in jobs:
+            posting = JobPosting(
+                id=job.get("id") or str(uuid.uuid4()),
+                description=job["description"],
+                user_id=user_id if known_user else None,
+                title=job.get("title"),
+                company=job.get("company"),
+                url=job.get("url"),
+            )
+            postings.append(store.add_job(posting) if known_user else posting)
+        unknown = []
+        for job_id in job_ids:
+            posting = store.jobs.get(job_id)
+            if not known_user or posting is None or posting.user_id != user_id:
+                unknown.append(job_id)
+            else:
+                postings.append(posting)
+
+        result = self.rank(skills, postings, top_k)
+        result["unknown_job_ids"] = unknown
+        return result
+
+
 job_analysis_service = JobAnalysisService()
+job_rank_service = JobRankService()
 
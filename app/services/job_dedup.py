@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import os
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+try:  # signatures and the band index are numpy arrays; without numpy dedup is off
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the install
+    np = None
+
+from app.services.jd_analysis import analyze_jd
+
+_MULT = 0x9E3779B97F4A7C15  # odd 64-bit constant for combining token hashes
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class NearDuplicate:
+    similarity: float  # estimated Jaccard similarity of the shingle sets
+    slot: int
+    payload: Any
+
+
+class JobDedupIndex:
+    """
+    Near-duplicate job descriptions via word shingles, MinHash and LSH.
+
+    Each JD becomes the set of its `shingle_size`-word shingles, summarized by
+    `bands * rows` MinHash values (multiply-shift hashes of 64-bit shingle
+    hashes). Two JDs are candidates when all `rows` values of any band agree;
+    candidates are confirmed when the share of equal MinHash values (the
+    Jaccard estimate) reaches `threshold`. More rows per band mean fewer, more
+    similar candidates; more bands mean fewer misses.
+
+    Memory is bounded by `max_docs`: slots form a ring and the oldest JD is
+    overwritten. Entries are keyed by the JD's content hash, so adding the
+    same text again replaces its payload instead of taking another slot. Band keys live in a (slots x bands) array; lookups binary
+    search a sorted copy per band. JDs added since that copy was built sit in
+    small per-band dicts until there are `max_pending` of them (or an eighth
+    of the index), then are merged in.
+    """
+
+    def __init__(
+        self,
+        bands: Optional[int] = None,
+        rows: Optional[int] = None,
+        shingle_size: Optional[int] = None,
+        threshold: Optional[float] = None,
+        max_docs: Optional[int] = None,
+        max_pending: int = 65536,
+        seed: int = 1,
+    ) -> None:
+        self.bands = bands or _env_int("JOB_DEDUP_BANDS", 16)
+        self.rows = rows or _env_int("JOB_DEDUP_ROWS", 8)
+        self.shingle_size = shingle_size or _env_int("JOB_DEDUP_SHINGLE_SIZE", 3)
+        self.threshold = threshold or _env_float("JOB_DEDUP_THRESHOLD", 0.75)
+        self.max_docs = max_docs or _env_int("JOB_DEDUP_MAX_DOCS", 100_000)
+        self.max_pending = max_pending
+        self.enabled = np is not None and os.getenv("JOB_DEDUP_ENABLED", "1") == "1"
+        self._lock = threading.Lock()
+        self._size = 0  # live slots
+        self._next = 0  # next slot to write (ring)
+        self._payloads: List[Any] = []
+        self._slot_keys: List[Optional[int]] = []  # content hash key per slot
+        self._slot_by_key: Dict[int, int] = {}
+        self._signatures: Any = None
+        self._band_keys: Any = None
+        self._sorted_keys: Any = None  # per band: band keys of indexed slots, sorted
+        self._sorted_slots: Any = None
+        self._pending: List[int] = []  # slots written since the last rebuild
+        self._delta: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]  # their band keys
+        self.added = 0
+        self.replaced = 0
+        self.queries = 0
+        self.duplicates = 0
+        self.rebuilds = 0
+        if np is not None:
+            rng = np.random.default_rng(seed)
+            count = self.bands * self.rows
+            self._a = rng.integers(1, 2**63, size=count, dtype=np.uint64) | np.uint64(1)
+            self._b = rng.integers(0, 2**63, size=count, dtype=np.uint64)
+            self._band_pow = np.array([_MULT**i % 2**64 for i in range(self.rows)], dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[Any]:
+        """MinHash signature (uint32, bands * rows) of `text`, or None if it has no words."""
+        tokens = analyze_jd(text).tokens  # shared with analyze_job & co., cached by content hash
+        if not tokens:
+            return None
+        hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens), dtype=np.uint64)
+        k = min(self.shingle_size, len(hashes))
+        shingles = hashes[: len(hashes) - k + 1].copy()
+        for offset in range(1, k):
+            shingles = shingles * np.uint64(_MULT) + hashes[offset : len(hashes) - k + 1 + offset]
+        shingles = np.unique(shingles)
+        mixed = (self._a[:, None] * shingles[None, :] + self._b[:, None]) >> np.uint64(32)
+        return mixed.min(axis=1).astype(np.uint32)
+
+    def _keys(self, signature: Any) -> Any:
+        # One uint64 per band; equal bands give equal keys.
+        banded = signature.reshape(self.bands, self.rows).astype(np.uint64)
+        return (banded * self._band_pow).sum(axis=1, dtype=np.uint64)
+
+    def _grow(self, needed: int) -> None:
+        capacity = 0 if self._signatures is None else len(self._signatures)
+        if needed <= capacity:
+            return
+        capacity = min(self.max_docs, max(needed, 2 * capacity, 1024))
+        signatures = np.zeros((capacity, self.bands * self.rows), dtype=np.uint32)
+        band_keys = np.zeros((capacity, self.bands), dtype=np.uint64)
+        if self._signatures is not None:
+            signatures[: len(self._signatures)] = self._signatures
+            band_keys[: len(self._band_keys)] = self._band_keys
+        self._signatures, self._band_keys = signatures, band_keys
+
+    def add(self, text: str, payload: Any = None, signature: Any = None) -> Optional[int]:
+        """Index `text` (or a precomputed signature); returns its slot. Re-adding a text replaces its payload."""
+        if not self.enabled:
+            return None
+        key = int(analyze_jd(text).content_hash[:16], 16) if text else None
+        if key is not None:
+            with self._lock:
+                slot = self._slot_by_key.get(key)
+                if slot is not None:
+                    self._payloads[slot] = payload
+                    self.replaced += 1
+                    return slot
+        signature = self.signature(text) if signature is None else signature
+        if signature is None:
+            return None
+        with self._lock:
+            if key is not None and key in self._slot_by_key:  # added concurrently
+                slot = self._slot_by_key[key]
+                self._payloads[slot] = payload
+                self.replaced += 1
+                return slot
+            slot = self._next
+            self._grow(slot + 1)
+            if slot < len(self._payloads):
+                old_key = self._slot_keys[slot]
+                if old_key is not None and self._slot_by_key.get(old_key) == slot:
+                    del self._slot_by_key[old_key]
+                self._payloads[slot] = payload
+                self._slot_keys[slot] = key
+            else:
+                self._payloads.append(payload)
+                self._slot_keys.append(key)
+            if key is not None:
+                self._slot_by_key[key] = slot
+            keys = self._keys(signature)
+            self._signatures[slot] = signature
+            self._band_keys[slot] = keys
+            self._next = (slot + 1) % self.max_docs
+            self._size = min(self._size + 1, self.max_docs)
+            self._pending.append(slot)
+            for delta, key in zip(self._delta, keys.tolist()):
+                delta.setdefault(key, []).append(slot)
+            if len(self._pending) >= min(self.max_pending, max(4096, self._size // 8)):
+                self._rebuild()
+            self.added += 1
+        return slot
+
+    def _rebuild(self) -> None:
+        pending = np.unique(np.asarray(self._pending, dtype=np.int64))
+        slots = np.broadcast_to(pending, (self.bands, len(pending)))
+        keys = self._band_keys[pending].T
+        if self._sorted_keys is not None:
+            # Every slot is either still in the sorted copy or pending (new or overwritten).
+            overwritten = np.zeros(len(self._band_keys), dtype=bool)
+            overwritten[pending] = True
+            keep = ~overwritten[self._sorted_slots]
+            kept = int(keep[0].sum())
+            slots = np.concatenate([self._sorted_slots[keep].reshape(self.bands, kept), slots], axis=1)
+            keys = np.concatenate([self._sorted_keys[keep].reshape(self.bands, kept), keys], axis=1)
+        # Stable sort of two sorted runs per band is a linear merge.
+        order = np.argsort(keys, axis=1, kind="stable")
+        self._sorted_keys = np.take_along_axis(keys, order, axis=1)
+        self._sorted_slots = np.take_along_axis(slots, order, axis=1)
+        self._pending = []
+        self._delta = [{} for _ in range(self.bands)]
+        self.rebuilds += 1
+
+    def _candidates(self, keys: Any) -> Any:
+        found = []
+        if self._sorted_keys is not None:
+            for band in range(self.bands):
+                sorted_keys = self._sorted_keys[band]
+                lo = np.searchsorted(sorted_keys, keys[band], side="left")
+                hi = np.searchsorted(sorted_keys, keys[band], side="right")
+                if hi > lo:
+                    found.append(self._sorted_slots[band][lo:hi])
+        for delta, key in zip(self._delta, keys.tolist()):
+            if key in delta:
+                found.append(np.asarray(delta[key], dtype=np.int64))
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        slots = np.unique(np.concatenate(found))
+        # Slots overwritten since the sorted copy was built no longer carry that key.
+        return slots[(self._band_keys[slots] == keys).any(axis=1)]
+
+    def query(self, text: str, signature: Any = None, limit: int = 5) -> List[NearDuplicate]:
+        """Indexed JDs whose estimated similarity to `text` reaches the threshold, most similar first."""
+        if not self.enabled:
+            return []
+        signature = self.signature(text) if signature is None else signature
+        if signature is None:
+            return []
+        with self._lock:
+            self.queries += 1
+            if not self._size:
+                return []
+            slots = self._candidates(self._keys(signature))
+            if not len(slots):
+                return []
+            similarity = (self._signatures[slots] == signature).mean(axis=1)
+            keep = similarity >= self.threshold
+            slots, similarity = slots[keep], similarity[keep]
+            order = np.lexsort((slots, -similarity))[:limit]
+            matches = [
+                NearDuplicate(similarity=float(similarity[i]), slot=int(slots[i]), payload=self._payloads[slots[i]])
+                for i in order
+            ]
+            if matches:
+                self.duplicates += 1
+            return matches
+
+    def stats(self) -> Dict[str, Any]:
+        capacity = 0 if self._signatures is None else len(self._signatures)
+        array_bytes = 0
+        for array in (self._signatures, self._band_keys, self._sorted_keys, self._sorted_slots):
+            array_bytes += 0 if array is None else array.nbytes
+        return {
+            "enabled": self.enabled,
+            "bands": self.bands,
+            "rows": self.rows,
+            "shingle_size": self.shingle_size,
+            "threshold": self.threshold,
+            "docs": self._size,
+            "capacity": capacity,
+            "max_docs": self.max_docs,
+            "array_bytes": array_bytes,
+            "added": self.added,
+            "replaced": self.replaced,
+            "queries": self.queries,
+            "duplicates": self.duplicates,
+            "rebuilds": self.rebuilds,
+        }
+
+
+job_dedup = JobDedupIndex()
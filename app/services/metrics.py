@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import bisect
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds; spans cache hits (sub-ms) up to hung browser navigations.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: Iterable[Tuple[str, str]]) -> str:
+    parts = []
+    for name, value in key:
+        value = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, in Prometheus' layout."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[LabelKey, List[Any]] = {}
+
+    def observe(self, value: float, labels: Dict[str, Any]) -> None:
+        key = _label_key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self._series.items()):
+            running = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                running += bucket_count
+                le_key = key + (("le", _format_value(bound)),)
+                lines.append(f"{self.name}_bucket{_format_labels(le_key)} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, labels: Optional[Dict[str, Any]] = None, amount: float = 1) -> None:
+        key = _label_key(labels or {})
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Metrics:
+    """
+    In-process agent metrics rendered in the Prometheus text format.
+
+    Tool latencies go into a histogram labelled by tool, portal, cache outcome
+    and status. Components register a `stats()` callable as a source; its
+    numeric fields are exported (untyped) at scrape time. Time spent recording
+    is itself counted (agent_metrics_overhead_seconds_total).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.tool_seconds = Histogram("agent_tool_duration_seconds", "Agent tool call latency.")
+        self.tool_calls = Counter("agent_tool_calls_total", "Agent tool calls.")
+        self.runs = Counter("agent_runs_total", "Finished agent runs by final status.")
+        self.overhead = Counter(
+            "agent_metrics_overhead_seconds_total", "Time spent recording agent metrics."
+        )
+        self._sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def observe_tool(self, tool: str, seconds: float, portal: Optional[str], cache: str, status: str) -> None:
+        started = time.perf_counter()
+        labels = {"tool": tool, "portal": portal or "none", "cache": cache, "status": status}
+        with self._lock:
+            self.tool_seconds.observe(seconds, labels)
+            self.tool_calls.inc(labels)
+            self.overhead.inc(amount=time.perf_counter() - started)
+
+    def observe_run(self, status: str) -> None:
+        with self._lock:
+            self.runs.inc({"status": status})
+
+    def register_source(self, name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        self._sources[name] = stats
+
+    def _source_lines(self, name: str, stats: Dict[str, Any], prefix: str = "") -> List[str]:
+        lines = []
+        for key, value in sorted(stats.items()):
+            metric = _INVALID_NAME_CHARS.sub("_", f"autoapply_{name}_{prefix}{key}")
+            if isinstance(value, bool):
+                lines.append(f"{metric} {int(value)}")
+            elif isinstance(value, (int, float)):
+                lines.append(f"{metric} {_format_value(value)}")
+            elif isinstance(value, dict):
+                lines.extend(self._source_lines(name, value, prefix=f"{prefix}{key}_"))
+        return lines
+
+    def render(self) -> str:
+        with self._lock:
+            lines = self.tool_seconds.render() + self.tool_calls.render() + self.runs.render() + self.overhead.render()
+        for name, stats in sorted(self._sources.items()):
+            try:
+                values = stats()
+            except Exception:  # noqa: BLE001 - one broken source must not break the scrape
+                continue
+            lines.extend(self._source_lines(name, values))
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -3,15 +3,19 @@ from __future__ import annotations
 from typing import List, Protocol
 
 from app.schemas.discovery import DiscoveredField, FillAction
+from app.services.portals.parsed_page import PageInput
 
 
 class PortalAdapter(Protocol):
     name: str
+    # Keys the (possibly on-disk) discovery cache: bump it whenever
+    # discover_fields returns different fields for the same page.
+    version: int
 
-    def matches(self, url: str, html: str) -> bool:
+    def matches(self, url: str, html: PageInput) -> bool:
         ...
 
-    def discover_fields(self, url: str, html: str) -> List[DiscoveredField]:
+    def discover_fields(self, url: str, html: PageInput) -> List[DiscoveredField]:
         ...
 
     def build_fill_actions(
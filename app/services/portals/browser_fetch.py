@@ -1,7 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from app.services.portals.browser_pool import browser_pool
+from app.services.portals.fetch_coalescer import FetchCoalescer
+from app.services.portals.page_readiness import PageReadiness
+from app.services.portals.resource_policy import ResourcePolicy, RoutingStats, policy_for_url
 
 @dataclass
 class BrowserSnapshot:
@@ -10,6 +17,11 @@ class BrowserSnapshot:
     used_browser: bool
     notes: str = ""
     final_url: Optional[str] = None
+    # Time spent per phase (ms) and whether each readiness signal fired.
+    timings: Dict[str, float] = field(default_factory=dict)
+    signals: Dict[str, bool] = field(default_factory=dict)
+    # Request routing counters (blocked/allowed requests, loaded bytes).
+    resources: Dict[str, Any] = field(default_factory=dict)
 
 
 def looks_like_js_shell(html: str) -> bool:
@@ -23,131 +35,183 @@ def looks_like_js_shell(html: str) -> bool:
     return False
 
 
-async def fetch_html_with_playwright(url: str) -> BrowserSnapshot:
+def _fetch_failed(snap: BrowserSnapshot) -> bool:
+    return not snap.used_browser
+
+
+fetch_coalescer = FetchCoalescer(failed=_fetch_failed)
+
+
+async def fetch_html_with_playwright(url: str, policy: Optional[ResourcePolicy] = None) -> BrowserSnapshot:
+    """
+    Rendered snapshot of `url`. With the default policy, pages are read through
+    the snapshot store (SNAPSHOT_STORE_DIR), concurrent fetches of the same
+    posting share one browser fetch and recent failures are replayed (see
+    FetchCoalescer); an explicit `policy` always fetches.
+    """
+    if policy is not None:
+        return await _fetch_html(url, policy)
+    from app.services.portals.snapshot_store import snapshot_store  # local import to avoid cycle
+
+    if snapshot_store.enabled:
+        stored = await asyncio.to_thread(snapshot_store.get, url)  # file read + decompress
+        if stored is not None:
+            return stored
+        if snapshot_store.replay:
+            return snapshot_store.miss(url)
+    return await fetch_coalescer.fetch(url, lambda: _fetch_and_store(url))
+
+
+async def _fetch_and_store(url: str) -> BrowserSnapshot:
+    from app.services.portals.snapshot_store import snapshot_store  # local import to avoid cycle
+
+    snap = await _fetch_html(url, None)
+    if snapshot_store.enabled:
+        await asyncio.to_thread(snapshot_store.put, snap)
+    return snap
+
+
+async def _fetch_html(url: str, policy: Optional[ResourcePolicy]) -> BrowserSnapshot:
+    policy = policy or policy_for_url(url)
+
+    if browser_pool.usable():
+        try:
+            async with browser_pool.context() as context:
+                routing = await policy.install(context) if policy else None
+                page = await context.new_page()
+                return await _snapshot_page(page, url, via="pool", routing=routing)
+        except Exception as e:
+            return BrowserSnapshot(url=url, html="", used_browser=False, notes=f"Playwright navigation failed: {e}")
+
+    # No warm pool on this event loop (pool disabled, or called via asyncio.run):
+    # launch a one-off browser.
     try:
         from playwright.async_api import async_playwright  # type: ignore
     except Exception as e:
         return BrowserSnapshot(url=url, html="", used_browser=False, notes=f"Playwright import failed: {e}")
 
-    def _is_workday(u: str) -> bool:
-        u = (u or "").lower()
-        return ("myworkdayjobs.com" in u) or ("workday" in u)
-
     try:
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
             context = await browser.new_context()
+            routing = await policy.install(context) if policy else None
             page = await context.new_page()
+            try:
+                return await _snapshot_page(page, url, via="launch", routing=routing)
+            finally:
+                await context.close()
+                await browser.close()
 
-            notes_parts: list[str] = []
+    except Exception as e:
+        return BrowserSnapshot(url=url, html="", used_browser=False, notes=f"Playwright navigation failed: {e}")
 
-            # Go to the page and let it hydrate.
-            resp = await page.goto(url, wait_until="domcontentloaded", timeout=60_000)
-            status = resp.status if resp else None
 
-            # Workday is React; wait for #root to exist and some content.
-            try:
-                await page.wait_for_selector("#root", timeout=30_000)
-            except Exception:
-                pass
-            await page.wait_for_timeout(1500)
-
-            # If Workday job page, click Apply and possibly the chooser button.
-            if _is_workday(page.url):
-                # 1) Find Apply (can be <a role="button">Apply</a>)
-                apply_locators = [
-                    page.get_by_role("button", name="Apply"),
-                    page.get_by_role("link", name="Apply"),
-                    page.locator("a[role='button']", has_text="Apply"),
-                    page.locator("text=Apply").first,
-                ]
-
-                apply_btn = None
-                for loc in apply_locators:
-                    try:
-                        if await loc.count() > 0 and await loc.first.is_visible():
-                            apply_btn = loc.first
-                            break
-                    except Exception:
-                        continue
-
-                if apply_btn:
-                    try:
-                        await apply_btn.click(timeout=10_000)
-                        notes_parts.append("clicked:apply")
-                        await page.wait_for_timeout(2500)
-                    except Exception as e:
-                        notes_parts.append(f"apply_click_failed:{type(e).__name__}")
-
-                    # 2) If chooser appears, click Autofill with Resume (preferred)
-                    chooser_locators = [
-                        page.get_by_role("button", name="Autofill with Resume"),
-                        page.get_by_role("link", name="Autofill with Resume"),
-                        page.locator("text=Autofill with Resume").first,
-                        # fallback: Apply Manually
-                        page.get_by_role("button", name="Apply Manually"),
-                        page.get_by_role("link", name="Apply Manually"),
-                        page.locator("text=Apply Manually").first,
-                    ]
-
-                    chooser_btn = None
-                    for loc in chooser_locators:
-                        try:
-                            if await loc.count() > 0 and await loc.first.is_visible():
-                                chooser_btn = loc.first
-                                break
-                        except Exception:
-                            continue
-
-                    if chooser_btn:
-                        try:
-                            txt = (await chooser_btn.inner_text()).strip()
-                        except Exception:
-                            txt = "chooser"
-                        try:
-                            await chooser_btn.click(timeout=10_000)
-                            notes_parts.append(f"clicked:{txt.lower().replace(' ', '_')}")
-                            await page.wait_for_timeout(3500)
-                        except Exception as e:
-                            notes_parts.append(f"chooser_click_failed:{type(e).__name__}")
-                else:
-                    notes_parts.append("apply_not_found")
-
-                # Wait a bit more for Workday navigation/hydration after clicks.
-                await page.wait_for_timeout(2000)
-
-            # Try to wait for apply route or some inputs to appear (don’t hard fail).
-            try:
-                await page.wait_for_timeout(1500)
-                # Either URL has /apply, OR inputs exist, OR data-automation-id elements exist.
-                # This is deliberately soft.
-                for _ in range(10):
-                    u = page.url.lower()
-                    inputs = await page.locator("input, textarea, select").count()
-                    daid = await page.locator("[data-automation-id]").count()
-                    if "/apply" in u or inputs > 0 or daid > 20:
-                        break
-                    await page.wait_for_timeout(500)
-            except Exception:
-                pass
+def _is_workday(u: str) -> bool:
+    u = (u or "").lower()
+    return ("myworkdayjobs.com" in u) or ("workday" in u)
 
-            html = await page.content()
-            final_url = page.url
 
-            await context.close()
-            await browser.close()
+async def _snapshot_page(page, url: str, via: str, routing: Optional[RoutingStats] = None) -> BrowserSnapshot:
+    notes_parts: list[str] = []
+    ready = PageReadiness(page)
+    started = time.monotonic()
 
-            notes = f"Playwright ok; status={status}"
-            if notes_parts:
-                notes += "; " + "; ".join(notes_parts)
+    # Go to the page and let it hydrate.
+    resp = await page.goto(url, wait_until="domcontentloaded", timeout=60_000)
+    status = resp.status if resp else None
+    ready.timings["goto"] = round((time.monotonic() - started) * 1000, 1)
 
-            return BrowserSnapshot(
-                url=url,
-                html=html,
-                used_browser=True,
-                final_url=final_url,
-                notes=notes,
-            )
+    # Workday is React; wait for #root (or any form control) and for the DOM to settle.
+    await ready.hydrated()
+    await ready.dom_quiet("hydrate_quiet")
 
-    except Exception as e:
-        return BrowserSnapshot(url=url, html="", used_browser=False, notes=f"Playwright navigation failed: {e}")
+    # If Workday job page, click Apply and possibly the chooser button.
+    if _is_workday(page.url):
+        # 1) Find Apply (can be <a role="button">Apply</a>)
+        apply_locators = [
+            page.get_by_role("button", name="Apply"),
+            page.get_by_role("link", name="Apply"),
+            page.locator("a[role='button']", has_text="Apply"),
+            page.locator("text=Apply").first,
+        ]
+
+        apply_btn = None
+        for loc in apply_locators:
+            try:
+                if await loc.count() > 0 and await loc.first.is_visible():
+                    apply_btn = loc.first
+                    break
+            except Exception:
+                continue
+
+        if apply_btn:
+            try:
+                await apply_btn.click(timeout=10_000)
+                notes_parts.append("clicked:apply")
+                await ready.chooser_or_form("after_apply")
+            except Exception as e:
+                notes_parts.append(f"apply_click_failed:{type(e).__name__}")
+
+            # 2) If chooser appears, click Autofill with Resume (preferred)
+            chooser_locators = [
+                page.get_by_role("button", name="Autofill with Resume"),
+                page.get_by_role("link", name="Autofill with Resume"),
+                page.locator("text=Autofill with Resume").first,
+                # fallback: Apply Manually
+                page.get_by_role("button", name="Apply Manually"),
+                page.get_by_role("link", name="Apply Manually"),
+                page.locator("text=Apply Manually").first,
+            ]
+
+            chooser_btn = None
+            for loc in chooser_locators:
+                try:
+                    if await loc.count() > 0 and await loc.first.is_visible():
+                        chooser_btn = loc.first
+                        break
+                except Exception:
+                    continue
+
+            if chooser_btn:
+                try:
+                    txt = (await chooser_btn.inner_text()).strip()
+                except Exception:
+                    txt = "chooser"
+                try:
+                    await chooser_btn.click(timeout=10_000)
+                    notes_parts.append(f"clicked:{txt.lower().replace(' ', '_')}")
+                    await ready.form_ready("after_chooser", ready.config.after_chooser_ms)
+                except Exception as e:
+                    notes_parts.append(f"chooser_click_failed:{type(e).__name__}")
+        else:
+            notes_parts.append("apply_not_found")
+
+    # Either URL has /apply, OR inputs exist, OR data-automation-id elements exist.
+    # This is deliberately soft: every phase gives up at its own deadline.
+    await ready.form_ready()
+    await ready.dom_quiet()
+    await ready.network_idle()
+
+    html = await page.content()
+    final_url = page.url
+    ready.timings["total"] = round((time.monotonic() - started) * 1000, 1)
+
+    notes = f"Playwright ok; status={status}; browser={via}"
+    if notes_parts:
+        notes += "; " + "; ".join(notes_parts)
+    missed = [name for name, ok in ready.met.items() if not ok]
+    if missed:
+        notes += "; timed_out:" + ",".join(missed)
+    if routing is not None:
+        notes += f"; blocked_requests={routing.blocked_requests}"
+
+    return BrowserSnapshot(
+        url=url,
+        html=html,
+        used_browser=True,
+        final_url=final_url,
+        notes=notes,
+        timings=dict(ready.timings),
+        signals=dict(ready.met),
+        resources=routing.as_dict() if routing is not None else {},
+    )
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass(eq=False)
+class PooledBrowser:
+    browser: Any  # None while `launching`
+    launched_at: float = field(default_factory=time.monotonic)
+    uses: int = 0
+    active_contexts: int = 0
+    retiring: bool = False
+    launching: bool = False  # placeholder for a browser being (re)launched in the background
+
+
+class BrowserPool:
+    """
+    Warm Chromium browsers shared by discovery fetches.
+
+    Owned by the FastAPI lifespan (see app.main). Every checkout gets a fresh,
+    isolated BrowserContext; browsers are recycled after `max_uses` checkouts or
+    when Chromium's resident memory crosses `max_memory_mb`.
+
+    Closing and relaunching Chromium takes seconds, so it never happens under
+    the pool's lock: a retiring idle browser is swapped for a placeholder and
+    replaced by a background task, which wakes waiters when done.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_contexts_per_browser: Optional[int] = None,
+        max_uses: Optional[int] = None,
+        max_memory_mb: Optional[int] = None,
+        headless: bool = True,
+    ) -> None:
+        self.size = size or _env_int("BROWSER_POOL_SIZE", 2)
+        self.max_contexts_per_browser = max_contexts_per_browser or _env_int("BROWSER_POOL_MAX_PAGES", 4)
+        self.max_uses = max_uses or _env_int("BROWSER_POOL_MAX_USES", 50)
+        self.max_memory_mb = max_memory_mb or _env_int("BROWSER_POOL_MAX_MEMORY_MB", 2048)
+        self.headless = headless
+
+        self._playwright: Any = None
+        self._browsers: List[PooledBrowser] = []
+        self._cond: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_memory_check = 0.0
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+        self.launches = 0
+        self.recycles = 0
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    def usable(self) -> bool:
+        """True when the pool is running on the current event loop."""
+        if not self.started:
+            return False
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    async def start(self) -> bool:
+        if self.started:
+            return True
+        try:
+            from playwright.async_api import async_playwright  # type: ignore
+
+            self._playwright = await async_playwright().start()
+            self._loop = asyncio.get_running_loop()
+            self._cond = asyncio.Condition()
+            for _ in range(self.size):
+                self._browsers.append(await self._launch())
+        except Exception as e:  # noqa: BLE001 - a missing browser must not take the API down
+            self.last_error = f"{type(e).__name__}: {e}"
+            await self.stop()
+            return False
+        return True
+
+    async def stop(self) -> None:
+        tasks, self._tasks = list(self._tasks), set()
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        browsers, self._browsers = self._browsers, []
+        for pooled in browsers:
+            await self._close(pooled)
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self._playwright = None
+        self._loop = None
+        self._cond = None
+
+    async def _launch(self) -> PooledBrowser:
+        browser = await self._playwright.chromium.launch(headless=self.headless)
+        self.launches += 1
+        return PooledBrowser(browser=browser)
+
+    async def _close(self, pooled: PooledBrowser) -> None:
+        if pooled.browser is None:
+            return
+        try:
+            await pooled.browser.close()
+        except Exception:
+            pass
+
+    def _pick(self) -> Optional[PooledBrowser]:
+        candidates = [
+            b
+            for b in self._browsers
+            if not b.retiring
+            and not b.launching
+            and b.active_contexts < self.max_contexts_per_browser
+            and b.browser.is_connected()
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda b: (b.active_contexts, b.uses))
+
+    @asynccontextmanager
+    async def context(self, **context_kwargs: Any) -> AsyncIterator[Any]:
+        """Check out a fresh BrowserContext on a warm browser; closes it on exit."""
+        if not self.usable():
+            raise RuntimeError("Browser pool is not running on this event loop.")
+        assert self._cond is not None
+
+        waited_from = time.monotonic()
+        async with self._cond:
+            pooled = self._pick()
+            relaunched = False
+            while pooled is None:
+                self._replace_dead()
+                if not self._browsers:
+                    # Every browser failed to relaunch; try once more, then let the caller fall back.
+                    if relaunched:
+                        raise RuntimeError(f"No browser could be launched: {self.last_error}")
+                    placeholder = PooledBrowser(browser=None, launching=True)
+                    self._browsers.append(placeholder)
+                    self._spawn(self._relaunch(None, placeholder))
+                    relaunched = True
+                await self._cond.wait()
+                pooled = self._pick()
+            pooled.active_contexts += 1
+            pooled.uses += 1
+            self.checkouts += 1
+        self.wait_seconds += time.monotonic() - waited_from
+
+        ctx = None
+        try:
+            ctx = await pooled.browser.new_context(**context_kwargs)
+            yield ctx
+        finally:
+            if ctx is not None:
+                try:
+                    await ctx.close()
+                except Exception:
+                    pass
+            async with self._cond:
+                pooled.active_contexts -= 1
+                if pooled.uses >= self.max_uses:
+                    pooled.retiring = True
+                self._check_memory()
+                self._recycle_idle()
+                self._cond.notify_all()
+
+    def _replace_dead(self) -> None:
+        for pooled in self._browsers:
+            if not pooled.launching and not pooled.browser.is_connected() and pooled.active_contexts == 0:
+                pooled.retiring = True
+        self._recycle_idle()
+
+    def _recycle_idle(self) -> None:
+        """Under the lock: swap idle retiring browsers for placeholders and relaunch them in the background."""
+        for index, pooled in enumerate(self._browsers):
+            if not pooled.retiring or pooled.active_contexts:
+                continue
+            placeholder = PooledBrowser(browser=None, launching=True)
+            self._browsers[index] = placeholder
+            self.recycles += 1
+            self._spawn(self._relaunch(pooled, placeholder))
+
+    def _spawn(self, coro: Any) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _relaunch(self, old: Optional[PooledBrowser], placeholder: PooledBrowser) -> None:
+        if old is not None:
+            await self._close(old)
+        fresh: Optional[PooledBrowser] = None
+        try:
+            fresh = await self._launch()
+        except Exception as e:  # noqa: BLE001
+            self.last_error = f"{type(e).__name__}: {e}"
+        cond = self._cond
+        stopped = cond is None
+        if not stopped:
+            async with cond:
+                stopped = placeholder not in self._browsers
+                if not stopped:
+                    index = self._browsers.index(placeholder)
+                    if fresh is not None:
+                        self._browsers[index] = fresh
+                    else:
+                        del self._browsers[index]
+                cond.notify_all()
+        if stopped and fresh is not None:  # the pool was stopped meanwhile
+            await self._close(fresh)
+
+    def _check_memory(self, interval: float = 5.0) -> None:
+        now = time.monotonic()
+        if now - self._last_memory_check < interval:
+            return
+        self._last_memory_check = now
+        rss = chromium_rss_bytes()
+        if rss is None or rss <= self.max_memory_mb * 1024 * 1024:
+            return
+        # Per-browser RSS is not exposed; retire the most used browser first.
+        live = [b for b in self._browsers if not b.retiring and not b.launching]
+        if live:
+            max(live, key=lambda b: b.uses).retiring = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "size": self.size,
+            "max_contexts_per_browser": self.max_contexts_per_browser,
+            "max_uses": self.max_uses,
+            "max_memory_mb": self.max_memory_mb,
+            "browsers": [
+                {
+                    "uses": b.uses,
+                    "active_contexts": b.active_contexts,
+                    "retiring": b.retiring,
+                    "launching": b.launching,
+                    "age_s": round(time.monotonic() - b.launched_at, 1),
+                }
+                for b in self._browsers
+            ],
+            "launches": self.launches,
+            "recycles": self.recycles,
+            "checkouts": self.checkouts,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "chromium_rss_mb": _to_mb(chromium_rss_bytes()),
+            "last_error": self.last_error,
+        }
+
+
+def _to_mb(value: Optional[int]) -> Optional[float]:
+    return None if value is None else round(value / (1024 * 1024), 1)
+
+
+def chromium_rss_bytes() -> Optional[int]:
+    """Resident memory of Chromium processes descended from this process (Linux only)."""
+    if not os.path.isdir("/proc"):
+        return None
+    children: Dict[int, List[int]] = {}
+    names: Dict[int, str] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as fh:
+                stat = fh.read().decode("utf-8", errors="ignore")
+        except OSError:
+            continue
+        # pid (comm) state ppid ...
+        name = stat[stat.find("(") + 1 : stat.rfind(")")]
+        fields = stat[stat.rfind(")") + 2 :].split()
+        if len(fields) < 2:
+            continue
+        pid, ppid = int(entry), int(fields[1])
+        names[pid] = name
+        children.setdefault(ppid, []).append(pid)
+
+    total = 0
+    stack = list(children.get(os.getpid(), []))
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        if "chrom" not in names.get(pid, "") and "headless" not in names.get(pid, ""):
+            continue
+        try:
+            with open(f"/proc/{pid}/statm") as fh:
+                total += int(fh.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Ordered rule table: the first rule (top to bottom) with any pattern present in
+# the field text wins, exactly like the old if-chains. Patterns are plain
+# lowercase substrings; add new canonical keys/question types here.
+CANONICAL_FIELD_RULES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("cover_letter", ("cover letter",)),
+    ("key_skills", ("skill",)),
+    ("years_experience", ("experience", "years")),
+    ("work_authorization", ("work authorization", "authorized")),
+    ("visa_sponsorship", ("visa", "sponsorship")),
+    ("relocation", ("relocation", "relocate")),
+    ("notice_period", ("notice",)),
+    ("expected_salary", ("salary", "compensation")),
+    ("location", ("location", "city")),
+    ("linkedin", ("linkedin",)),
+    ("github", ("github",)),
+]
+
+DEFAULT_ATTRIBUTES: Tuple[str, ...] = ("label", "raw_name", "placeholder", "type")
+# Workday field ids are automation ids like "legalNameSection_firstName" and carry signal.
+WORKDAY_ATTRIBUTES: Tuple[str, ...] = DEFAULT_ATTRIBUTES + ("field_id",)
+
+# Separates fields in a batch haystack; patterns never contain it.
+_FIELD_SEPARATOR = "\n"
+
+
+class CanonicalMatch(NamedTuple):
+    key: str
+    pattern: str
+    attribute: str
+
+
+class CanonicalFieldClassifier:
+    """Maps discovered portal fields to canonical answer keys with one compiled regex."""
+
+    def __init__(self, rules: Sequence[Tuple[str, Sequence[str]]] = CANONICAL_FIELD_RULES) -> None:
+        self._patterns: List[Tuple[int, str, str]] = []  # (priority, key, pattern), in regex group order
+        for priority, (key, patterns) in enumerate(rules):
+            for pattern in patterns:
+                pattern = pattern.strip().lower()
+                if pattern and _FIELD_SEPARATOR not in pattern:
+                    self._patterns.append((priority, key, pattern))
+        # Zero-width lookahead reports a match at every offset (overlaps included);
+        # alternatives are ordered by rule priority, so each offset yields its
+        # best rule and the best over all offsets is the first-rule-wins answer.
+        alternation = "|".join(f"({re.escape(pattern)})" for _, _, pattern in self._patterns)
+        self._regex = re.compile(f"(?=(?:{alternation}))") if self._patterns else None
+
+    @property
+    def keys(self) -> List[str]:
+        return list(dict.fromkeys(key for _, key, _ in self._patterns))
+
+    def classify(
+        self, field: Any, attributes: Sequence[str] = DEFAULT_ATTRIBUTES
+    ) -> Optional[CanonicalMatch]:
+        return self.classify_many([field], attributes)[0]
+
+    def key_for(self, field: Any, attributes: Sequence[str] = DEFAULT_ATTRIBUTES) -> Optional[str]:
+        match = self.classify(field, attributes)
+        return match.key if match else None
+
+    def classify_many(
+        self, fields: Iterable[Any], attributes: Sequence[str] = DEFAULT_ATTRIBUTES
+    ) -> List[Optional[CanonicalMatch]]:
+        """Classify a batch of fields (DiscoveredField or dict) with a single regex scan."""
+        segments: List[str] = []
+        starts: List[int] = []  # offset of each attribute segment in the batch haystack
+        owners: List[Tuple[int, str]] = []  # (field index, attribute) for each segment
+        offset = 0
+        count = 0
+        for index, field in enumerate(fields):
+            count += 1
+            if index:
+                segments.append(_FIELD_SEPARATOR)
+                offset += 1
+            for position, attribute in enumerate(attributes):
+                if position:
+                    # Attributes are joined with a space, as the old per-adapter haystacks were.
+                    segments.append(" ")
+                    offset += 1
+                text = _attribute_text(field, attribute)
+                starts.append(offset)
+                owners.append((index, attribute))
+                segments.append(text)
+                offset += len(text)
+
+        best: List[Optional[Tuple[int, int, int]]] = [None] * count  # (priority, group, offset)
+        if self._regex is not None and count:
+            haystack = "".join(segments)
+            for m in self._regex.finditer(haystack):
+                group = m.lastindex or 0
+                if not group:
+                    continue
+                priority = self._patterns[group - 1][0]
+                field_index = owners[bisect_right(starts, m.start()) - 1][0]
+                current = best[field_index]
+                if current is None or priority < current[0]:
+                    best[field_index] = (priority, group, m.start())
+
+        results: List[Optional[CanonicalMatch]] = []
+        for hit in best:
+            if hit is None:
+                results.append(None)
+                continue
+            _, group, start = hit
+            _, key, pattern = self._patterns[group - 1]
+            attribute = owners[bisect_right(starts, start) - 1][1]
+            results.append(CanonicalMatch(key=key, pattern=pattern, attribute=attribute))
+        return results
+
+
+def _attribute_text(field: Any, attribute: str) -> str:
+    if isinstance(field, dict):
+        value = field.get(attribute)
+    else:
+        value = getattr(field, attribute, None)
+    return str(value or "").strip().lower().replace(_FIELD_SEPARATOR, " ")
+
+
+canonical_field_classifier = CanonicalFieldClassifier()
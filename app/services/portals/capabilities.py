@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+_HAS_DIGIT = re.compile(r"\d")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def path_pattern(url: str, depth: int = 4) -> str:
+    """host plus the first path segments, ids and slugs (anything with a digit) as '*'."""
+    parts = urlsplit(url or "")
+    segments = [segment for segment in parts.path.split("/") if segment][:depth]
+    normalized = ["*" if _HAS_DIGIT.search(segment) else segment.lower() for segment in segments]
+    return "/".join([(parts.hostname or "").lower(), *normalized])
+
+
+@dataclass
+class Capability:
+    confirmations: int = 0  # consecutive runs where static matched the browser's field count
+    samples: int = 0
+    verified_at: float = 0.0
+
+
+class CapabilityCache:
+    """
+    Learned "needs a browser" verdicts per host and path pattern.
+
+    Each time discovery renders a page in the browser, the static field count
+    of the same page is compared with the browser's. After `proven_after`
+    consecutive matches the pattern is treated as static-sufficient and the
+    browser is skipped, except for a `probe_rate` sample of runs that
+    re-verify it; one probe where the browser finds more fields revokes the
+    verdict. Verdicts older than `ttl_seconds` are re-learned.
+    """
+
+    def __init__(
+        self,
+        proven_after: Optional[int] = None,
+        probe_rate: Optional[float] = None,
+        ttl_seconds: Optional[int] = None,
+        max_patterns: int = 4096,
+    ) -> None:
+        self.proven_after = proven_after or _env_int("CAPABILITY_PROVEN_AFTER", 2)
+        self.probe_rate = _env_float("CAPABILITY_PROBE_RATE", 0.05) if probe_rate is None else probe_rate
+        self.ttl_seconds = ttl_seconds or _env_int("CAPABILITY_TTL_S", 7 * 24 * 3600)
+        self.max_patterns = max_patterns
+        self._entries: "OrderedDict[str, Capability]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.browser_skipped = 0
+        self.probes = 0
+        self.revoked = 0
+
+    def static_sufficient(self, url: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(path_pattern(url))
+            if entry is None:
+                return False
+            if time.monotonic() - entry.verified_at > self.ttl_seconds:
+                entry.confirmations = 0
+            return entry.confirmations >= self.proven_after
+
+    def skip_browser(self, url: str) -> bool:
+        """True to skip the browser for `url`; a sampled fraction of proven patterns is probed instead."""
+        if not self.static_sufficient(url):
+            return False
+        if random.random() < self.probe_rate:
+            self.probes += 1
+            return False
+        self.browser_skipped += 1
+        return True
+
+    def record(self, url: str, static_fields: int, browser_fields: int) -> None:
+        """Outcome of a rendered page: how many fields static parsing and the browser each found."""
+        key = path_pattern(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = Capability()
+                while len(self._entries) > self.max_patterns:
+                    self._entries.popitem(last=False)
+            self._entries.move_to_end(key)
+            if static_fields >= browser_fields:
+                entry.confirmations += 1
+            else:
+                if entry.confirmations >= self.proven_after:
+                    self.revoked += 1
+                entry.confirmations = 0
+            entry.samples += 1
+            entry.verified_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            proven = sum(1 for entry in self._entries.values() if entry.confirmations >= self.proven_after)
+            patterns = len(self._entries)
+        return {
+            "patterns": patterns,
+            "static_sufficient": proven,
+            "browser_skipped": self.browser_skipped,
+            "probes": self.probes,
+            "revoked": self.revoked,
+            "probe_rate": self.probe_rate,
+        }
+
+
+capability_cache = CapabilityCache()
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.services.portals.browser_fetch import looks_like_js_shell
+from app.services.portals.capabilities import capability_cache
+from app.services.portals.greenhouse import board_api_url
+from app.services.portals.parsed_page import PageInput, parse_page
+
+# Discovery paths after the static parse of the supplied page_html.
+CACHED_SCHEMA = "cached_schema"
+STATIC = "static"
+PORTAL_API = "portal_api"
+BROWSER = "browser"
+
+# Cost (ms) assumed before a host has any samples.
+PRIOR_COST_MS = {CACHED_SCHEMA: 0.1, STATIC: 5.0, PORTAL_API: 400.0, BROWSER: 6000.0}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _host(url: str) -> str:
+    return (urlsplit(url or "").hostname or "").lower()
+
+
+def schema_key(url: str) -> str:
+    """Posting identity for cached schemas: host and path, no query or fragment."""
+    parts = urlsplit(url or "")
+    return f"{(parts.hostname or '').lower()}{parts.path.rstrip('/')}"
+
+
+@dataclass
+class Estimate:
+    cost_ms: float
+    fields: float
+    samples: int = 0
+
+
+class DiscoveryPlanner:
+    """
+    Chooses how discover_fields gets a form's fields once the static parse of
+    page_html falls short of `min_fields`: a schema cached from an earlier run,
+    the portal's JSON API, or a headless browser.
+
+    Available paths are tried cheapest first among those expected to reach
+    `min_fields`; per-host EWMAs of cost and field yield are updated after
+    every attempt, so a host whose API returns nothing stops being tried first.
+    """
+
+    def __init__(
+        self,
+        min_fields: Optional[int] = None,
+        alpha: float = 0.3,
+        max_hosts: int = 4096,
+        max_schemas: Optional[int] = None,
+        schema_ttl_seconds: Optional[int] = None,
+    ) -> None:
+        self.min_fields = min_fields or _env_int("DISCOVERY_MIN_FIELDS", 3)
+        self.alpha = alpha
+        self.max_hosts = max_hosts
+        self.max_schemas = max_schemas or _env_int("DISCOVERY_SCHEMA_CACHE_SIZE", 2048)
+        self.schema_ttl_seconds = schema_ttl_seconds or _env_int("DISCOVERY_SCHEMA_TTL_S", 24 * 3600)
+        self._estimates: "OrderedDict[str, Dict[str, Estimate]]" = OrderedDict()
+        self._schemas: "OrderedDict[str, Tuple[float, str, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.attempts: Dict[str, int] = {}
+        self.met_target: Dict[str, int] = {}
+
+    def available(self, url: str, page: PageInput, portal: Optional[str], probe: bool = True) -> List[str]:
+        """
+        Paths that apply to this page beyond the static parse. The browser is left
+        out where static discovery is proven sufficient (see CapabilityCache), but
+        with `probe` a sample of those runs keeps it to re-verify.
+        """
+        paths = []
+        if self.cached_schema(url) is not None:
+            paths.append(CACHED_SCHEMA)
+        if board_api_url(url) is not None:
+            paths.append(PORTAL_API)
+        if portal == "workday" or looks_like_js_shell(parse_page(page).html):
+            skip = capability_cache.skip_browser(url) if probe else capability_cache.static_sufficient(url)
+            if not skip:
+                paths.append(BROWSER)
+        return paths
+
+    def plan(self, url: str, paths: List[str]) -> List[str]:
+        """`paths` ordered by (unlikely to reach min_fields, expected cost)."""
+        with self._lock:
+            host = dict(self._estimates.get(_host(url)) or {})
+
+        def rank(path: str) -> Tuple[bool, float]:
+            estimate = host.get(path)
+            if estimate is None:
+                return False, PRIOR_COST_MS[path]
+            return estimate.fields < self.min_fields, estimate.cost_ms
+
+        return sorted(paths, key=rank)
+
+    def browser_likely(self, url: str, page: PageInput, portal: Optional[str]) -> bool:
+        """Whether discover_fields will probably end up in the browser (prefetch trigger)."""
+        parsed = parse_page(page)
+        if len(parsed.controls) >= self.min_fields:
+            return False
+        paths = self.available(url, parsed, portal, probe=False)
+        return BROWSER in paths and self.plan(url, paths)[0] == BROWSER
+
+    def record(self, url: str, path: str, cost_ms: float, fields: int) -> None:
+        host = _host(url)
+        with self._lock:
+            estimates = self._estimates.get(host)
+            if estimates is None:
+                estimates = self._estimates[host] = {}
+                while len(self._estimates) > self.max_hosts:
+                    self._estimates.popitem(last=False)
+            self._estimates.move_to_end(host)
+            estimate = estimates.get(path)
+            if estimate is None:
+                estimates[path] = Estimate(cost_ms=cost_ms, fields=float(fields), samples=1)
+            else:
+                estimate.cost_ms += self.alpha * (cost_ms - estimate.cost_ms)
+                estimate.fields += self.alpha * (fields - estimate.fields)
+                estimate.samples += 1
+            self.attempts[path] = self.attempts.get(path, 0) + 1
+            if fields >= self.min_fields:
+                self.met_target[path] = self.met_target.get(path, 0) + 1
+
+    def cached_schema(self, url: str) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        key = schema_key(url)
+        with self._lock:
+            entry = self._schemas.get(key)
+            if entry is None:
+                return None
+            saved_at, portal, fields = entry
+            if time.monotonic() - saved_at > self.schema_ttl_seconds:
+                del self._schemas[key]
+                return None
+            self._schemas.move_to_end(key)
+            return portal, fields
+
+    def remember_schema(self, url: str, portal: str, fields: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._schemas[schema_key(url)] = (time.monotonic(), portal, fields)
+            self._schemas.move_to_end(schema_key(url))
+            while len(self._schemas) > self.max_schemas:
+                self._schemas.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "min_fields": self.min_fields,
+                "hosts": len(self._estimates),
+                "schemas": len(self._schemas),
+                "attempts": dict(self.attempts),
+                "met_target": dict(self.met_target),
+            }
+
+
+discovery_planner = DiscoveryPlanner()
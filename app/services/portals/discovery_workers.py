@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from app.schemas.discovery import DiscoveredField
+from app.services.portals.parsed_page import ParsedPage
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _discover_in_worker(adapter_name: str, url: str, html: str) -> List[DiscoveredField]:
+    from app.services.portals.registry import adapters
+
+    for adapter in adapters:
+        if adapter.name == adapter_name:
+            return adapter.discover_fields(url, html)
+    return []
+
+
+class DiscoveryWorkers:
+    """
+    Static field discovery of large pages in worker processes.
+
+    Parsing (lxml + DomIndex) is CPU-bound and would otherwise run on the event
+    loop's core; batches of runs then scale with DISCOVERY_WORKERS instead of
+    queueing behind one another. Small pages stay inline, where IPC would cost
+    more than the parse.
+    """
+
+    def __init__(self, workers: Optional[int] = None, min_bytes: Optional[int] = None) -> None:
+        default_workers = max(0, min(4, (os.cpu_count() or 1) - 1))
+        self.workers = _env_int("DISCOVERY_WORKERS", default_workers) if workers is None else workers
+        self.min_bytes = _env_int("DISCOVERY_OFFLOAD_MIN_BYTES", 64 * 1024) if min_bytes is None else min_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.offloaded = 0
+        self.inline = 0
+        self.failures = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Not fork: by now the process runs the step-log writer, to_thread and
+            # Playwright threads, and a forked child could inherit a held lock.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(method)
+            )
+        return self._executor
+
+    async def discover(self, adapter: Any, url: str, page: ParsedPage) -> List[DiscoveredField]:
+        name = getattr(adapter, "name", "generic")
+        if self.workers <= 0 or len(page.html) < self.min_bytes or name == "generic":
+            self.inline += 1
+            return adapter.discover_fields(url, page)
+        try:
+            fields = await asyncio.get_running_loop().run_in_executor(
+                self._pool(), _discover_in_worker, name, url, page.html
+            )
+        except Exception:  # noqa: BLE001 - broken pool / pickling: parse here instead
+            self.failures += 1
+            self.shutdown()
+            return adapter.discover_fields(url, page)
+        self.offloaded += 1
+        return fields
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "min_bytes": self.min_bytes,
+            "offloaded": self.offloaded,
+            "inline": self.inline,
+            "failures": self.failures,
+        }
+
+
+discovery_workers = DiscoveryWorkers()
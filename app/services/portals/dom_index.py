@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from bs4.element import CData, NavigableString, Tag
+
+# Strings that Tag.get_text() considers by default (no comments, scripts, styles).
+TEXT_TYPES = (NavigableString, CData)
+
+LABELISH_TAGS = {"label", "span", "div"}
+FIELD_LABEL_AUTOMATION_IDS = {"label", "fieldLabel"}
+HEADING_TAGS = {"legend", "h1", "h2", "h3", "h4", "label", "span", "div"}
+
+# Adapters only accept container text up to this length as a label.
+DEFAULT_TEXT_LIMIT = 80
+
+
+class DomIndex:
+    """
+    Lookups the portal adapters need, built in one pass over the tree.
+
+    Replaces per-field `soup.find(id=...)`, `root.find("label", for=...)`, ancestor
+    `get_text()` calls and `find_previous()` scans, which made discovery
+    O(fields x DOM size) on large Workday forms. Elements are keyed by `id()`
+    because bs4's Tag.__hash__ serialises the whole subtree.
+    """
+
+    def __init__(self, soup: Tag, root: Optional[Tag] = None, text_limit: int = DEFAULT_TEXT_LIMIT) -> None:
+        self.text_limit = text_limit
+        self.by_id: Dict[str, Tag] = {}
+        self.label_for: Dict[str, Tag] = {}
+        self._bounded_text: Dict[int, Optional[str]] = {}
+        self._first_labelish: Dict[int, Tag] = {}
+        self._first_field_label: Dict[int, Tag] = {}
+        self._prev_heading: Dict[int, Tag] = {}
+        self._text: Dict[int, str] = {}
+        self._build(soup, root if root is not None else soup)
+
+    def _build(self, soup: Tag, root: Tag) -> None:
+        # Iterative pre/post-order walk: pre-order records document-order facts
+        # (first id, first label[for], previous heading), post-order folds the
+        # children's bounded text and "first descendant" lookups into the parent.
+        limit = self.text_limit
+        last_heading: Optional[Tag] = None
+        in_root = root is soup
+        stack: List[Any] = [(soup, False)]
+
+        while stack:
+            node, leaving = stack.pop()
+            if leaving:
+                self._fold(node, limit)
+                if node is root and root is not soup:
+                    in_root = False
+                continue
+
+            if node is root:
+                in_root = True
+
+            attrs = node.attrs
+            el_id = attrs.get("id")
+            if el_id and el_id not in self.by_id:
+                self.by_id[el_id] = node
+            if in_root and node.name == "label":
+                target = attrs.get("for")
+                if target and target not in self.label_for:
+                    self.label_for[target] = node
+            if attrs.get("role") == "radiogroup" and last_heading is not None:
+                self._prev_heading[id(node)] = last_heading
+            if node.name in HEADING_TAGS:
+                last_heading = node
+
+            stack.append((node, True))
+            for child in reversed(node.contents):
+                if isinstance(child, Tag):
+                    stack.append((child, False))
+
+    def _fold(self, node: Tag, limit: int) -> None:
+        pieces: List[str] = []
+        size = 0
+        overflow = False
+        first_labelish: Optional[Tag] = None
+        first_field_label: Optional[Tag] = None
+
+        for child in node.contents:
+            if isinstance(child, Tag):
+                key = id(child)
+                if first_labelish is None:
+                    if child.name in LABELISH_TAGS:
+                        first_labelish = child
+                    else:
+                        first_labelish = self._first_labelish.get(key)
+                if first_field_label is None:
+                    if (
+                        child.name in LABELISH_TAGS
+                        and child.attrs.get("data-automation-id") in FIELD_LABEL_AUTOMATION_IDS
+                    ):
+                        first_field_label = child
+                    else:
+                        first_field_label = self._first_field_label.get(key)
+                if overflow:
+                    continue
+                text = self._bounded_text.get(key)
+                if text is None:
+                    overflow = True
+                    continue
+            elif type(child) in TEXT_TYPES:
+                if overflow:
+                    continue
+                text = child.strip()
+            else:
+                continue
+
+            if text:
+                size += len(text) + (1 if pieces else 0)
+                if size > limit:
+                    overflow = True
+                    continue
+                pieces.append(text)
+
+        key = id(node)
+        self._bounded_text[key] = None if overflow else " ".join(pieces)
+        if first_labelish is not None:
+            self._first_labelish[key] = first_labelish
+        if first_field_label is not None:
+            self._first_field_label[key] = first_field_label
+
+    def text(self, el: Optional[Tag]) -> str:
+        """Full `get_text(" ", strip=True)` of an element, memoised."""
+        if el is None:
+            return ""
+        key = id(el)
+        cached = self._text.get(key)
+        if cached is None:
+            cached = el.get_text(" ", strip=True)
+            self._text[key] = cached
+        return cached
+
+    def bounded_text(self, el: Optional[Tag]) -> str:
+        """Text of `el` if it is at most `text_limit` chars, else ""."""
+        if el is None:
+            return ""
+        return self._bounded_text.get(id(el)) or ""
+
+    def first_labelish(self, el: Tag) -> Optional[Tag]:
+        """Equivalent of `el.find(["label", "span", "div"])`."""
+        return self._first_labelish.get(id(el))
+
+    def first_field_label(self, el: Tag) -> Optional[Tag]:
+        """Equivalent of `el.find(["label", "span", "div"], attrs={"data-automation-id": ["label", "fieldLabel"]})`."""
+        return self._first_field_label.get(id(el))
+
+    def previous_heading(self, el: Tag) -> Optional[Tag]:
+        """Equivalent of `el.find_previous(HEADING_TAGS)`, recorded for radiogroups only."""
+        return self._prev_heading.get(id(el))
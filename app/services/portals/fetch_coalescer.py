@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+MAX_FAILURES = 4096  # negative-cache entries before stale ones are pruned
+# Query parameters that only track the click and never change the page.
+TRACKING_PARAMS = {"gh_src", "source", "src", "ref", "referrer", "lever-source", "lever-origin", "fbclid", "gclid"}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def normalize_url(url: str) -> str:
+    """Coalescing key: lowercased scheme/host, no fragment, tracking params dropped, query sorted."""
+    parts = urlsplit((url or "").strip())
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+@dataclass
+class _Flight:
+    task: "asyncio.Task[Any]"
+    waiters: int = 0
+
+
+@dataclass
+class _Failure:
+    result: Any
+    failures: int
+    retry_at: float
+
+
+class FetchCoalescer:
+    """
+    Single-flight page fetches: concurrent callers for the same normalized URL
+    await one in-flight fetch and share its result. The fetch is cancelled
+    only when every caller has gone.
+
+    Failed results (per `failed`) are served from a negative cache until
+    `retry_at`; the backoff doubles from `base_backoff` up to `max_backoff`
+    with each consecutive failure and resets on the first success.
+    """
+
+    def __init__(
+        self,
+        failed: Callable[[Any], bool],
+        base_backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+    ) -> None:
+        self.failed = failed
+        self.base_backoff = base_backoff or _env_float("FETCH_FAILURE_BACKOFF_S", 5.0)
+        self.max_backoff = max_backoff or _env_float("FETCH_FAILURE_BACKOFF_MAX_S", 300.0)
+        # Tasks belong to one event loop; sync callers run each request in a fresh loop.
+        self._inflight: Dict[Tuple[int, str], _Flight] = {}
+        self._failures: Dict[str, _Failure] = {}
+        self.fetches = 0
+        self.coalesced = 0
+        self.negative_hits = 0
+        self.failures = 0
+
+    async def fetch(self, url: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of `fetch()` for `url`, shared with concurrent callers of the same URL."""
+        key = normalize_url(url)
+        failure = self._failures.get(key)
+        if failure is not None and time.monotonic() < failure.retry_at:
+            self.negative_hits += 1
+            return failure.result
+
+        flight_key = (id(asyncio.get_running_loop()), key)
+        flight = self._inflight.get(flight_key)
+        if flight is None or flight.task.done():
+            flight = _Flight(task=asyncio.ensure_future(fetch()))
+            self._inflight[flight_key] = flight
+            flight.task.add_done_callback(lambda task: self._settle(flight_key, key, task))
+            self.fetches += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _settle(self, flight_key: Tuple[int, str], key: str, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(flight_key) is not None and self._inflight[flight_key].task is task:
+            del self._inflight[flight_key]
+        # Exceptions reach the callers of this flight and are not cached.
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if not self.failed(result):
+            self._failures.pop(key, None)
+            return
+        self.failures += 1
+        now = time.monotonic()
+        previous = self._failures.get(key)
+        failures = previous.failures + 1 if previous is not None else 1
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** (failures - 1))
+        self._failures[key] = _Failure(result=result, failures=failures, retry_at=now + backoff)
+        if len(self._failures) > MAX_FAILURES:
+            # Entries past their backoff window no longer affect the next backoff.
+            for stale in [k for k, f in self._failures.items() if f.retry_at + self.max_backoff < now]:
+                del self._failures[stale]
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "inflight": len(self._inflight),
+            "fetches": self.fetches,
+            "coalesced": self.coalesced,
+            "failures": self.failures,
+            "negative_hits": self.negative_hits,
+            "backing_off": sum(1 for failure in self._failures.values() if failure.retry_at > now),
+        }
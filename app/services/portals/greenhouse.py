@@ -1,25 +1,87 @@
 from __future__ import annotations
 
+import json
+import re
 from typing import List, Optional
-
-from bs4 import BeautifulSoup
+from urllib.parse import parse_qs, quote, urlsplit
+from urllib.request import Request, urlopen
 
 from app.schemas.discovery import DiscoveredField, FillAction
+from app.services.portals.canonical_fields import canonical_field_classifier
+from app.services.portals.parsed_page import PageInput, parse_page
+
+BOARD_API = "https://boards-api.greenhouse.io/v1/boards/{board}/jobs/{job_id}?questions=true"
+_JOB_PATH = re.compile(r"^/(?P<board>[^/]+)/jobs/(?P<job_id>\d+)")
+_QUESTION_TYPES = {
+    "input_text": "text",
+    "textarea": "textarea",
+    "input_file": "file",
+    "multi_value_single_select": "select",
+    "multi_value_multi_select": "select",
+}
+
+
+def board_api_url(url: str) -> Optional[str]:
+    """Job Board API URL for a Greenhouse posting (hosted board or embed), if recognisable."""
+    parts = urlsplit(url or "")
+    host = (parts.hostname or "").lower()
+    if host != "greenhouse.io" and not host.endswith(".greenhouse.io"):
+        return None
+    match = _JOB_PATH.match(parts.path)
+    if match:
+        board, job_id = match.group("board"), match.group("job_id")
+    else:
+        query = parse_qs(parts.query)
+        board, job_id = query.get("for", [""])[0], query.get("token", [""])[0]
+    if not board or not job_id.isdigit():
+        return None
+    return BOARD_API.format(board=quote(board, safe=""), job_id=job_id)
+
+
+def fetch_board_questions(url: str, timeout: float = 5.0) -> Optional[List[DiscoveredField]]:
+    """Application questions from the public Job Board API; None when the posting has no API URL."""
+    api_url = board_api_url(url)
+    if api_url is None:
+        return None
+    request = Request(api_url, headers={"Accept": "application/json"})
+    with urlopen(request, timeout=timeout) as response:
+        payload = json.loads(response.read().decode("utf-8"))
+
+    fields: List[DiscoveredField] = []
+    for question in payload.get("questions") or []:
+        for item in question.get("fields") or []:
+            field_type = _QUESTION_TYPES.get(item.get("type", ""))
+            name = item.get("name")
+            if field_type is None or not name:
+                continue
+            fields.append(
+                DiscoveredField(
+                    field_id=str(name),
+                    label=question.get("label") or str(name),
+                    type=field_type,
+                    required=bool(question.get("required")),
+                    options=[str(value.get("label")) for value in item.get("values") or [] if value.get("label")],
+                    raw_name=str(name),
+                    source_portal="greenhouse",
+                )
+            )
+    return fields
 
 
 class GreenhouseAdapter:
     name = "greenhouse"
+    version = 2  # discovery cache key: bump when discover_fields changes
 
-    def matches(self, url: str, html: str) -> bool:
+    def matches(self, url: str, html: PageInput) -> bool:
         url_lower = url.lower()
         if "greenhouse.io" in url_lower or "boards.greenhouse.io" in url_lower:
             return True
-        if "greenhouse" in html.lower():
+        if "greenhouse" in parse_page(html).lower:
             return True
         return False
 
-    def discover_fields(self, url: str, html: str) -> List[DiscoveredField]:
-        soup = BeautifulSoup(html, "html.parser")
+    def discover_fields(self, url: str, html: PageInput) -> List[DiscoveredField]:
+        page = parse_page(html)
         fields: List[DiscoveredField] = []
 
         def extract_label(element) -> str:
@@ -30,11 +92,9 @@ class GreenhouseAdapter:
                 return label
             return element.get("aria-label", "") or element.get("placeholder", "") or ""
 
-        form = soup.find("form")
-        if not form:
-            form = soup
+        index = page.index
 
-        for input_el in form.find_all(["input", "textarea", "select"]):
+        for input_el in page.controls:
             field_type = input_el.get("type", "text").lower()
             tag_name = input_el.name
             if tag_name == "textarea":
@@ -48,7 +108,7 @@ class GreenhouseAdapter:
 
             label_el = None
             if input_el.get("id"):
-                label_el = form.find("label", attrs={"for": input_el.get("id")})
+                label_el = index.label_for.get(input_el.get("id"))
             label = extract_label(label_el) or input_el.get("aria-label", "") or input_el.get("name", "")
 
             options: List[str] = []
@@ -81,46 +141,10 @@ class GreenhouseAdapter:
     def build_fill_actions(self, fields: List[DiscoveredField], answers: dict[str, str]) -> List[FillAction]:
         actions: List[FillAction] = []
 
-        def normalize(text: Optional[str]) -> str:
-            return (text or "").strip().lower()
-
-        def match_key(field: DiscoveredField) -> Optional[str]:
-            haystack = " ".join(
-                [
-                    normalize(field.label),
-                    normalize(field.raw_name),
-                    normalize(field.placeholder),
-                    normalize(field.type),
-                ]
-            )
-            if "cover letter" in haystack:
-                return "cover_letter"
-            if "skill" in haystack:
-                return "key_skills"
-            if "experience" in haystack or "years" in haystack:
-                return "years_experience"
-            if "work authorization" in haystack or "authorized" in haystack:
-                return "work_authorization"
-            if "visa" in haystack or "sponsorship" in haystack:
-                return "visa_sponsorship"
-            if "relocation" in haystack or "relocate" in haystack:
-                return "relocation"
-            if "notice" in haystack:
-                return "notice_period"
-            if "salary" in haystack or "compensation" in haystack:
-                return "expected_salary"
-            if "location" in haystack or "city" in haystack:
-                return "location"
-            if "linkedin" in haystack:
-                return "linkedin"
-            if "github" in haystack:
-                return "github"
-            return None
-
-        for field in fields:
-            key = match_key(field)
-            if not key:
+        for field, match in zip(fields, canonical_field_classifier.classify_many(fields)):
+            if match is None:
                 continue
+            key = match.key
             if key not in answers:
                 continue
 
@@ -136,7 +160,7 @@ class GreenhouseAdapter:
                 confidence = 0.6
             elif field.type == "checkbox":
                 action_type = "check"
-                value = "true" if normalize(value) in {"yes", "true", "1"} else "false"
+                value = "true" if str(value).strip().lower() in {"yes", "true", "1"} else "false"
                 confidence = 0.6
             elif field.type == "file":
                 action_type = "upload"
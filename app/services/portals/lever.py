@@ -1,25 +1,27 @@
 from __future__ import annotations
 
-from typing import List, Optional
-
-from bs4 import BeautifulSoup
+from typing import List
 
 from app.schemas.discovery import DiscoveredField, FillAction
+from app.services.portals.canonical_fields import canonical_field_classifier
+from app.services.portals.parsed_page import PageInput, parse_page
 
 
 class LeverAdapter:
     name = "lever"
+    version = 2  # discovery cache key: bump when discover_fields changes
 
-    def matches(self, url: str, html: str) -> bool:
+    def matches(self, url: str, html: PageInput) -> bool:
         url_lower = url.lower()
         if "lever.co" in url_lower:
             return True
-        if "lever" in html.lower() and "application" in html.lower():
+        html_lower = parse_page(html).lower
+        if "lever" in html_lower and "application" in html_lower:
             return True
         return False
 
-    def discover_fields(self, url: str, html: str) -> List[DiscoveredField]:
-        soup = BeautifulSoup(html, "html.parser")
+    def discover_fields(self, url: str, html: PageInput) -> List[DiscoveredField]:
+        page = parse_page(html)
         fields: List[DiscoveredField] = []
 
         def extract_label(element) -> str:
@@ -30,11 +32,9 @@ class LeverAdapter:
                 return label
             return element.get("aria-label", "") or element.get("placeholder", "") or ""
 
-        form = soup.find("form")
-        if not form:
-            form = soup
+        index = page.index
 
-        for input_el in form.find_all(["input", "textarea", "select"]):
+        for input_el in page.controls:
             tag_name = input_el.name
             field_type = input_el.get("type", "text").lower()
             if tag_name == "textarea":
@@ -53,7 +53,7 @@ class LeverAdapter:
 
             label_el = None
             if input_el.get("id"):
-                label_el = form.find("label", attrs={"for": input_el.get("id")})
+                label_el = index.label_for.get(input_el.get("id"))
             label = extract_label(label_el) or input_el.get("aria-label", "") or input_el.get("name", "")
 
             options: List[str] = []
@@ -86,42 +86,6 @@ class LeverAdapter:
     def build_fill_actions(self, fields: List[DiscoveredField], answers: dict[str, str]) -> List[FillAction]:
         actions: List[FillAction] = []
 
-        def normalize(text: Optional[str]) -> str:
-            return (text or "").strip().lower()
-
-        def match_key(field: DiscoveredField) -> Optional[str]:
-            haystack = " ".join(
-                [
-                    normalize(field.label),
-                    normalize(field.raw_name),
-                    normalize(field.placeholder),
-                    normalize(field.type),
-                ]
-            )
-            if "cover letter" in haystack:
-                return "cover_letter"
-            if "skill" in haystack:
-                return "key_skills"
-            if "experience" in haystack or "years" in haystack:
-                return "years_experience"
-            if "work authorization" in haystack or "authorized" in haystack:
-                return "work_authorization"
-            if "visa" in haystack or "sponsorship" in haystack:
-                return "visa_sponsorship"
-            if "relocation" in haystack or "relocate" in haystack:
-                return "relocation"
-            if "notice" in haystack:
-                return "notice_period"
-            if "salary" in haystack or "compensation" in haystack:
-                return "expected_salary"
-            if "location" in haystack or "city" in haystack:
-                return "location"
-            if "linkedin" in haystack:
-                return "linkedin"
-            if "github" in haystack:
-                return "github"
-            return None
-
         application_package = answers.get("application_package")
         if application_package is not None:
             actions.append(
@@ -134,10 +98,10 @@ class LeverAdapter:
                 )
             )
 
-        for field in fields:
-            key = match_key(field)
-            if not key:
+        for field, match in zip(fields, canonical_field_classifier.classify_many(fields)):
+            if match is None:
                 continue
+            key = match.key
             if key not in answers:
                 continue
 
@@ -153,7 +117,7 @@ class LeverAdapter:
                 confidence = 0.6
             elif field.type == "checkbox":
                 action_type = "check"
-                value = "true" if normalize(value) in {"yes", "true", "1"} else "false"
+                value = "true" if str(value).strip().lower() in {"yes", "true", "1"} else "false"
                 confidence = 0.6
             elif field.type == "file":
                 action_type = "upload"
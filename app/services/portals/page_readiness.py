@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+# JS predicates evaluated in the page. Kept tiny: they run on every poll.
+FORM_READY_JS = """
+(minAutomationIds) => {
+    if (location.href.toLowerCase().includes('/apply')) return true;
+    if (document.querySelectorAll('input, textarea, select').length > 0) return true;
+    return document.querySelectorAll('[data-automation-id]').length > minAutomationIds;
+}
+"""
+
+HYDRATED_JS = """
+() => !!document.querySelector('#root') || document.querySelectorAll('input, textarea, select').length > 0
+"""
+
+CHOOSER_OR_FORM_JS = """
+(minAutomationIds) => {
+    if (location.href.toLowerCase().includes('/apply')) return true;
+    if (document.querySelectorAll('input, textarea, select').length > 0) return true;
+    if (document.querySelectorAll('[data-automation-id]').length > minAutomationIds) return true;
+    const text = document.body ? document.body.innerText : '';
+    return text.includes('Autofill with Resume') || text.includes('Apply Manually');
+}
+"""
+
+INSTALL_MUTATION_OBSERVER_JS = """
+() => {
+    window.__aaLastMutation = performance.now();
+    if (window.__aaObserver) return;
+    window.__aaObserver = new MutationObserver(() => { window.__aaLastMutation = performance.now(); });
+    window.__aaObserver.observe(document, {childList: true, subtree: true, attributes: true});
+}
+"""
+
+DOM_QUIET_JS = """
+(quietMs) => performance.now() - (window.__aaLastMutation || 0) >= quietMs
+"""
+
+
+@dataclass(frozen=True)
+class ReadinessConfig:
+    """Per-signal deadlines (ms). Each phase ends as soon as its signal fires."""
+
+    hydrate_ms: int = 15_000
+    after_apply_ms: int = 5_000
+    after_chooser_ms: int = 8_000
+    form_ready_ms: int = 6_000
+    dom_quiet_ms: int = 400
+    dom_quiet_deadline_ms: int = 3_000
+    network_idle_ms: int = 3_000
+    min_automation_ids: int = 20
+    poll_ms: int = 100
+
+
+DEFAULT_READINESS = ReadinessConfig()
+
+
+class PageReadiness:
+    """
+    Waits on concrete page signals instead of fixed sleeps.
+
+    Every wait is a named phase with its own deadline; `timings` (ms) and `met`
+    record how long each phase took and whether its signal fired, and end up
+    on BrowserSnapshot.
+    """
+
+    def __init__(self, page: Any, config: ReadinessConfig = DEFAULT_READINESS) -> None:
+        self.page = page
+        self.config = config
+        self.timings: Dict[str, float] = {}
+        self.met: Dict[str, bool] = {}
+
+    async def _wait_function(self, name: str, js: str, arg: Any, timeout_ms: int) -> bool:
+        start = time.monotonic()
+        deadline = start + timeout_ms / 1000
+        ok = False
+        while True:
+            remaining = int((deadline - time.monotonic()) * 1000)
+            if remaining <= 0:
+                break
+            try:
+                await self.page.wait_for_function(js, arg=arg, timeout=remaining, polling=self.config.poll_ms)
+                ok = True
+                break
+            except Exception as e:  # noqa: BLE001
+                # A navigation can destroy the execution context mid-wait; retry on the new
+                # document until the deadline. Anything else (incl. timeout) ends the phase.
+                if "context was destroyed" not in str(e).lower() and "navigat" not in str(e).lower():
+                    break
+        self._record(name, start, ok)
+        return ok
+
+    def _record(self, name: str, start: float, ok: bool) -> None:
+        self.timings[name] = round(self.timings.get(name, 0.0) + (time.monotonic() - start) * 1000, 1)
+        self.met[name] = ok
+
+    async def hydrated(self, name: str = "hydrate", timeout_ms: Optional[int] = None) -> bool:
+        return await self._wait_function(name, HYDRATED_JS, None, timeout_ms or self.config.hydrate_ms)
+
+    async def form_ready(self, name: str = "form_ready", timeout_ms: Optional[int] = None) -> bool:
+        """`/apply` in the URL, any form control, or enough data-automation-id nodes."""
+        return await self._wait_function(
+            name, FORM_READY_JS, self.config.min_automation_ids, timeout_ms or self.config.form_ready_ms
+        )
+
+    async def chooser_or_form(self, name: str = "after_apply", timeout_ms: Optional[int] = None) -> bool:
+        return await self._wait_function(
+            name, CHOOSER_OR_FORM_JS, self.config.min_automation_ids, timeout_ms or self.config.after_apply_ms
+        )
+
+    async def dom_quiet(self, name: str = "dom_quiet", timeout_ms: Optional[int] = None) -> bool:
+        """No DOM mutation for `dom_quiet_ms`."""
+        start = time.monotonic()
+        try:
+            await self.page.evaluate(INSTALL_MUTATION_OBSERVER_JS)
+        except Exception:  # noqa: BLE001
+            self._record(name, start, False)
+            return False
+        return await self._wait_function(
+            name, DOM_QUIET_JS, self.config.dom_quiet_ms, timeout_ms or self.config.dom_quiet_deadline_ms
+        )
+
+    async def network_idle(self, name: str = "network_idle", timeout_ms: Optional[int] = None) -> bool:
+        start = time.monotonic()
+        ok = True
+        try:
+            await self.page.wait_for_load_state("networkidle", timeout=timeout_ms or self.config.network_idle_ms)
+        except Exception:  # noqa: BLE001
+            ok = False
+        self._record(name, start, ok)
+        return ok
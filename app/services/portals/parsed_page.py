@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import cached_property
+from typing import Any, List, Optional, Union
+
+from bs4 import BeautifulSoup
+
+from app.services.portals.dom_index import DomIndex
+
+try:  # lxml is several times faster than html.parser on large portal pages
+    import lxml  # noqa: F401
+
+    PARSER = "lxml"
+except ImportError:  # pragma: no cover - depends on the install
+    PARSER = "html.parser"
+
+FORM_CONTROL_TAGS = ["input", "textarea", "select"]
+
+
+class ParsedPage:
+    """
+    One page of HTML, parsed once and shared by portal detection and field discovery.
+
+    Everything is computed lazily, so `matches()` only pays for the lowered text while
+    `discover_fields()` pays for the tree (once per content hash, see `parse_page`).
+    """
+
+    def __init__(self, html: str, content_hash: str) -> None:
+        self.html = html
+        self.content_hash = content_hash
+
+    def __bool__(self) -> bool:
+        return bool(self.html)
+
+    @cached_property
+    def lower(self) -> str:
+        return self.html.lower()
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        return BeautifulSoup(self.html, PARSER)
+
+    @cached_property
+    def form(self) -> Optional[Any]:
+        return self.soup.find("form")
+
+    @cached_property
+    def root(self) -> Any:
+        # Adapters scope discovery to the first <form>, falling back to the whole page.
+        return self.form or self.soup
+
+    @cached_property
+    def controls(self) -> List[Any]:
+        return self.root.find_all(FORM_CONTROL_TAGS)
+
+    @cached_property
+    def automation_nodes(self) -> List[Any]:
+        return self.root.find_all(attrs={"data-automation-id": True})
+
+    @cached_property
+    def index(self) -> DomIndex:
+        return DomIndex(self.soup, self.root)
+
+
+PageInput = Union[str, bytes, ParsedPage, None]
+
+_CACHE_SIZE = 16
+_cache: "OrderedDict[str, ParsedPage]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _resolve_html(html: Any) -> str:
+    if not html:
+        return ""
+    if isinstance(html, str):
+        return html
+    if isinstance(html, (bytes, bytearray)):
+        return bytes(html).decode("utf-8", errors="ignore")
+    # for cases where html might be a response object
+    content = getattr(html, "content", None)
+    if content is not None:
+        try:
+            content = content() if callable(content) else content
+        except Exception:
+            return ""
+        return _resolve_html(content)
+    return str(html)
+
+
+def clear_cache() -> None:
+    """Drop every shared ParsedPage (benchmarks measuring a cold parse)."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def content_hash(html: str) -> str:
+    return hashlib.blake2b(html.encode("utf-8", errors="ignore"), digest_size=16).hexdigest()
+
+
+def parse_page(html: PageInput) -> ParsedPage:
+    """Return the shared ParsedPage for this HTML, building it at most once per content hash."""
+    if isinstance(html, ParsedPage):
+        return html
+    text = _resolve_html(html)
+
+    with _cache_lock:
+        # Fast path: the orchestrator hands the very same string to every tool.
+        for page in _cache.values():
+            if page.html is text:
+                return page
+
+    key = content_hash(text)
+    with _cache_lock:
+        page = _cache.get(key)
+        if page is not None:
+            _cache.move_to_end(key)
+            return page
+        page = ParsedPage(text, key)
+        _cache[key] = page
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+        return page
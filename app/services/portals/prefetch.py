@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from app.services.portals.browser_fetch import BrowserSnapshot, fetch_html_with_playwright
+from app.services.portals.discovery_planner import discovery_planner
+from app.services.portals.parsed_page import parse_page
+from app.services.portals.registry import pick_adapter
+
+
+@dataclass
+class Prefetch:
+    url: str
+    task: "asyncio.Task[BrowserSnapshot]"
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    settled: bool = False  # consumed by discover_fields or discarded at run end
+
+
+class BrowserPrefetcher:
+    """
+    Speculative discovery fetch started when an agent run begins.
+
+    discover_fields awaits the running snapshot instead of starting its own;
+    runs that never get there (skip, blocked, budget) cancel it on exit.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None) -> None:
+        self.enabled = os.getenv("BROWSER_PREFETCH_ENABLED", "1") != "0" if enabled is None else enabled
+        self.started = 0
+        self.used = 0
+        self.cancelled = 0  # still running (or cancelled with discover) when the run ended
+        self.wasted = 0  # finished but never consumed
+        self.url_mismatch = 0  # discover asked for another URL than the one prefetched
+        self.overlap_seconds = 0.0  # fetch time hidden behind the rest of the run
+
+    def wanted(self, url: str, html: str) -> bool:
+        """Whether discover_fields will probably need the browser (see DiscoveryPlanner)."""
+        if not self.enabled or not url:
+            return False
+        page = parse_page(html)
+        return discovery_planner.browser_likely(url, page, getattr(pick_adapter(url, page), "name", "generic"))
+
+    def start(self, url: str) -> Prefetch:
+        prefetch = Prefetch(url=url, task=asyncio.ensure_future(fetch_html_with_playwright(url)))
+
+        def _finished(_: Any) -> None:
+            prefetch.finished_at = time.monotonic()
+
+        prefetch.task.add_done_callback(_finished)
+        self.started += 1
+        return prefetch
+
+    async def take(self, prefetch: Optional[Prefetch], url: str) -> BrowserSnapshot:
+        """Snapshot for `url`: the prefetched one when it matches, else a fresh fetch."""
+        if prefetch is None or prefetch.settled:
+            return await fetch_html_with_playwright(url)
+        if prefetch.url != url:
+            self.url_mismatch += 1
+            await self.discard(prefetch)
+            return await fetch_html_with_playwright(url)
+
+        waited_from = time.monotonic()
+        snap = await prefetch.task
+        prefetch.settled = True
+        self.used += 1
+        self.overlap_seconds += min(waited_from, prefetch.finished_at or waited_from) - prefetch.started_at
+        return snap
+
+    async def discard(self, prefetch: Optional[Prefetch]) -> None:
+        if prefetch is None or prefetch.settled:
+            return
+        prefetch.settled = True
+        task = prefetch.task
+        if task.done() and not task.cancelled():
+            self.wasted += 1
+            return
+        self.cancelled += 1
+        task.cancel()
+        # Let the fetch close its browser context before the run returns.
+        await asyncio.gather(task, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "started": self.started,
+            "used": self.used,
+            "cancelled": self.cancelled,
+            "wasted": self.wasted,
+            "url_mismatch": self.url_mismatch,
+            "overlap_seconds": round(self.overlap_seconds, 3),
+        }
+
+
+browser_prefetcher = BrowserPrefetcher()
@@ -6,6 +6,7 @@ from app.schemas.discovery import DiscoveredField, FillAction
 from app.services.portals.base import PortalAdapter
 from app.services.portals.greenhouse import GreenhouseAdapter
 from app.services.portals.lever import LeverAdapter
+from app.services.portals.parsed_page import PageInput, parse_page
 from app.services.portals.workday import WorkdayAdapter
 
 adapters = [
@@ -18,11 +19,12 @@ adapters = [
 
 class GenericAdapter:
     name = "generic"
+    version = 1
 
-    def matches(self, url: str, html: str) -> bool:
+    def matches(self, url: str, html: PageInput) -> bool:
         return True
 
-    def discover_fields(self, url: str, html: str) -> List[DiscoveredField]:
+    def discover_fields(self, url: str, html: PageInput) -> List[DiscoveredField]:
         return []
 
     def build_fill_actions(self, fields: List[DiscoveredField], answers: dict[str, str]) -> List[FillAction]:
@@ -48,8 +50,9 @@ adapters: List[PortalAdapter] = [
     ]
 
 
-def pick_adapter(url: str, html: str) -> PortalAdapter:
+def pick_adapter(url: str, html: PageInput) -> PortalAdapter:
+    page = parse_page(html)
     for adapter in adapters:
-        if adapter.matches(url, html):
+        if adapter.matches(url, page):
             return adapter
     return GenericAdapter()
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.services.portals.browser_fetch import BrowserSnapshot
+from app.services.portals.fetch_coalescer import normalize_url
+from app.services.portals.parsed_page import content_hash
+
+try:  # zstd is faster and smaller when installed; gzip otherwise
+    import zstandard
+
+    CODEC = "zst"
+except ImportError:  # pragma: no cover - depends on the install
+    zstandard = None
+    CODEC = "gz"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def url_key(url: str) -> str:
+    return hashlib.blake2b(normalize_url(url).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SnapshotStore:
+    """
+    On-disk store of rendered pages for fetch_html_with_playwright.
+
+    HTML is stored compressed and content-addressed (blobs/<hash>.<codec>), so
+    identical pages behind different URLs are kept once; index/<url key>.json
+    points a normalized URL at its latest blob plus the snapshot metadata.
+    Entries older than `ttl_seconds` are misses; blobs are evicted least
+    recently used once they exceed `max_bytes`.
+
+    In `replay` mode the browser is never used: stored snapshots (seeded with
+    `put_file`, e.g. snap_after_click.html) are served regardless of age and
+    anything else is a failed snapshot, so runs are deterministic and offline.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        replay: Optional[bool] = None,
+    ) -> None:
+        root = root if root is not None else os.getenv("SNAPSHOT_STORE_DIR")
+        self.root = Path(root) if root else None
+        self.ttl_seconds = ttl_seconds or _env_int("SNAPSHOT_TTL_S", 6 * 3600)
+        self.max_bytes = max_bytes or _env_int("SNAPSHOT_MAX_BYTES", 256 * 1024 * 1024)
+        self.replay = os.getenv("SNAPSHOT_REPLAY", "0") == "1" if replay is None else replay
+        self._lock = threading.Lock()
+        self._bytes: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def _index_path(self, url: str) -> Path:
+        return self.root / "index" / f"{url_key(url)}.json"
+
+    def _blob_path(self, digest: str, codec: str) -> Path:
+        return self.root / "blobs" / digest[:2] / f"{digest}.{codec}"
+
+    def get(self, url: str) -> Optional[BrowserSnapshot]:
+        if self.root is None:
+            return None
+        try:
+            entry = json.loads(self._index_path(url).read_text(encoding="utf-8"))
+            if not self.replay and time.time() - entry["saved_at"] > self.ttl_seconds:
+                self.expired += 1
+                return None
+            blob = self._blob_path(entry["content_hash"], entry["codec"])
+            html = _decompress(blob.read_bytes(), entry["codec"]).decode("utf-8", errors="ignore")
+            os.utime(blob)  # LRU: eviction goes by blob mtime
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return BrowserSnapshot(
+            url=url,
+            html=html,
+            used_browser=True,
+            notes=f"{entry.get('notes', '')}; snapshot_store={'replay' if self.replay else 'hit'}",
+            final_url=entry.get("final_url") or url,
+            timings=entry.get("timings") or {},
+            signals=entry.get("signals") or {},
+        )
+
+    def put(self, snap: BrowserSnapshot) -> None:
+        if self.root is None or not snap.used_browser or not snap.html:
+            return
+        data = snap.html.encode("utf-8", errors="ignore")
+        digest = content_hash(snap.html)
+        blob = self._blob_path(digest, CODEC)
+        try:
+            if not blob.exists():
+                self._write(blob, _compress(data, CODEC))
+                with self._lock:
+                    if self._bytes is not None:
+                        self._bytes += blob.stat().st_size
+            entry = {
+                "url": snap.url,
+                "final_url": snap.final_url,
+                "content_hash": digest,
+                "codec": CODEC,
+                "saved_at": time.time(),
+                "notes": snap.notes,
+                "timings": snap.timings,
+                "signals": snap.signals,
+            }
+            self._write(self._index_path(snap.url), json.dumps(entry).encode("utf-8"))
+        except OSError:
+            return
+        self.writes += 1
+        self._evict()
+
+    def put_file(self, url: str, path: str, final_url: Optional[str] = None) -> None:
+        """Seed the store with a saved page (for replay runs and benchmarks)."""
+        html = Path(path).read_text(encoding="utf-8", errors="ignore")
+        notes = f"seeded from {Path(path).name}"
+        self.put(BrowserSnapshot(url=url, html=html, used_browser=True, notes=notes, final_url=final_url))
+
+    def miss(self, url: str) -> BrowserSnapshot:
+        return BrowserSnapshot(url=url, html="", used_browser=False, notes="snapshot replay: no stored snapshot")
+
+    def _write(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f"{path.suffix}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _blobs(self):
+        return (self.root / "blobs").glob("*/*.*")
+
+    def _evict(self) -> None:
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(blob.stat().st_size for blob in self._blobs())
+            if self._bytes <= self.max_bytes:
+                return
+            blobs = sorted(self._blobs(), key=lambda blob: blob.stat().st_mtime)
+            for blob in blobs:
+                if self._bytes <= self.max_bytes:
+                    break
+                size = blob.stat().st_size
+                try:
+                    blob.unlink()
+                except OSError:
+                    continue
+                # Index entries pointing at it become misses.
+                self._bytes -= size
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "replay": self.replay,
+            "codec": CODEC,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "writes": self.writes,
+            "evictions": self.evictions,
+        }
+
+
+snapshot_store = SnapshotStore()
@@ -1,78 +1,28 @@
 from __future__ import annotations
 from typing import List, Optional, Set
-from bs4 import BeautifulSoup
 from app.schemas.discovery import DiscoveredField, FillAction
+from app.services.portals.canonical_fields import WORKDAY_ATTRIBUTES, canonical_field_classifier
+from app.services.portals.parsed_page import PageInput, parse_page
 
 
 class WorkdayAdapter:
     name = "workday"
+    version = 2  # discovery cache key: bump when discover_fields changes
 
-    def matches(self, url: str, html: str) -> bool:
+    def matches(self, url: str, html: PageInput) -> bool:
         url_lower = url.lower()
         if "myworkdayjobs.com" in url_lower or "workday" in url_lower:
             return True
-        html_lower = html.lower() if isinstance(html, str) else ""
+        html_lower = parse_page(html).lower
         if "workday" in html_lower and "data-automation-id" in html_lower:
             return True
         return False
-    
-    def _resolve_html(self, html) -> str:
-        if isinstance(html, str):
-            return html
-        # for cases where html might be a response object
-        if hasattr(html, "content"):
-            try:
-                content = html.content() if callable(html.content) else html.content
-                if isinstance(content, (bytes, bytearray)):
-                    return content.decode("utf-8", errors="ignore")
-                if isinstance(content, str):
-                    return content
-            except Exception:
-                return ""
-        return ""
 
     def build_fill_actions(self, fields: List[DiscoveredField], answers: dict[str, str]) -> List[FillAction]:
         actions: List[FillAction] = []
 
-        def normalize(text: Optional[str]) -> str:
-            return (text or "").strip().lower()
-
-        def match_key(field: DiscoveredField) -> Optional[str]:
-            haystack = " ".join(
-                [
-                    normalize(field.label),
-                    normalize(field.raw_name),
-                    normalize(field.placeholder),
-                    normalize(field.type),
-                    normalize(field.field_id),
-                ]
-            )
-            if "cover letter" in haystack:
-                return "cover_letter"
-            if "skill" in haystack:
-                return "key_skills"
-            if "experience" in haystack or "years" in haystack:
-                return "years_experience"
-            if "work authorization" in haystack or "authorized" in haystack:
-                return "work_authorization"
-            if "visa" in haystack or "sponsorship" in haystack:
-                return "visa_sponsorship"
-            if "relocation" in haystack or "relocate" in haystack:
-                return "relocation"
-            if "notice" in haystack:
-                return "notice_period"
-            if "salary" in haystack or "compensation" in haystack:
-                return "expected_salary"
-            if "location" in haystack or "city" in haystack:
-                return "location"
-            if "linkedin" in haystack:
-                return "linkedin"
-            if "github" in haystack:
-                return "github"
-            return None
-
-        for field in fields:
-            key = match_key(field)
+        for field, match in zip(fields, canonical_field_classifier.classify_many(fields, WORKDAY_ATTRIBUTES)):
+            key = match.key if match else None
             if not key or key not in answers:
                 continue
 
@@ -89,7 +39,7 @@ class WorkdayAdapter:
 
             elif field.type == "checkbox":
                 action_type = "check"
-                value = "true" if normalize(value) in {"yes", "true", "1"} else "false"
+                value = "true" if str(value).strip().lower() in {"yes", "true", "1"} else "false"
                 confidence = min(confidence, 0.5)
 
             elif field.type == "radio":
@@ -114,18 +64,6 @@ class WorkdayAdapter:
 
         return actions
 
-    def _resolve_html(self, html: str) -> str:
-        if isinstance(html, str):
-            return html
-        if hasattr(html, "content") and callable(getattr(html, "content")):
-            try:
-                content = html.content()
-                if isinstance(content, str):
-                    return content
-            except Exception:
-                return ""
-        return ""
-
     def _pick_option(self, value: str, options: List[str]) -> str:
         def norm(text: str) -> str:
             return text.strip().lower()
@@ -145,29 +83,17 @@ class WorkdayAdapter:
 
         return value
 
-    def _resolve_html(self, html: str) -> str:
-        # html might be None or already a string
-        if not html:
-            return ""
-        if isinstance(html, bytes):
-            try:
-                return html.decode("utf-8", errors="ignore")
-            except Exception:
-                return ""
-        return str(html)
-
     def build_fill_actions(self, discovered_fields, proposed_answers):
     # For now just return empty; later we’ll implement actual playwright fills
         return []
 
 
-    def discover_fields(self, url: str, html: str) -> List[DiscoveredField]:
-        html_text = self._resolve_html(html)
-        if not html_text:
+    def discover_fields(self, url: str, html: PageInput) -> List[DiscoveredField]:
+        page = parse_page(html)
+        if not page:
             return []
 
-        soup = BeautifulSoup(html_text, "html.parser")
-        root = soup.find("form") or soup
+        index = page.index
 
         fields: List[DiscoveredField] = []
         seen_ids: Set[str] = set()
@@ -175,22 +101,17 @@ class WorkdayAdapter:
         def norm(s: Optional[str]) -> str:
             return (s or "").strip()
 
-        def text_of(el) -> str:
-            if not el:
-                return ""
-            return el.get_text(" ", strip=True)
-        
+        # All lookups below go through the page's DomIndex so discovery stays
+        # linear in DOM size instead of rescanning the tree per field.
+        text_of = index.text
+
         def label_from_describedby(el) -> str:
             ids = (el.get("aria-describedby") or "").split()
             parts = []
             for _id in ids:
-                ref = soup.find(id=_id)
-                if ref:
-                    t = ref.get_text(" ", strip=True)
-                    if t:
-                        parts.append(t)
-                if uxi_type == "selectinput":
-                    print("WD selectinput:", field_id, label)
+                t = text_of(index.by_id.get(_id))
+                if t:
+                    parts.append(t)
 
             # Sometimes this is hint text; still better than empty.
             return " ".join(parts).strip()
@@ -200,7 +121,7 @@ class WorkdayAdapter:
             ids = (el.get("aria-labelledby") or "").split()
             parts = []
             for _id in ids:
-                ref = soup.find(id=_id)
+                ref = index.by_id.get(_id)
                 t = text_of(ref)
                 if t:
                     parts.append(t)
@@ -210,7 +131,7 @@ class WorkdayAdapter:
             # 1) <label for="id">
             _id = input_el.get("id")
             if _id:
-                lab = root.find("label", attrs={"for": _id})
+                lab = index.label_for.get(_id)
                 t = text_of(lab)
                 if t:
                     return t
@@ -239,15 +160,15 @@ class WorkdayAdapter:
                 # Workday containers often have data-automation-id; sometimes label is a sibling span/div
                 # Try finding preceding text nodelabel = s in the container
                 # Heuristic: look for elements that look like labels
-                cand = parent.find(["label", "span", "div"], attrs={"data-automation-id": ["label", "fieldLabel"]})
+                cand = index.first_field_label(parent)
                 if cand:
                     t = text_of(cand)
                     if t:
                         return t
 
                 # fallback: first strong-ish text inside parent (but avoid huge blobs)
-                t = text_of(parent)
-                if 0 < len(t) <= 80:
+                t = index.bounded_text(parent)
+                if t:
                     return t
 
                 parent = parent.parent
@@ -264,7 +185,7 @@ class WorkdayAdapter:
             )
 
         # PASS A: classic inputs/textarea/select (what you already do, but with better label)
-        for input_el in root.find_all(["input", "textarea", "select"]):
+        for input_el in page.controls:
             tag = input_el.name
             field_type = (input_el.get("type") or "text").lower()
             if tag == "textarea":
@@ -320,7 +241,7 @@ class WorkdayAdapter:
         # PASS B: Workday "custom dropdown" containers (no <select>)
         # Heuristic: find containers that represent a field with automation id
         # This is intentionally broad and safe; you can tighten once you see DOM samples.
-        dropdown_like = root.find_all(attrs={"data-automation-id": True})
+        dropdown_like = page.automation_nodes
         for node in dropdown_like:
             daid = (node.get("data-automation-id") or "").lower()
             if daid not in {"dropdown", "combobox", "multiselect", "select"}:
@@ -343,9 +264,8 @@ class WorkdayAdapter:
                 hop = 0
                 while parent is not None and hop < 5 and not label:
                     # Workday sometimes has label in previous sibling div/span
-                    prev = parent.find(["label", "span", "div"])
-                    t = text_of(prev)
-                    if 0 < len(t) <= 80:
+                    t = index.bounded_text(index.first_labelish(parent))
+                    if t:
                         label = t
                         break
                     parent = parent.parent
@@ -371,7 +291,7 @@ class WorkdayAdapter:
 
         # PASS C: radio groups (optional but useful)
         # If Workday uses role="radiogroup", capture the group with options if present in DOM
-        for group in root.find_all(attrs={"role": "radiogroup"}):
+        for group in page.root.find_all(attrs={"role": "radiogroup"}):
             field_id = group.get("id") or group.get("data-automation-id") or "radiogroup"
             field_id = str(field_id)
 
@@ -381,9 +301,8 @@ class WorkdayAdapter:
             label = resolve_aria_labelledby(group) or norm(group.get("aria-label")) or ""
             if not label:
                 # look for a nearby legend/heading
-                legend = group.find_previous(["legend", "h1", "h2", "h3", "h4", "label", "span", "div"])
-                t = text_of(legend)
-                if 0 < len(t) <= 80:
+                t = index.bounded_text(index.previous_heading(group))
+                if t:
                     label = t
 
             label = label or field_id
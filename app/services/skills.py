@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+# Canonical skill -> aliases. Canonical names are lowercase and are what every
+# caller stores and compares; matching is case-insensitive and whole-word.
+# Terms that are also common English words ("go", "r", "cv") are left out.
+# SKILL_TAXONOMY_PATH can point at a JSON file of the same shape to extend it.
+DEFAULT_SKILLS: Dict[str, Tuple[str, ...]] = {
+    # languages
+    "python": ("python3", "py3"),
+    "java": (),
+    "javascript": ("js", "ecmascript", "es6"),
+    "typescript": (),
+    "golang": ("go lang",),
+    "rust": (),
+    "c++": ("cpp",),
+    "c#": ("csharp", "c sharp"),
+    "ruby": (),
+    "php": (),
+    "kotlin": (),
+    "swift": (),
+    "scala": (),
+    "matlab": (),
+    "bash": ("shell scripting", "shell script"),
+    "sql": ("t-sql", "pl/sql", "plsql"),
+    "html": ("html5",),
+    "css": ("css3",),
+    # backend / web
+    "fastapi": ("fast api",),
+    "django": (),
+    "flask": (),
+    "node.js": ("nodejs", "node js"),
+    "express.js": ("expressjs",),
+    "spring boot": ("springboot", "spring framework"),
+    ".net": ("dotnet", "asp.net"),
+    "rails": ("ruby on rails",),
+    # bare "rest" is left out: "the rest of the team"
+    "rest api": ("rest apis", "restful", "restful api", "restful apis"),
+    "graphql": (),
+    "grpc": (),
+    "api": ("apis",),
+    "microservices": ("microservice", "micro-services"),
+    "websockets": ("websocket",),
+    "celery": (),
+    "pydantic": (),
+    "sqlalchemy": (),
+    # frontend
+    "react": ("react.js", "reactjs"),
+    "angular": ("angularjs",),
+    "vue": ("vue.js", "vuejs"),
+    "next.js": ("nextjs",),
+    "redux": (),
+    "tailwind": ("tailwindcss", "tailwind css"),
+    # data stores
+    "postgresql": ("postgres", "psql"),
+    "mysql": (),
+    "sqlite": (),
+    "mongodb": ("mongo",),
+    "redis": (),
+    "elasticsearch": ("elastic search", "opensearch"),
+    "cassandra": (),
+    "dynamodb": ("dynamo db",),
+    "snowflake": (),
+    "bigquery": ("big query",),
+    "redshift": (),
+    "vector databases": (
+        "vector database",
+        "vector db",
+        "vector dbs",
+        "vector store",
+        "vector stores",
+        "vector search",
+        "pgvector",
+        "pinecone",
+        "weaviate",
+        "faiss",
+    ),
+    # cloud / infra
+    "aws": ("amazon web services", "ec2", "aws lambda"),
+    "gcp": ("google cloud", "google cloud platform"),
+    "azure": ("microsoft azure",),
+    "docker": (),
+    "containers": ("containerization", "containerized"),
+    "kubernetes": ("k8s", "eks", "gke", "aks"),
+    "terraform": (),
+    "ansible": (),
+    "helm": (),
+    "linux": ("unix",),
+    "nginx": (),
+    "ci/cd": ("cicd", "ci cd", "continuous integration", "continuous delivery", "continuous deployment"),
+    "github actions": (),
+    "jenkins": (),
+    "gitlab ci": (),
+    "git": (),
+    "github": (),
+    "gitlab": (),
+    "kafka": ("apache kafka",),
+    "rabbitmq": (),
+    "airflow": ("apache airflow",),
+    "spark": ("apache spark", "pyspark"),
+    "hadoop": (),
+    "dbt": (),
+    "prometheus": (),
+    "grafana": (),
+    # data / ml
+    "data": ("data engineering", "data pipelines", "data pipeline", "etl", "data analysis", "data analytics"),
+    "machine learning": ("ml", "machine-learning"),
+    "deep learning": ("deep-learning",),
+    "nlp": ("natural language processing",),
+    "computer vision": (),
+    "llm": ("llms", "large language models", "large language model", "genai", "generative ai"),
+    "langchain": (),
+    "rag": ("retrieval augmented generation", "retrieval-augmented generation"),
+    "pytorch": ("torch",),
+    "tensorflow": (),
+    "scikit-learn": ("sklearn", "scikit learn"),
+    "pandas": (),
+    "numpy": (),
+    "mlops": (),
+    "statistics": (),
+    # testing / automation
+    "automation": ("test automation", "workflow automation"),
+    "web scraping": ("scraping", "web crawling", "crawling"),
+    "playwright": (),
+    "selenium": (),
+    "pytest": (),
+    "unit testing": ("unit tests",),
+    "integration": ("integrations", "system integration"),
+    # practices
+    "agile": ("scrum", "kanban"),
+    "system design": ("distributed systems",),
+    "oauth": ("oauth2", "openid connect", "oidc"),
+    "security": ("appsec", "application security"),
+}
+
+# Canonical skills analyze_job (and /job/rank) sort a job description's
+# mentions into.
+MUST_HAVE_SKILLS = ("python", "fastapi", "sql", "postgresql", "machine learning", "data")
+NICE_TO_HAVE_SKILLS = ("aws", "gcp", "azure", "docker", "kubernetes", "llm", "langchain", "vector databases")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+@dataclass(frozen=True)
+class SkillMatch:
+    skill: str  # canonical name
+    start: int
+    end: int  # exclusive offsets into the scanned text
+    surface: str  # text as written in the JD
+
+
+class SkillTaxonomy:
+    """
+    Canonical skills and their aliases compiled into one Aho-Corasick automaton.
+
+    `scan` walks the text once (lowercased, so offsets refer to the original)
+    and keeps matches that start and end on word boundaries, preferring the
+    leftmost-longest one where matches overlap: "c++" beats "c", "ml" is not
+    found inside "html", nor "sql" inside "mysql".
+    """
+
+    def __init__(self, skills: Mapping[str, Iterable[str]]) -> None:
+        self._canonical: Dict[str, str] = {}
+        for skill, aliases in skills.items():
+            canonical = skill.strip().lower()
+            for term in (canonical, *aliases):
+                term = term.strip().lower()
+                if term:
+                    self._canonical.setdefault(term, canonical)
+        self.skills: Tuple[str, ...] = tuple(dict.fromkeys(self._canonical.values()))
+        self._build()
+
+    def _build(self) -> None:
+        # Node 0 is the root; outputs are (term length, canonical skill).
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[Tuple[int, str], ...]] = [()]
+        for term, canonical in self._canonical.items():
+            node = 0
+            for ch in term:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] = self._out[node] + ((len(term), canonical),)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    @classmethod
+    def from_env(cls) -> "SkillTaxonomy":
+        skills: Dict[str, Iterable[str]] = dict(DEFAULT_SKILLS)
+        path = os.getenv("SKILL_TAXONOMY_PATH")
+        if path:
+            with open(path, encoding="utf-8") as handle:
+                for skill, aliases in json.load(handle).items():
+                    skills[skill] = tuple(skills.get(skill, ())) + tuple(aliases)
+        return cls(skills)
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and name.strip().lower() in self._canonical
+
+    def canonical(self, name: str) -> Optional[str]:
+        """Canonical skill for a skill name or alias ("Postgres" -> "postgresql"), else None."""
+        return self._canonical.get((name or "").strip().lower())
+
+    def scan(self, text: str) -> List[SkillMatch]:
+        if not text:
+            return []
+        lowered = text.lower()
+        if len(lowered) != len(text):  # a few code points change length when lowercased
+            lowered = "".join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+
+        goto, fail, out = self._goto, self._fail, self._out
+        candidates: List[Tuple[int, int, str]] = []
+        node = 0
+        size = len(lowered)
+        for i, ch in enumerate(lowered):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = i + 1
+            if end < size and _is_word_char(lowered[end]) and _is_word_char(ch):
+                continue
+            for length, canonical in out[node]:
+                start = end - length
+                if start > 0 and _is_word_char(lowered[start - 1]) and _is_word_char(lowered[start]):
+                    continue
+                candidates.append((start, end, canonical))
+
+        # Leftmost-longest, non-overlapping.
+        candidates.sort(key=lambda match: (match[0], -match[1]))
+        matches: List[SkillMatch] = []
+        covered = 0
+        for start, end, canonical in candidates:
+            if start < covered:
+                continue
+            matches.append(SkillMatch(skill=canonical, start=start, end=end, surface=text[start:end]))
+            covered = end
+        return matches
+
+    def extract(self, text: str) -> List[str]:
+        """Distinct canonical skills in `text`, in order of first mention."""
+        return list(dict.fromkeys(match.skill for match in self.scan(text)))
+
+
+class SkillInterner:
+    """
+    Dense integer ids for skills, so a set of skills is one int bitset (bit i
+    set = skill id i) and an overlap count is `(a & b).bit_count()`.
+
+    Names go through the taxonomy first ("Postgres" and "postgresql" share an
+    id). Only taxonomy skills get ids, in declaration order, so the id space
+    and every bitset stay as wide as the taxonomy however many free-form
+    names callers send; compare those per request with `split`. Ids are
+    process-local: persist skill names, never bitsets.
+    """
+
+    def __init__(self, taxonomy: SkillTaxonomy, max_texts: int = 1024) -> None:
+        self.taxonomy = taxonomy
+        self.max_texts = max_texts
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._texts: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        for skill in taxonomy.skills:
+            self._ids[skill] = len(self._names)
+            self._names.append(skill)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def key(self, name: str) -> str:
+        return self.taxonomy.canonical(name) or (name or "").strip().lower()
+
+    def id(self, name: str) -> int:
+        """Id of a taxonomy skill (or alias); KeyError for anything else."""
+        skill_id = self._ids.get(self.key(name))
+        if skill_id is None:
+            raise KeyError(name)
+        return skill_id
+
+    def lookup(self, name: str) -> Optional[int]:
+        return self._ids.get(self.key(name))
+
+    def bits(self, names: Iterable[str]) -> int:
+        """Bitset of the taxonomy skills among `names`; other names are dropped."""
+        bits, _ = self.split(names)
+        return bits
+
+    def split(self, names: Iterable[str]) -> Tuple[int, Set[str]]:
+        """Bitset of the taxonomy skills among `names`, plus the normalized other names."""
+        bits = 0
+        others: Set[str] = set()
+        for name in names or ():
+            if not isinstance(name, str) or not name.strip():
+                continue
+            skill_id = self.lookup(name)
+            if skill_id is None:
+                others.add(self.key(name))
+            else:
+                bits |= 1 << skill_id
+        return bits, others
+
+    def text_bits(self, text: str) -> int:
+        """Bitset of the taxonomy skills mentioned in `text` (LRU-cached per text)."""
+        if not text:
+            return 0
+        with self._lock:
+            bits = self._texts.get(text)
+            if bits is not None:
+                self._texts.move_to_end(text)
+                return bits
+        bits = self.bits(self.taxonomy.extract(text))
+        with self._lock:
+            self._texts[text] = bits
+            while len(self._texts) > self.max_texts:
+                self._texts.popitem(last=False)
+        return bits
+
+    def name(self, skill_id: int) -> str:
+        return self._names[skill_id]
+
+    def names(self, bits: int) -> List[str]:
+        out = []
+        while bits:
+            low = bits & -bits
+            out.append(self._names[low.bit_length() - 1])
+            bits ^= low
+        return out
+
+
+skill_taxonomy = SkillTaxonomy.from_env()
+skill_interner = SkillInterner(skill_taxonomy)
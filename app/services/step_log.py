@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.schemas.agent import AgentStep
+
+# (run row, step rows, whether the run row still has to be inserted)
+StepLogBatch = Tuple[Dict[str, Any], List[Dict[str, Any]], bool]
+
+
+def _as_uuid(value: Any) -> Any:
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return value
+
+
+def write_batch(db: Session, batch: StepLogBatch) -> None:
+    """Write one batch in a single transaction: run insert/update plus one bulk step insert."""
+    from app.models.db_models import AgentRun, AgentStepLog  # local import to avoid cycle
+
+    run, rows, insert_run = batch
+    if insert_run:
+        db.execute(insert(AgentRun), [run])
+    else:
+        db.execute(
+            update(AgentRun)
+            .where(AgentRun.id == run["id"])
+            .values(status=run["status"], fit_score=run["fit_score"], selected_resume_id=run["selected_resume_id"])
+        )
+    if rows:
+        # render_nulls keeps rows with a NULL tool in the same executemany batch.
+        db.execute(insert(AgentStepLog).execution_options(render_nulls=True), rows)
+    db.commit()
+
+
+class StepLogWriter:
+    """
+    Write-behind step logging: batches are queued and written by one daemon
+    thread with its own session, in submission order. `submit` never blocks;
+    a full queue drops the batch and counts it.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None, max_batches: int = 10_000) -> None:
+        self._session_factory = session_factory
+        self._queue: "queue.Queue[Optional[StepLogBatch]]" = queue.Queue(maxsize=max_batches)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches_written = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+
+    def submit(self, batch: StepLogBatch) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(batch)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="step-log-writer", daemon=True)
+                self._thread.start()
+
+    def _loop(self) -> None:
+        if self._session_factory is None:
+            from app.db import SessionLocal
+
+            self._session_factory = SessionLocal
+        while True:
+            batch = self._queue.get()
+            try:
+                if batch is None:
+                    return
+                self._write(batch)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, batch: StepLogBatch) -> None:
+        db = self._session_factory()
+        try:
+            write_batch(db, batch)
+            self.batches_written += 1
+            self.rows_written += len(batch[1])
+        except Exception as e:  # noqa: BLE001 - logging must not kill the writer
+            db.rollback()
+            self.failures += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+        finally:
+            db.close()
+
+    def drain(self) -> None:
+        """Block until every queued batch has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self, timeout: float = 10.0) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "batches_written": self.batches_written,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_error": self.last_error,
+        }
+
+
+step_log_writer = StepLogWriter()
+atexit.register(step_log_writer.close)
+
+
+def write_behind_default() -> bool:
+    return os.getenv("STEP_LOG_WRITE_BEHIND", "0") == "1"
+
+
+class StepLogBuffer:
+    """
+    Collects an agent run's AgentRun/AgentStepLog rows in memory.
+
+    Ids are generated client-side, so nothing is read back; `flush` (run end or
+    checkpoint) writes everything gathered since the last flush in one
+    transaction, or hands it to the write-behind writer.
+    """
+
+    def __init__(
+        self,
+        db: Optional[Session],
+        user_id: str,
+        goal: str,
+        write_behind: bool = False,
+        writer: StepLogWriter = step_log_writer,
+        run_id: Optional[str] = None,
+        run_written: bool = False,
+    ) -> None:
+        self.db = db
+        self.write_behind = write_behind
+        self.writer = writer
+        self.run_id = _as_uuid(run_id) if run_id else uuid.uuid4()
+        self.run: Dict[str, Any] = {
+            "id": self.run_id,
+            "user_id": _as_uuid(user_id),
+            "goal": goal,
+            "status": "planning",
+            "fit_score": None,
+            "selected_resume_id": None,
+        }
+        self._rows: List[Dict[str, Any]] = []
+        # A resumed run only updates its existing row.
+        self._run_written = run_written
+        self.flushes = 0
+
+    def add(self, step_num: int, step: AgentStep) -> None:
+        self._rows.append(
+            {
+                "id": uuid.uuid4(),
+                "run_id": self.run_id,
+                "step_num": step_num,
+                "name": step.name,
+                "tool": step.tool,
+                "status": step.status,
+                "details": step.details,
+                "duration_ms": (step.details or {}).get("duration_ms"),
+                "created_at": datetime.utcnow(),
+            }
+        )
+
+    @property
+    def run_written(self) -> bool:
+        """The AgentRun row has been written or queued."""
+        return self._run_written
+
+    def update_run(self, status: str, fit_score: Optional[float], selected_resume_id: Optional[str]) -> None:
+        self.run.update(status=status, fit_score=fit_score, selected_resume_id=_as_uuid(selected_resume_id))
+
+    def flush(self) -> None:
+        if self.db is None and not self.write_behind:
+            return
+        rows, self._rows = self._rows, []
+        batch: StepLogBatch = (dict(self.run), rows, not self._run_written)
+        if self.write_behind:
+            if not self.writer.submit(batch):
+                # Queue full, batch dropped: keep the rows (and the pending run
+                # insert) so a later flush re-sends them.
+                self._rows = rows + self._rows
+                return
+            self._run_written = True
+            self.flushes += 1
+            return
+        try:
+            write_batch(self.db, batch)
+        except Exception:
+            # Keep the rows so a later flush can retry them.
+            self.db.rollback()
+            self._rows = rows + self._rows
+            raise
+        self._run_written = True
+        self.flushes += 1
+
+    def flush_quietly(self) -> Optional[str]:
+        """Best-effort flush for error paths; returns the error instead of raising."""
+        try:
+            self.flush()
+        except Exception as e:  # noqa: BLE001
+            return f"{type(e).__name__}: {e}"
+        return None
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def stable_hash(value: Any) -> str:
+    """Digest of a JSON-able value that does not depend on dict order or process."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str, ensure_ascii=False)
+    return hashlib.blake2b(encoded.encode("utf-8", "surrogatepass"), digest_size=20).hexdigest()
+
+
+class ToolCache:
+    """
+    Content-addressed memo for deterministic tools.
+
+    Keys are (tool, version, stable hash of the state slice the tool reads);
+    values are stored pickled, so every hit returns a private copy. The memory
+    tier is an LRU bounded by `max_bytes`; with `disk_dir` (TOOL_CACHE_DIR)
+    entries are also written to disk and survive restarts.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, disk_dir: Optional[str] = None, enabled: Optional[bool] = None) -> None:
+        self.enabled = os.getenv("TOOL_CACHE_ENABLED", "1") != "0" if enabled is None else enabled
+        self.max_bytes = max_bytes or _env_int("TOOL_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+        disk_dir = disk_dir if disk_dir is not None else os.getenv("TOOL_CACHE_DIR")
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits: Counter = Counter()
+        self.disk_hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.evictions = 0
+
+    def key(self, tool: str, version: int, state_slice: Any) -> str:
+        return f"{tool}:v{version}:{stable_hash(state_slice)}"
+
+    def get(self, tool: str, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+        if blob is None and self.disk_dir is not None:
+            blob = self._read_disk(key)
+            if blob is not None:
+                self.disk_hits[tool] += 1
+                self._remember(key, blob)
+        if blob is None:
+            self.misses[tool] += 1
+            return False, None
+        self.hits[tool] += 1
+        return True, pickle.loads(blob)
+
+    def put(self, tool: str, key: str, value: Any) -> None:
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:  # noqa: BLE001 - unpicklable results are just not cached
+            return
+        self._remember(key, blob)
+        if self.disk_dir is not None:
+            self._write_disk(key, blob)
+
+    def _remember(self, key: str, blob: bytes) -> None:
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = blob
+            self._bytes += len(blob)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _disk_path(self, key: str) -> Path:
+        tool, _, rest = key.partition(":")
+        return self.disk_dir / tool / (rest.replace(":", "_") + ".pkl")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        try:
+            return self._disk_path(key).read_bytes()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, blob: bytes) -> None:
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(blob)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        tools = sorted(set(self.hits) | set(self.misses))
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+            "tools": {
+                tool: {"hits": self.hits[tool], "disk_hits": self.disk_hits[tool], "misses": self.misses[tool]}
+                for tool in tools
+            },
+        }
+
+
+tool_cache = ToolCache()
@@ -0,0 +1,99 @@
+"""
+Browser discovery fetch benchmark against a local static server.
+
+    python -m scripts.bench_browser_fetch [--runs 5] [--images 40]
+
+Serves snap_after_click.html padded with heavy images, a web font and an
+"analytics" script loaded from a second host name (127.0.0.1 vs localhost),
+then compares one-off browser launches vs the warm pool, with and without the
+resource routing policy. Needs Chromium (`playwright install chromium`).
+"""
+import argparse
+import asyncio
+import functools
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.services.portals.browser_fetch import fetch_html_with_playwright
+from app.services.portals.browser_pool import browser_pool
+from app.services.portals.resource_policy import ResourcePolicy
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def build_fixture(directory: Path, images: int, port: int) -> None:
+    html = (ROOT / "snap_after_click.html").read_text(encoding="utf-8", errors="ignore")
+    payload = os.urandom(256 * 1024)
+    heavy = []
+    for i in range(images):
+        (directory / f"img{i}.png").write_bytes(payload)
+        heavy.append(f'<img src="/img{i}.png">')
+    (directory / "font.woff2").write_bytes(payload)
+    (directory / "tracker.js").write_text("window.__tracked = true;")
+    heavy.append('<style>@font-face{font-family:x;src:url(/font.woff2)} body{font-family:x}</style>')
+    heavy.append(f'<script src="http://127.0.0.1:{port}/tracker.js"></script>')
+    (directory / "index.html").write_text(html.replace("</body>", "".join(heavy) + "</body>"), encoding="utf-8")
+
+
+def serve(directory: Path) -> http.server.ThreadingHTTPServer:
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(directory))
+    handler.log_message = lambda *args, **kwargs: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_mode(label: str, url: str, runs: int, policy: ResourcePolicy) -> None:
+    elapsed = []
+    snap = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        snap = await fetch_html_with_playwright(url, policy=policy)
+        elapsed.append(time.perf_counter() - start)
+    assert snap is not None
+    res = snap.resources
+    print(
+        f"{label:<22} mean={sum(elapsed) / len(elapsed) * 1000:8.1f} ms  "
+        f"loaded_bytes={res.get('loaded_bytes', 0):>10}  blocked={res.get('blocked_requests', 0):>3}  "
+        f"used_browser={snap.used_browser}  {snap.notes[:60]}"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        server = serve(directory)
+        port = server.server_address[1]
+        build_fixture(directory, args.images, port)
+        url = f"http://localhost:{port}/index.html"
+
+        no_block = ResourcePolicy(blocked_types=frozenset(), blocked_hosts=())
+        block = ResourcePolicy(blocked_hosts=("127.0.0.1",), allowed_hosts=("localhost",))
+
+        await run_mode("launch / no policy", url, args.runs, no_block)
+        await run_mode("launch / policy", url, args.runs, block)
+        if await browser_pool.start():
+            await run_mode("pool / no policy", url, args.runs, no_block)
+            await run_mode("pool / policy", url, args.runs, block)
+            print(browser_pool.stats())
+            await browser_pool.stop()
+        else:
+            print(f"pool unavailable: {browser_pool.last_error}")
+        server.shutdown()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--images", type=int, default=40)
+    return asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Field discovery scaling check on synthetic forms.
+
+    python -m scripts.bench_discovery [--sizes 500 1000 5000] [--max-ratio 3]
+
+Discovery should be linear in DOM size: per-field time must stay flat as the
+form grows. For every adapter, `check_linear` asserts that the largest form
+costs at most `--max-ratio` times more per field than the smallest one (best
+of `--repeat` cold parses each); the script exits non-zero on a failure.
+"""
+import argparse
+import sys
+import time
+from typing import Any, List, Sequence
+
+from app.services.portals.greenhouse import GreenhouseAdapter
+from app.services.portals.lever import LeverAdapter
+from app.services.portals.parsed_page import clear_cache
+from app.services.portals.workday import WorkdayAdapter
+
+
+def synthetic_form(n: int) -> str:
+    parts = ["<html><body><h2>Application</h2><form>"]
+    for i in range(n):
+        kind = i % 6
+        if kind == 0:
+            parts.append(f'<div><label for="i{i}">Question {i}</label><input id="i{i}" name="n{i}"></div>')
+        elif kind == 1:
+            parts.append(f'<div><span id="lb{i}">Years of experience {i}</span><input id="i{i}" aria-labelledby="lb{i}"></div>')
+        elif kind == 2:
+            parts.append(
+                f'<div data-automation-id="formField"><label data-automation-id="fieldLabel">Work authorization {i}</label>'
+                f'<div><input data-automation-id="q{i}"></div></div>'
+            )
+        elif kind == 3:
+            parts.append(f'<div><p>Cover letter {i}</p><div><textarea id="t{i}"></textarea></div></div>')
+        elif kind == 4:
+            parts.append(f'<div><span>Country {i}</span><div data-automation-id="dropdown" id="d{i}"></div></div>')
+        else:
+            parts.append(f'<legend>Relocate {i}?</legend><div role="radiogroup" id="r{i}"><label>Yes</label><label>No</label></div>')
+    parts.append("</form></body></html>")
+    return "".join(parts)
+
+
+def per_field_seconds(adapter: Any, n: int, repeat: int = 3) -> float:
+    """Best per-field discovery time over `repeat` cold parses of an n-field form."""
+    html = synthetic_form(n)
+    best = float("inf")
+    for _ in range(repeat):
+        clear_cache()
+        start = time.perf_counter()
+        fields = adapter.discover_fields("https://example.test/apply", html)
+        elapsed = time.perf_counter() - start
+        if not fields:
+            raise AssertionError(f"{adapter.name}: no fields discovered on a {n}-field form")
+        best = min(best, elapsed / len(fields))
+    return best
+
+
+def check_linear(adapter: Any, sizes: Sequence[int], max_ratio: float, repeat: int = 3) -> List[float]:
+    per_field = [per_field_seconds(adapter, n, repeat) for n in sizes]
+    for n, cost in zip(sizes, per_field):
+        print(f"{adapter.name:<10} fields~{n:>6} per_field={cost * 1e6:7.1f} us")
+    ratio = per_field[-1] / per_field[0]
+    if ratio > max_ratio:
+        raise AssertionError(
+            f"{adapter.name}: per-field cost grew {ratio:.1f}x from {sizes[0]} to {sizes[-1]} fields (max {max_ratio}x)"
+        )
+    return per_field
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 5000])
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failures = 0
+    for adapter in (WorkdayAdapter(), GreenhouseAdapter(), LeverAdapter()):
+        try:
+            check_linear(adapter, sorted(args.sizes), args.max_ratio, args.repeat)
+        except AssertionError as exc:
+            print(f"FAIL {exc}")
+            failures += 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Fit scoring benchmark: one profile against many analyzed jobs.
+
+    python -m scripts.bench_fit_index [--jobs 100000] [--seed 7]
+
+Builds synthetic jobs from the skill taxonomy (3-8 must-haves, 2-6
+nice-to-haves each), then times the per-job fit_score loop against one
+FitIndex.score call and checks that both give the same scores.
+"""
+import argparse
+import random
+import time
+
+from app.services.fit import FitIndex, fit_score, np
+from app.services.skills import skill_interner, skill_taxonomy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    skills = list(skill_taxonomy.skills)
+    jobs = []
+    for _ in range(args.jobs):
+        picked = rng.sample(skills, rng.randint(5, 14))
+        split = rng.randint(3, min(8, len(picked) - 2))
+        jobs.append((skill_interner.bits(picked[:split]), skill_interner.bits(picked[split:])))
+    profile = skill_interner.bits(rng.sample(skills, 12))
+
+    start = time.perf_counter()
+    loop_scores = [fit_score(profile, must, nice)[0] for must, nice in jobs]
+    loop_s = time.perf_counter() - start
+
+    index = FitIndex()
+    for must, nice in jobs:
+        index.add(must, nice)
+    start = time.perf_counter()
+    index.score(profile)  # first call packs the matrices
+    build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = index.score(profile)
+    batch_s = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(loop_scores, batch.scores) if abs(a - float(b)) > 1e-9)
+    print(f"jobs={args.jobs} skills={len(skill_interner)} numpy={'yes' if np is not None else 'no'}")
+    print(f"fit_score loop : {loop_s * 1000:9.1f} ms")
+    print(f"FitIndex pack  : {build_s * 1000:9.1f} ms (once per change)")
+    print(f"FitIndex score : {batch_s * 1000:9.1f} ms")
+    print(f"mismatches     : {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
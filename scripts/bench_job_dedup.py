@@ -0,0 +1,86 @@
+"""
+Near-duplicate JD index benchmark on a synthetic corpus.
+
+    python -m scripts.bench_job_dedup [--docs 1000000] [--dup-rate 0.1] [--bands 16] [--rows 8]
+
+Postings are random 150-word texts over a 20k-word vocabulary; a `dup-rate`
+share are reposts of an earlier posting with a few words changed and a
+location line appended. Reports signature, insert and query cost, recall on
+the reposts, false positives on fresh postings and index memory.
+"""
+import argparse
+import random
+import time
+
+from app.services.job_dedup import JobDedupIndex, np
+
+CITIES = ["Pune", "Hyderabad", "Bengaluru", "Remote", "London", "Austin", "Berlin", "Toronto"]
+
+
+def make_posting(rng: random.Random, vocab, words: int = 150) -> str:
+    return " ".join(rng.choices(vocab, k=words))
+
+
+def repost(rng: random.Random, text: str, vocab) -> str:
+    words = text.split()
+    for _ in range(3):
+        words[rng.randrange(len(words))] = rng.choice(vocab)
+    return " ".join(words) + f"\nLocation: {rng.choice(CITIES)}. <a href='#'>Apply</a>"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--dup-rate", type=float, default=0.1)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--bands", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = [f"w{i}" for i in range(20_000)]
+    index = JobDedupIndex(bands=args.bands, rows=args.rows, max_docs=args.docs)
+
+    originals = []
+    sign_s = add_s = 0.0
+    started = time.perf_counter()
+    for i in range(args.docs):
+        if originals and rng.random() < args.dup_rate:
+            text = repost(rng, originals[rng.randrange(len(originals))], vocab)
+        else:
+            text = make_posting(rng, vocab)
+            if len(originals) < 50_000:
+                originals.append(text)
+        t0 = time.perf_counter()
+        signature = index.signature(text)
+        t1 = time.perf_counter()
+        index.add(text, payload=i, signature=signature)
+        add_s += time.perf_counter() - t1
+        sign_s += t1 - t0
+        if (i + 1) % 100_000 == 0:
+            print(f"  indexed {i + 1:>9} in {time.perf_counter() - started:6.1f} s")
+
+    found = 0
+    latencies = []
+    for _ in range(args.queries):
+        text = repost(rng, originals[rng.randrange(len(originals))], vocab)
+        t0 = time.perf_counter()
+        matches = index.query(text)
+        latencies.append(time.perf_counter() - t0)
+        found += bool(matches)
+    false_positives = sum(bool(index.query(make_posting(rng, vocab))) for _ in range(args.queries))
+    latencies.sort()
+
+    stats = index.stats()
+    print(f"docs={args.docs} bands={args.bands} rows={args.rows} numpy={'yes' if np is not None else 'no'}")
+    print(f"signature       : {sign_s / args.docs * 1e6:8.1f} us/doc")
+    print(f"insert          : {add_s / args.docs * 1e6:8.1f} us/doc ({stats['rebuilds']} rebuilds)")
+    print(f"query p50 / p99 : {latencies[len(latencies) // 2] * 1000:6.2f} / {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms")
+    print(f"repost recall   : {found / args.queries:.3f}")
+    print(f"false positives : {false_positives / args.queries:.4f}")
+    print(f"index arrays    : {stats['array_bytes'] / 2**20:8.1f} MiB (+ one payload reference per doc)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Bulk job ranking benchmark (the /job/rank service path).
+
+    python -m scripts.bench_job_rank [--sizes 10000 100000] [--chars 1500] [--top-k 20]
+
+Generates distinct synthetic job descriptions (filler prose with skills
+mentioned under their aliases, e.g. "Postgres", "k8s") and ranks them for one
+profile, reporting skill extraction and vectorized scoring separately, plus
+a per-job fit_score loop over the same extracted skills for comparison.
+"""
+import argparse
+import random
+import time
+
+from app.models.store import JobPosting
+from app.services.fit import fit_score, np, sparse
+from app.services.job import job_rank_service
+from app.services.skills import DEFAULT_SKILLS, skill_interner
+
+FILLER = (
+    "we are looking for an engineer to join our team and build reliable services for customers "
+    "you will own features end to end collaborate with product and design review code and mentor "
+    "teammates in a fast paced environment with a strong culture of ownership and interest in learning"
+).split()
+
+
+def make_jd(rng: random.Random, chars: int) -> str:
+    terms = [rng.choice((skill, *aliases)) for skill, aliases in DEFAULT_SKILLS.items()]
+    mentions = rng.sample(terms, rng.randint(4, 12))
+    words = []
+    size = 0
+    while size < chars:
+        word = rng.choice(mentions) if rng.random() < 0.04 else rng.choice(FILLER)
+        words.append(word)
+        size += len(word) + 1
+    words.append(f"{rng.randint(1, 10)}+ years")
+    return " ".join(words)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--chars", type=int, default=1500)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    profile = ["Python", "Postgres", "Docker", "SQL", "FastAPI", "k8s"]
+    print(f"numpy={'yes' if np is not None else 'no'} scipy={'yes' if sparse is not None else 'no'}")
+    for size in args.sizes:
+        jobs = [JobPosting(id=str(i), description=make_jd(rng, args.chars)) for i in range(size)]
+        result = job_rank_service.rank(profile, jobs, args.top_k)
+        timings = result["timings_ms"]
+
+        rows = [job_rank_service.job_skills(job.description) for job in jobs]
+        profile_bits = skill_interner.bits(profile)
+        start = time.perf_counter()
+        for must, nice in rows:
+            fit_score(profile_bits, sum(1 << i for i in must), sum(1 << i for i in nice))
+        loop_ms = (time.perf_counter() - start) * 1000
+
+        best = result["ranked"][0]
+        print(
+            f"jobs={size:>7} extract={timings['extract']:9.1f} ms ({size / timings['extract'] * 1000:8.0f} JD/s) "
+            f"score+top{args.top_k}={timings['score']:7.1f} ms  loop={loop_ms:7.1f} ms  "
+            f"total={timings['total'] / 1000:6.2f} s  best={best['fit_score']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Seed the discovery snapshot store with saved pages, for offline replay.
+
+    SNAPSHOT_STORE_DIR=.snapshots python -m scripts.snapshot_seed \
+        https://chevron.wd5.myworkdayjobs.com/job/x snap_after_click.html
+
+Then run the API (or a benchmark) with SNAPSHOT_STORE_DIR=.snapshots
+SNAPSHOT_REPLAY=1: browser fetches of seeded URLs are served from the store
+and all other URLs fail fast, so discovery is deterministic and offline.
+"""
+import argparse
+import sys
+
+from app.services.portals.snapshot_store import snapshot_store
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("url")
+    parser.add_argument("html_file")
+    parser.add_argument("--final-url", default=None, help="URL the browser ended on (default: url)")
+    args = parser.parse_args()
+
+    if not snapshot_store.enabled:
+        print("SNAPSHOT_STORE_DIR is not set", file=sys.stderr)
+        return 1
+    snapshot_store.put_file(args.url, args.html_file, final_url=args.final_url)
+    print(f"stored {args.html_file} for {args.url} under {snapshot_store.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())